@@ -0,0 +1,51 @@
+from __future__ import annotations
+import asyncio, json, os, random, time
+from origingate.executor import ExecutionBackend
+from origingate.engine import assess_json
+from benchmarks.generate_portfolio import mk_dossier
+
+def mk_body(n_components: int, seed: int = 7) -> bytes:
+    random.seed(seed)
+    d = mk_dossier("BenchProd", "1.0.0", "us-east-1", "US", "US", foreign_bias=0.5)
+    comps = d["sbom"]["components"]
+    d["sbom"]["components"] = [dict(comps[i % len(comps)], name=f"lib{i}") for i in range(n_components)]
+    return json.dumps({"dossier": d, "policy_name": "enterprise_moderate"}).encode()
+
+async def _drive(backend: ExecutionBackend, body: bytes, n_requests: int) -> float:
+    sem = asyncio.Semaphore(backend.max_in_flight * 2)
+    async def one():
+        async with sem:
+            await backend.run(assess_json, body, size=len(body))
+    t0 = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(n_requests)))
+    return n_requests / (time.perf_counter() - t0)
+
+def main(components=20_000, requests=64, max_workers=None):
+    # measure the backends, not the result cache: every request would be a hit after the first one
+    # (as in bench_suite); the env var reaches the spawned pool workers, which have their own cache
+    from origingate.cache import RESULTS
+    os.environ["ORIGINGATE_CACHE_SIZE"] = "0"
+    RESULTS.clear()
+    RESULTS.maxsize = 0
+    body = mk_body(components)
+    max_workers = max_workers or os.cpu_count() or 1
+    counts = sorted({1, 2, 4, 8, 16, max_workers} & set(range(1, max_workers + 1)))
+    print(f"assess_json throughput, {components} components ({len(body)/1e6:.1f} MB body), {requests} requests, result cache off")
+    runs = [("inline", 1)] + [("thread", w) for w in counts] + [("process", w) for w in counts]
+    for mode, workers in runs:
+        backend = ExecutionBackend(mode, workers, process_min_bytes=0)
+        backend.start()
+        try:
+            rps = asyncio.run(_drive(backend, body, requests))
+        finally:
+            backend.shutdown()
+        print(f"{mode:>8} workers={workers:<3} {rps:8.1f} req/s")
+
+if __name__ == "__main__":
+    import argparse
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--components", type=int, default=20_000)
+    ap.add_argument("--requests", type=int, default=64)
+    ap.add_argument("--max-workers", type=int, default=None)
+    args = ap.parse_args()
+    main(args.components, args.requests, args.max_workers)
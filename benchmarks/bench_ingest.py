@@ -0,0 +1,42 @@
+from __future__ import annotations
+import json, statistics, time, tracemalloc
+from origingate.ingest import adapter, parse_json
+from origingate.models import ScoreWeights, SoftwareOriginDossier
+from origingate.scoring import score_origin
+from benchmarks.bench_scoring import mk_sized_dossier
+
+PATHS = {
+    "dict+model_validate": lambda body: SoftwareOriginDossier.model_validate(json.loads(body)),
+    "validate_json": lambda body: adapter(SoftwareOriginDossier, False).validate_json(body),
+    "validate_json+compact": lambda body: parse_json(SoftwareOriginDossier, body, compact=True),
+    "parse_json (default)": lambda body: parse_json(SoftwareOriginDossier, body, compact=False),
+}
+
+def main(sizes=(1_000, 10_000, 100_000), repeat=7):
+    w = ScoreWeights()
+    print(f"{'components':>10} {'path':<22} {'parse+score p50 ms':>18} {'vs dict':>8} {'peak MiB':>9}")
+    for n in sizes:
+        body = mk_sized_dossier(n).model_dump_json().encode()
+        samples = {name: [] for name in PATHS}
+        for _ in range(repeat):
+            # round-robin, so no path is favoured by warm-up, allocator or GC state left by the previous one
+            for name, fn in PATHS.items():
+                t0 = time.perf_counter()
+                score_origin(fn(body), w)
+                samples[name].append(time.perf_counter() - t0)
+        base = statistics.median(samples["dict+model_validate"])
+        for name, fn in PATHS.items():
+            tracemalloc.start()
+            score_origin(fn(body), w)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            p50 = statistics.median(samples[name])
+            print(f"{n:>10} {name:<22} {p50*1e3:>18.2f} {p50/base - 1:>+8.0%} {peak/2**20:>9.1f}")
+
+if __name__ == "__main__":
+    import argparse
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    ap.add_argument("--repeat", type=int, default=7)
+    args = ap.parse_args()
+    main(tuple(args.sizes), args.repeat)
@@ -0,0 +1,90 @@
+from __future__ import annotations
+import json, os, platform, re, statistics, subprocess, sys, tempfile, time
+from typing import Any, Dict, List, Optional
+
+# Cold-start cost of the CLI gate versus the API stack: wall time of fresh interpreters (median of N),
+# the in-process warmed assess for comparison, and the heaviest imports from `python -X importtime`.
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DOSSIER = os.path.join(ROOT, "examples", "dossier_foreign.json")
+
+def _env(**extra: str) -> Dict[str, str]:
+    env = dict(os.environ, PYTHONPATH=ROOT + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    env.update(extra)
+    return env
+
+def bench_process(name: str, argv: List[str], runs: int, env: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+    subprocess.run(argv, cwd=ROOT, env=env or _env(), capture_output=True)  # warm the OS page cache / .pyc files
+    samples = []
+    for _ in range(runs):
+        s = time.perf_counter()
+        subprocess.run(argv, cwd=ROOT, env=env or _env(), capture_output=True)
+        samples.append(time.perf_counter() - s)
+    return {"name": name, "runs": runs, "median_ms": statistics.median(samples) * 1e3, "min_ms": min(samples) * 1e3}
+
+def bench_warm(iterations: int, policy: str) -> Dict[str, Any]:
+    from origingate.cache import RESULTS
+    from origingate.engine import assess_json
+    RESULTS.clear()
+    with open(DOSSIER, "rb") as f:
+        body = b'{"dossier":' + f.read() + b"," + json.dumps({"policy_name": policy})[1:].encode()
+    assess_json(body)
+    samples = []
+    for _ in range(iterations):
+        RESULTS.clear()
+        s = time.perf_counter()
+        assess_json(body)
+        samples.append(time.perf_counter() - s)
+    return {"name": "assess_json (in-process, warm)", "runs": iterations, "median_ms": statistics.median(samples) * 1e3,
+            "min_ms": min(samples) * 1e3}
+
+_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+def import_profile(argv: List[str], top: int, env: Optional[Dict[str, str]] = None) -> List[Dict[str, Any]]:
+    """Top-level-ish modules by cumulative import time (µs) for one interpreter run."""
+    p = subprocess.run([sys.executable, "-X", "importtime", *argv], cwd=ROOT, env=env or _env(), capture_output=True, text=True)
+    rows = []
+    for line in p.stderr.splitlines():
+        m = _LINE.match(line)
+        if m:
+            rows.append({"module": m.group(4), "self_us": int(m.group(1)), "cumulative_us": int(m.group(2)),
+                         "depth": (len(m.group(3)) - 1) // 2})
+    return sorted(rows, key=lambda r: -r["cumulative_us"])[:top]
+
+def run(runs: int = 15, top: int = 15, policy: str = "enterprise_moderate") -> Dict[str, Any]:
+    py = sys.executable
+    cli = [py, "-m", "origingate", "assess", DOSSIER, "--policy", policy]
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = os.path.join(tmp, "precompiled.json")
+        subprocess.run([py, "-m", "origingate", "compile", "--out", cache], cwd=ROOT, env=_env(), check=True, capture_output=True)
+        with_cache = _env(ORIGINGATE_PRECOMPILED=cache)
+        without_cache = _env(ORIGINGATE_PRECOMPILED=os.path.join(tmp, "missing.json"))
+        results = [
+            bench_process("python -c pass", [py, "-c", "pass"], runs),
+            bench_process("cli assess (precompiled)", cli, runs, with_cache),
+            bench_process("cli assess (yaml)", cli, runs, without_cache),
+            bench_process("cli assess --explain none (precompiled)", cli + ["--explain", "none"], runs, with_cache),
+            bench_process("import origingate.api.main", [py, "-c", "import origingate.api.main"], runs),
+        ]
+        profile = import_profile(cli[1:], top, with_cache)
+    results.append(bench_warm(runs * 10, policy))
+    return {"meta": {"python": platform.python_version(), "platform": platform.platform(), "runs": runs,
+                     "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S")}, "results": results, "cli_imports": profile}
+
+if __name__ == "__main__":
+    import argparse
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--runs", type=int, default=15, help="fresh interpreters per scenario")
+    ap.add_argument("--top", type=int, default=15, help="imports listed in the CLI profile")
+    ap.add_argument("--policy", default="enterprise_moderate")
+    ap.add_argument("--out", default=None, help="write the report as JSON")
+    args = ap.parse_args()
+    report = run(args.runs, args.top, args.policy)
+    for r in report["results"]:
+        print(f"{r['name']:<42} median {r['median_ms']:8.1f} ms   min {r['min_ms']:8.1f} ms")
+    print("\nCLI imports (cumulative):")
+    for r in report["cli_imports"]:
+        print(f"  {r['cumulative_us'] / 1e3:8.1f} ms  {'  ' * r['depth']}{r['module']}")
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
@@ -0,0 +1,181 @@
+from __future__ import annotations
+import asyncio, json, os, platform, statistics, subprocess, sys, time, tracemalloc
+from typing import Any, Callable, Dict, List, Optional
+from origingate.models import ScoreWeights
+from origingate.policy import decide
+from origingate.scoring import score_origin
+from benchmarks.bench_scoring import mk_sized_dossier
+
+# Reproducible performance suite: engine (score_origin, decide) and the FastAPI app driven in-process
+# over ASGI. Results are written as JSON; --compare flags regressions against a previous run.
+
+def _percentiles(samples: List[float]) -> Dict[str, float]:
+    s = sorted(samples)
+    pick = lambda q: s[min(len(s) - 1, int(q * len(s)))]
+    return {"p50_ms": pick(0.50) * 1e3, "p95_ms": pick(0.95) * 1e3, "p99_ms": pick(0.99) * 1e3, "mean_ms": statistics.fmean(s) * 1e3}
+
+def _peak_mib(fn: Callable[[], Any]) -> float:
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1] / 2**20
+    finally:
+        tracemalloc.stop()
+
+def bench_sync(name: str, fn: Callable[[], Any], iterations: int, params: Dict[str, Any]) -> Dict[str, Any]:
+    fn()  # warm-up
+    samples = []
+    t0 = time.perf_counter()
+    for _ in range(iterations):
+        s = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - s)
+    wall = time.perf_counter() - t0
+    return {"name": name, "params": params, "iterations": iterations, "throughput_per_s": iterations / wall,
+            **_percentiles(samples), "peak_mem_mib": _peak_mib(fn)}
+
+class _ASGIDriver:
+    """Minimal in-process HTTP/1.1 client for an ASGI app (no sockets, no extra dependencies)."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def request(self, method: str, path: str, body: bytes = b"") -> tuple:
+        scope = {"type": "http", "asgi": {"version": "3.0", "spec_version": "2.4"}, "http_version": "1.1",
+                 "method": method, "scheme": "http", "path": path, "raw_path": path.encode(), "root_path": "",
+                 "query_string": b"", "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+                 "client": ("127.0.0.1", 0), "server": ("bench", 80)}
+        sent = [False]
+        async def receive():
+            if not sent[0]:
+                sent[0] = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            await asyncio.Event().wait()
+        status, chunks = [0], []
+        async def send(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+        await self.app(scope, receive, send)
+        return status[0], b"".join(chunks)
+
+async def _bench_api(app, path: str, bodies: List[bytes], concurrency: int) -> tuple:
+    client = _ASGIDriver(app)
+    samples: List[float] = []
+    errors = 0
+    queue = list(reversed(bodies))
+    async def worker():
+        nonlocal errors
+        while queue:
+            body = queue.pop()
+            s = time.perf_counter()
+            status, _ = await client.request("POST", path, body)
+            samples.append(time.perf_counter() - s)
+            errors += status != 200
+    t0 = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return samples, errors, time.perf_counter() - t0
+
+def bench_api(app, sizes, policies, concurrencies, requests: int, use_cache: bool) -> List[Dict[str, Any]]:
+    from origingate.cache import RESULTS
+    results = []
+    async def run_all():
+        async with app.router.lifespan_context(app):
+            for n in sizes:
+                dossier = json.loads(mk_sized_dossier(n).model_dump_json())
+                for policy in policies:
+                    # distinct product versions so the result cache only helps when asked to
+                    bodies = []
+                    for i in range(requests):
+                        dossier["product"]["version"] = f"bench.{i}"
+                        bodies.append(json.dumps({"dossier": dossier, "policy_name": policy, "context": {"annual_usage_usd": 1_000_000}}).encode())
+                    for conc in concurrencies:
+                        RESULTS.clear()
+                        RESULTS.maxsize = RESULTS.maxsize if use_cache else 0
+                        await _bench_api(app, "/v1/assess", bodies[:1], 1)  # warm-up
+                        samples, errors, wall = await _bench_api(app, "/v1/assess", bodies, conc)
+                        tracemalloc.start()
+                        await _bench_api(app, "/v1/assess", bodies[:conc], conc)
+                        peak = tracemalloc.get_traced_memory()[1] / 2**20
+                        tracemalloc.stop()
+                        results.append({"name": "api_assess", "params": {"components": n, "policy": policy, "concurrency": conc, "cache": use_cache},
+                                        "iterations": len(samples), "errors": errors, "throughput_per_s": len(samples) / wall,
+                                        **_percentiles(samples), "peak_mem_mib": peak})
+                        print(_fmt_row(results[-1]), flush=True)
+    asyncio.run(run_all())
+    return results
+
+def _fmt_row(r: Dict[str, Any]) -> str:
+    params = " ".join(f"{k}={v}" for k, v in r["params"].items())
+    return (f"{r['name']:<12} {params:<60} {r['throughput_per_s']:>10.1f}/s  p50 {r['p50_ms']:>8.3f}  "
+            f"p95 {r['p95_ms']:>8.3f}  p99 {r['p99_ms']:>8.3f} ms  peak {r['peak_mem_mib']:>7.1f} MiB")
+
+def _environment() -> Dict[str, Any]:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5).stdout.strip()
+    except Exception:
+        commit = ""
+    return {"python": sys.version.split()[0], "platform": platform.platform(), "cpus": os.cpu_count(), "commit": commit,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())}
+
+def compare(current: Dict[str, Any], previous_path: str, threshold: float) -> bool:
+    """Prints per-scenario p50/throughput change vs a previous results file; returns True on regression."""
+    with open(previous_path, "r", encoding="utf-8") as f:
+        previous = json.load(f)
+    key = lambda r: (r["name"], json.dumps(r["params"], sort_keys=True))
+    old = {key(r): r for r in previous["results"]}
+    regressed = False
+    print(f"\nvs {previous_path} (commit {previous['environment'].get('commit')}), threshold {threshold:.0%}")
+    for r in current["results"]:
+        o = old.get(key(r))
+        if o is None:
+            continue
+        dp50 = r["p50_ms"] / o["p50_ms"] - 1.0 if o["p50_ms"] else 0.0
+        dtput = r["throughput_per_s"] / o["throughput_per_s"] - 1.0 if o["throughput_per_s"] else 0.0
+        flag = dp50 > threshold or dtput < -threshold
+        regressed |= flag
+        print(f"{'REGRESSION' if flag else 'ok':<10} {r['name']:<12} {json.dumps(r['params'], sort_keys=True):<70} p50 {dp50:+7.1%}  throughput {dtput:+7.1%}")
+    return regressed
+
+def main(sizes=(100, 1_000, 10_000), policies=("enterprise_moderate", "fed_strict"), concurrency=(1, 8),
+         iterations=50, requests=64, out: Optional[str] = "bench_results.json", compare_to: Optional[str] = None,
+         threshold: float = 0.10, use_cache: bool = False, skip_api: bool = False) -> int:
+    w = ScoreWeights()
+    results: List[Dict[str, Any]] = []
+    for n in sizes:
+        d = mk_sized_dossier(n)
+        results.append(bench_sync("score_origin", lambda: score_origin(d, w, "US"), iterations, {"components": n}))
+        print(_fmt_row(results[-1]), flush=True)
+    for policy in policies:
+        results.append(bench_sync("decide", lambda: decide(0.55, 30.0, policy, {"annual_usage_usd": 1_000_000}), iterations * 20, {"policy": policy}))
+        print(_fmt_row(results[-1]), flush=True)
+    if not skip_api:
+        from origingate.api.main import app
+        results.extend(bench_api(app, sizes, policies, concurrency, requests, use_cache))
+
+    report = {"environment": _environment(), "results": results}
+    if out:
+        with open(out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nWrote {len(results)} results to {out}")
+    if compare_to and compare(report, compare_to, threshold):
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    import argparse
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sizes", type=int, nargs="+", default=[100, 1_000, 10_000])
+    ap.add_argument("--policies", nargs="+", default=["enterprise_moderate", "fed_strict"])
+    ap.add_argument("--concurrency", type=int, nargs="+", default=[1, 8])
+    ap.add_argument("--iterations", type=int, default=50, help="engine iterations per scenario")
+    ap.add_argument("--requests", type=int, default=64, help="API requests per scenario")
+    ap.add_argument("--out", default="bench_results.json")
+    ap.add_argument("--compare", default=None, help="previous results JSON to diff against")
+    ap.add_argument("--threshold", type=float, default=0.10, help="relative p50/throughput change flagged as a regression")
+    ap.add_argument("--cache", action="store_true", help="leave the result cache enabled during API runs")
+    ap.add_argument("--skip-api", action="store_true")
+    args = ap.parse_args()
+    sys.exit(main(tuple(args.sizes), tuple(args.policies), tuple(args.concurrency), args.iterations, args.requests,
+                  args.out, args.compare, args.threshold, args.cache, args.skip_api))
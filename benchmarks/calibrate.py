@@ -0,0 +1,84 @@
+from __future__ import annotations
+import csv, sys, time
+from typing import List, Optional, Tuple
+import numpy as np
+from origingate.calibration import FLAGGED_LABEL, collect_signals, sweep, weight_grid
+from origingate.models import ScoreWeights
+from origingate.policy import get_policy
+
+# Policy calibration sweep: scores the portfolio once, then evaluates weights x tau x gamma x review band.
+
+def _range(spec: str) -> np.ndarray:
+    # "start:stop:step" (inclusive stop) or a comma-separated list
+    if ":" in spec:
+        start, stop, step = (float(x) for x in spec.split(":"))
+        return np.round(np.arange(start, stop + step / 2, step), 6)
+    return np.array([float(x) for x in spec.split(",")])
+
+def _band(spec: str) -> Optional[Tuple[float, Optional[float]]]:
+    # "none", "0.45" (up to tau) or "0.45:0.7"
+    if spec == "none":
+        return None
+    low, _, high = spec.partition(":")
+    return (float(low), float(high) if high and high != "tau" else None)
+
+def main(portfolio: str, taus: np.ndarray, gammas: np.ndarray, bands: List, weight_step: Optional[float],
+         target: str = "US", policy: Optional[str] = None, top: int = 10, key: str = "f1", out: Optional[str] = None) -> int:
+    t0 = time.perf_counter()
+    signals = collect_signals(portfolio, target)
+    t1 = time.perf_counter()
+    d = ScoreWeights()
+    default = np.array([[d.w_build, d.w_sbom, d.w_signing, d.w_hosting]])
+    weights = weight_grid(weight_step) if weight_step else default
+    result = sweep(signals, weights, taus, gammas, bands)
+    t2 = time.perf_counter()
+    print(f"{len(signals)} dossiers scored in {t1 - t0:.2f}s; {len(result)} candidates "
+          f"({len(weights)} weights x {len(taus)} tau x {len(gammas)} gamma x {len(bands)} bands) swept in {t2 - t1:.2f}s; "
+          f"P/R: {FLAGGED_LABEL}")
+
+    if policy:
+        p = get_policy(policy)
+        ref = sweep(signals, default, [p.tau], [p.gamma], [None if p.review_low is None else (p.review_low, p.review_high)],
+                    fee_enabled=p.fee_enabled, fee_rate=p.fee_rate)
+        print(f"\ncurrent {policy}:", _fmt(ref.row(0)))
+    print(f"\ntop {top} by {key}:")
+    for row in result.top(top, key):
+        print(" ", _fmt(row))
+
+    if out:
+        # full precision/recall/fee curve, one row per candidate
+        with open(out, "w", newline="", encoding="utf-8") as f:
+            cols = list(result.row(0))
+            w = csv.writer(f)
+            w.writerow(cols)
+            prec, rec, f1 = result.precision, result.recall, result.f1
+            for i in range(len(result)):
+                wt = result.weights[i]
+                w.writerow([*(round(float(x), 6) for x in wt), result.tau[i], result.gamma[i], result.review_low[i], result.review_high[i],
+                            result.tp[i], result.fp[i], result.fn[i], result.tn[i], round(prec[i], 6), round(rec[i], 6), round(f1[i], 6),
+                            result.allow[i], result.review[i], result.allow_with_fee[i], result.deny[i], round(result.fee_usd[i], 2)])
+        print(f"\nWrote {len(result)} rows to {out}")
+    return 0
+
+def _fmt(r) -> str:
+    band = "" if np.isnan(r["review_low"]) else f" review=[{r['review_low']:.2f},{r['review_high']:.2f})"
+    return (f"w=({r['w_build']:.2f},{r['w_sbom']:.2f},{r['w_signing']:.2f},{r['w_hosting']:.2f}) tau={r['tau']:.2f} "
+            f"gamma={r['gamma']:.1f}{band}  P={r['precision']:.3f} R={r['recall']:.3f} F1={r['f1']:.3f}  "
+            f"allow={r['allow']} review={r['review']} fee={r['allow_with_fee']} deny={r['deny']} fee_usd={r['fee_usd']:,.0f}")
+
+if __name__ == "__main__":
+    import argparse
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--portfolio", default="portfolio_out", help="JSON portfolio directory or columnar .ogp file")
+    ap.add_argument("--target", default="US")
+    ap.add_argument("--tau", default="0.30:0.90:0.01", help="start:stop:step or comma list")
+    ap.add_argument("--gamma", default="5:60:1", help="start:stop:step or comma list")
+    ap.add_argument("--review-band", nargs="+", default=["none"], help='"none", "LOW" (up to tau) or "LOW:HIGH"')
+    ap.add_argument("--weight-step", type=float, default=None, help="sweep every weight vector on the simplex with this step (default: ScoreWeights())")
+    ap.add_argument("--policy", default=None, help="also report this policy's current operating point")
+    ap.add_argument("--top", type=int, default=10)
+    ap.add_argument("--sort", default="f1", choices=["f1", "precision", "recall", "fee_usd"])
+    ap.add_argument("--out", default=None, help="write every candidate to CSV")
+    args = ap.parse_args()
+    sys.exit(main(args.portfolio, _range(args.tau), _range(args.gamma), [_band(b) for b in args.review_band],
+                  args.weight_step, args.target, args.policy, args.top, args.sort, args.out))
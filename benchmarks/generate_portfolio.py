@@ -42,11 +42,16 @@ def mk_dossier(name: str, version: str, build_region: str, key_juris: str, hosti
       "hosting":{"type":"saas","control_plane_region":"us-east-1","jurisdiction":hosting_juris},
     }
 
-def main(out_dir="portfolio_out", n=200, seed=7):
+def main(out_dir="portfolio_out", n=200, seed=7, fmt="json"):
+    # fmt: "json" (one file per dossier + labels.json), "columnar" (single portfolio.ogp) or "both"
     random.seed(seed)
     out = Path(out_dir)
     out.mkdir(parents=True, exist_ok=True)
     labels = []
+    writer = None
+    if fmt in ("columnar", "both"):
+        from origingate.portfolio import PortfolioWriter
+        writer = PortfolioWriter(str(out / "portfolio.ogp"))
     for k in range(n):
         name = f"Prod{k}"
         version = f"{random.randint(0,9)}.{random.randint(0,9)}.{random.randint(0,20)}"
@@ -59,11 +64,18 @@ def main(out_dir="portfolio_out", n=200, seed=7):
         else:
             # laundered build: US build + US key but foreign-heavy deps
             d = mk_dossier(name, version, "us-west-2", "US", "US", foreign_bias=0.80)
-        fn = out / f"{name}_{version}.json"
-        fn.write_text(json.dumps(d, indent=2))
-        labels.append({"file": fn.name, "class": cls})
-    (out / "labels.json").write_text(json.dumps(labels, indent=2))
-    print(f"Wrote {n} dossiers to {out} and labels.json")
+        if writer is not None:
+            writer.add(d, cls)
+        if fmt in ("json", "both"):
+            fn = out / f"{name}_{version}.json"
+            fn.write_text(json.dumps(d, indent=2))
+            labels.append({"file": fn.name, "class": cls})
+    if writer is not None:
+        writer.close()
+        print(f"Wrote {n} dossiers to {out / 'portfolio.ogp'}")
+    if fmt in ("json", "both"):
+        (out / "labels.json").write_text(json.dumps(labels, indent=2))
+        print(f"Wrote {n} dossiers to {out} and labels.json")
 
 if __name__ == "__main__":
     import argparse
@@ -71,5 +83,16 @@ if __name__ == "__main__":
     ap.add_argument("--out", default="portfolio_out")
     ap.add_argument("--n", type=int, default=200)
     ap.add_argument("--seed", type=int, default=7)
+    ap.add_argument("--format", choices=["json", "columnar", "both"], default="json")
+    ap.add_argument("--import-json", metavar="DIR", help="convert an existing JSON portfolio DIR to OUT/portfolio.ogp")
+    ap.add_argument("--export-json", metavar="OGP", help="convert a columnar portfolio OGP back to JSON files in OUT")
     args = ap.parse_args()
-    main(args.out, args.n, args.seed)
+    if args.import_json:
+        from origingate.portfolio import import_json_dir
+        Path(args.out).mkdir(parents=True, exist_ok=True)
+        print(f"Imported {import_json_dir(args.import_json, str(Path(args.out) / 'portfolio.ogp'))} dossiers")
+    elif args.export_json:
+        from origingate.portfolio import export_json_dir
+        print(f"Exported {export_json_dir(args.export_json, args.out)} dossiers to {args.out}")
+    else:
+        main(args.out, args.n, args.seed, args.format)
@@ -1,59 +1,143 @@
 from __future__ import annotations
-import json
+import json, multiprocessing, os
 from pathlib import Path
 from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+from origingate.calibration import FLAGGED_LABEL, FOREIGN_LABELS, flagged
 from origingate.models import SoftwareOriginDossier, ScoreWeights
 from origingate.verify import verify_dossier
 from origingate.scoring import score_origin
 from origingate.policy import decide
 
-def load(portfolio_dir: str):
-    p = Path(portfolio_dir)
-    labels = json.loads((p / "labels.json").read_text())
-    items = []
-    for row in labels:
-        d = json.loads((p / row["file"]).read_text())
-        items.append((row["file"], row["class"], SoftwareOriginDossier.model_validate(d)))
-    return items
-
-def confusion(pred, truth):
-    tp = sum(1 for p,t in zip(pred,truth) if p and t)
-    fp = sum(1 for p,t in zip(pred,truth) if p and not t)
-    fn = sum(1 for p,t in zip(pred,truth) if (not p) and t)
-    tn = sum(1 for p,t in zip(pred,truth) if (not p) and (not t))
+# Streaming evaluator: chunks of the portfolio are parsed + scored in worker processes, every
+# requested policy is decided on the same scores, and only small per-chunk tallies come back to
+# be merged. Memory stays flat regardless of portfolio size.
+
+Tally = Dict[str, Counter]  # policy -> Counter(verdicts, tp/fp/fn/tn, invalid)
+
+def _confusion_counts(tp: int, fp: int, fn: int, tn: int):
     prec = tp / (tp+fp) if (tp+fp) else 0.0
     rec = tp / (tp+fn) if (tp+fn) else 0.0
     return {"tp":tp,"fp":fp,"fn":fn,"tn":tn,"precision":round(prec,3),"recall":round(rec,3)}
 
-def main(portfolio_dir="portfolio_out", policy="enterprise_moderate"):
-    items = load(portfolio_dir)
-    w = ScoreWeights()
-    counts = Counter()
-    pred_foreign = []
-    truth_foreign = []
-
-    for fn, cls, dossier in items:
-        vr = verify_dossier(dossier)
-        if not vr.ok:
-            counts["invalid"] += 1
+def _tally(scored, policies: Sequence[str]) -> Tally:
+    out: Tally = {p: Counter() for p in policies}
+    for cls, ocs, foi in scored:
+        for policy in policies:
+            c = out[policy]
+            if ocs is None:
+                c["invalid"] += 1
+                continue
+            # same truth / prediction definitions as the calibration sweep
+            truth = cls in FOREIGN_LABELS
+            dec = decide(ocs, foi, policy, {"annual_usage_usd": 1_000_000}, explain=False)
+            pred = flagged(dec.verdict)
+            c["verdict:" + dec.verdict] += 1
+            c[("tp" if truth else "fp") if pred else ("fn" if truth else "tn")] += 1
+    return out
+
+# --- worker side -----------------------------------------------------------------
+
+def _score_json_chunk(portfolio_dir: str, rows: List[Tuple[str, str]], target: str, w: ScoreWeights):
+    from pydantic import ValidationError
+    from origingate.ingest import parse_json
+    for fn, cls in rows:
+        try:
+            dossier = parse_json(SoftwareOriginDossier, (Path(portfolio_dir) / fn).read_bytes())
+        except (OSError, ValidationError):
+            yield cls, None, None
             continue
-        ocs, foi, _, _ = score_origin(dossier, w, "US")
-        # define truth foreign: foreign or laundered are foreign-dominant
-        truth = cls in ("foreign","laundered")
-        # prediction foreign: based on thresholds used by decision engine
-        dec = decide(ocs, foi, policy, {"annual_usage_usd": 1_000_000})
-        pred = dec.verdict in ("ALLOW_WITH_FEE","DENY") and ocs < 0.60 and foi > 25.0
-        pred_foreign.append(pred)
-        truth_foreign.append(truth)
-        counts[dec.verdict] += 1
-
-    print("Verdicts:", dict(counts))
-    print("Foreign detection:", confusion(pred_foreign, truth_foreign))
+        if not verify_dossier(dossier).ok:
+            yield cls, None, None
+            continue
+        ocs, foi, _, _ = score_origin(dossier, w, target, detail="none")
+        yield cls, ocs, foi
+
+_OPEN: Dict[str, object] = {}
+
+def _score_columnar_chunk(path: str, start: int, stop: int, target: str, w: ScoreWeights):
+    # no SoftwareOriginDossier objects: score straight off the memory-mapped columns
+    from origingate.portfolio import ColumnarPortfolio
+    from origingate.scoring import score_columns
+    p = _OPEN.get(path)
+    if p is None:
+        p = _OPEN[path] = ColumnarPortfolio(path)
+    s = score_columns(p.columns(start, stop, target), w)
+    for i, label, ocs, foi in zip(range(start, stop), p.labels(start, stop), s.ocs.tolist(), s.foi.tolist()):
+        yield (label, None, None) if p.verify_errors(i) else (label, ocs, foi)
+
+def _eval_chunk(kind: str, source: str, chunk, policies: Sequence[str], target: str, w: ScoreWeights) -> Tally:
+    scored = _score_columnar_chunk(source, *chunk, target, w) if kind == "columnar" else _score_json_chunk(source, chunk, target, w)
+    return _tally(scored, policies)
+
+# --- driver ----------------------------------------------------------------------
+
+def _json_chunks(portfolio_dir: str, chunk_size: int) -> Iterator[List[Tuple[str, str]]]:
+    # labels.json is the index; dossier files are only opened by the workers
+    with open(Path(portfolio_dir) / "labels.json", "r", encoding="utf-8") as f:
+        labels = json.load(f)
+    for i in range(0, len(labels), chunk_size):
+        yield [(row["file"], row["class"]) for row in labels[i:i + chunk_size]]
+
+def _columnar_chunks(path: str, chunk_size: int) -> Iterator[Tuple[int, int]]:
+    from origingate.portfolio import ColumnarPortfolio
+    n = len(ColumnarPortfolio(path))
+    for start in range(0, n, chunk_size):
+        yield start, min(start + chunk_size, n)
+
+def _merge(total: Tally, part: Tally) -> None:
+    for policy, c in part.items():
+        total[policy].update(c)
+
+def evaluate(portfolio: str, policies: Sequence[str] = ("enterprise_moderate",), target: str = "US",
+             workers: Optional[int] = None, chunk_size: int = 500, w: Optional[ScoreWeights] = None) -> Tally:
+    """Per-policy tallies for a JSON portfolio directory or a columnar .ogp file.
+
+    workers=0 runs in-process; otherwise chunks go to a process pool with at most 2 chunks per worker in flight.
+    """
+    w = w or ScoreWeights()
+    kind = "columnar" if portfolio.endswith(".ogp") else "json"
+    chunks = _columnar_chunks(portfolio, chunk_size) if kind == "columnar" else _json_chunks(portfolio, chunk_size)
+    total: Tally = {p: Counter() for p in policies}
+    workers = (os.cpu_count() or 1) if workers is None else workers
+    if workers == 0:
+        for chunk in chunks:
+            _merge(total, _eval_chunk(kind, portfolio, chunk, policies, target, w))
+        return total
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as ex:
+        pending: set[Future] = set()
+        for chunk in chunks:
+            if len(pending) >= 2 * workers:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for f in done:
+                    _merge(total, f.result())
+            pending.add(ex.submit(_eval_chunk, kind, portfolio, chunk, policies, target, w))
+        for f in pending:
+            _merge(total, f.result())
+    return total
+
+def main(portfolio_dir="portfolio_out", policies=("enterprise_moderate",), workers=None, chunk_size=500):
+    # portfolio_dir: a JSON portfolio directory, or a columnar .ogp file
+    if isinstance(policies, str):
+        policies = (policies,)
+    total = evaluate(portfolio_dir, policies, "US", workers, chunk_size)
+    for policy in policies:
+        c = total[policy]
+        verdicts = {k.split(":", 1)[1]: v for k, v in c.items() if k.startswith("verdict:")}
+        if c["invalid"]:
+            verdicts["invalid"] = c["invalid"]
+        if len(policies) > 1:
+            print(f"[{policy}]")
+        print("Verdicts:", verdicts)
+        print(f"Foreign detection ({FLAGGED_LABEL}):", _confusion_counts(c["tp"], c["fp"], c["fn"], c["tn"]))
 
 if __name__ == "__main__":
     import argparse
     ap = argparse.ArgumentParser()
-    ap.add_argument("--portfolio", default="portfolio_out")
-    ap.add_argument("--policy", default="enterprise_moderate")
+    ap.add_argument("--portfolio", default="portfolio_out", help="JSON portfolio directory or columnar .ogp file")
+    ap.add_argument("--policy", nargs="+", default=["enterprise_moderate"], help="one or more policies, decided on the same scores")
+    ap.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count; 0 = in-process)")
+    ap.add_argument("--chunk-size", type=int, default=500, help="dossiers per work unit")
     args = ap.parse_args()
-    main(args.portfolio, args.policy)
+    main(args.portfolio, tuple(args.policy), args.workers, args.chunk_size)
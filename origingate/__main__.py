@@ -0,0 +1,81 @@
+"""Command-line gate for CI steps and short-lived functions.
+
+    python -m origingate assess dossier.json --policy enterprise_moderate [--target US] [--context '{...}']
+    python -m origingate score dossier.json [--target EU] [--explain summary]
+    python -m origingate compile            # precompile policies + jurisdictions (see precompiled.py)
+
+Only the engine is imported (never FastAPI / uvicorn). assess prints the AssessResponse JSON and exits
+0 when the verdict allows the artifact, 1 when it does not (DENY / REVIEW) and 2 on invalid input.
+"""
+from __future__ import annotations
+import argparse, glob, json, os, sys
+
+EXIT_ALLOW, EXIT_BLOCK, EXIT_INVALID = 0, 1, 2
+
+def _read(path: str) -> bytes:
+    if path == "-":
+        return sys.stdin.buffer.read()
+    with open(path, "rb") as f:
+        return f.read()
+
+def _request(dossier: bytes, **fields) -> bytes:
+    # the dossier bytes are spliced in as-is and validated once, by the engine
+    return b'{"dossier":' + dossier + b"," + json.dumps(fields)[1:].encode()
+
+def _run(fn, body: bytes) -> bytes:
+    from .engine import AssessError
+    try:
+        return fn(body)
+    except AssessError as e:
+        sys.stderr.write(json.dumps({"status_code": e.status_code, "detail": e.detail}) + "\n")
+        raise SystemExit(EXIT_INVALID)
+
+def cmd_assess(args: argparse.Namespace) -> int:
+    from .engine import assess_json
+    fields = {"policy_name": args.policy, "context": json.loads(args.context), "target_jurisdiction": args.target, "explain": args.explain}
+    out = _run(assess_json, _request(_read(args.dossier), **fields))
+    sys.stdout.write(out.decode() + "\n")
+    return EXIT_ALLOW if json.loads(out)["allow"] else EXIT_BLOCK
+
+def cmd_score(args: argparse.Namespace) -> int:
+    from .engine import score_json
+    out = _run(score_json, _request(_read(args.dossier), target_jurisdiction=args.target, explain=args.explain))
+    sys.stdout.write(out.decode() + "\n")
+    return EXIT_ALLOW
+
+def cmd_compile(args: argparse.Namespace) -> int:
+    from .jurisdiction import JURISDICTIONS_PATH
+    from .policy import POLICY_DIR
+    from .precompiled import compile_files
+    paths = sorted(glob.glob(os.path.join(POLICY_DIR, "*.yaml"))) + [JURISDICTIONS_PATH]
+    n = compile_files(paths, args.out) if args.out else compile_files(paths)
+    print(f"precompiled {n} of {len(paths)} files")
+    return EXIT_ALLOW
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m origingate")
+    sub = ap.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("assess", help="verify + score + decide one dossier")
+    p.add_argument("dossier", help="dossier JSON file, or - for stdin")
+    p.add_argument("--policy", required=True)
+    p.add_argument("--target", default="US", help="target jurisdiction")
+    p.add_argument("--context", default="{}", help="decision context as JSON, e.g. '{\"annual_usage_usd\": 1000000}'")
+    p.add_argument("--explain", default="full", help="none | summary | full | top-k=N")
+    p.set_defaults(fn=cmd_assess)
+    p = sub.add_parser("score", help="verify + score one dossier")
+    p.add_argument("dossier", help="dossier JSON file, or - for stdin")
+    p.add_argument("--target", default="US", help="target jurisdiction")
+    p.add_argument("--explain", default="full", help="none | summary | full | top-k=N")
+    p.set_defaults(fn=cmd_score)
+    p = sub.add_parser("compile", help="write the precompiled policy / jurisdiction cache")
+    p.add_argument("--out", default=None, help="cache file (default: $ORIGINGATE_PRECOMPILED or precompiled.json)")
+    p.set_defaults(fn=cmd_compile)
+    args = ap.parse_args(argv)
+    try:
+        return args.fn(args)
+    except (OSError, ValueError) as e:
+        sys.stderr.write(f"{e}\n")
+        return EXIT_INVALID
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,65 @@
+from __future__ import annotations
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterator
+import asyncio, os
+from .metrics import METRICS
+
+# Event-loop side of the request path: identical concurrent requests share one computation
+# (singleflight), and new computations are refused once too many are already queued.
+
+class Overloaded(Exception):
+    pass
+
+class SingleFlight:
+    """Coalesces concurrent calls with the same key onto one task; later callers await its result.
+
+    The shared task is shielded, so a caller that goes away (client disconnect) does not cancel
+    the work for everyone else. Nothing is remembered once the task finishes — that is the result cache's job.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+
+    def __len__(self) -> int:
+        return len(self._inflight)
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._inflight.get(key)
+        if task is None:
+            task = self._inflight[key] = asyncio.ensure_future(fn())
+            task.add_done_callback(lambda t: self._done(key, t))
+        else:
+            METRICS.inc("origingate_coalesced_requests_total")
+        return await asyncio.shield(task)
+
+    def _done(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()  # mark retrieved even if every waiter went away
+
+class AdmissionController:
+    """Bounds the number of computations admitted but not yet finished (queued or running)."""
+
+    def __init__(self, max_pending: int):
+        self.max_pending = max_pending
+        self.pending = 0
+
+    @classmethod
+    def from_env(cls, workers: int) -> "AdmissionController":
+        return cls(int(os.environ.get("ORIGINGATE_MAX_PENDING", "0")) or 32 * workers)
+
+    def check(self) -> None:
+        if self.pending >= self.max_pending:
+            METRICS.inc("origingate_admission_rejected_total")
+            raise Overloaded(f"server busy: {self.pending} requests pending (limit {self.max_pending})")
+
+    @contextmanager
+    def slot(self) -> Iterator[None]:
+        # only touched from the event loop thread, so a plain counter is enough
+        self.check()
+        self.pending += 1
+        try:
+            yield
+        finally:
+            self.pending -= 1
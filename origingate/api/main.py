@@ -1,85 +1,392 @@
 from __future__ import annotations
-from fastapi import FastAPI, HTTPException
-from fastapi.responses import PlainTextResponse
-import os
+from contextlib import asynccontextmanager
+from dataclasses import asdict
+from typing import Any, AsyncIterator, Callable, List, Optional
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
+import asyncio, collections, hashlib, json, logging, os, time
 
 from ..models import (
-    VerifyResponse, ScoreRequest, ScoreResponse,
+    VerifyResponse, ScoreResponse, MultiScoreResponse,
     DecideRequest, DecisionResponse,
-    AssessRequest, AssessResponse,
-    BaselineCreateRequest, BaselineCreateResponse,
-    UpdateEvaluateRequest, UpdateEvaluateResponse,
+    AssessResponse,
+    BaselineCreateRequest, BaselineCreateResponse, BaselineInfo, DriftContributor,
+    UpdateEvaluateRequest, UpdateEvaluateResponse, SessionInfo,
 )
-from ..verify import verify_dossier
-from ..scoring import score_origin
-from ..policy import decide
-from ..store import Baseline, put_baseline, get_baseline
+from ..policy import REGISTRY, PolicyError, get_policy
+from ..drift import evaluate_drift
+from ..store import STORE, Baseline, baseline_from_dossier, put_baseline, get_baseline
+from ..engine import (
+    DEFAULT_WEIGHTS, AssessError, assess_audited, parse, require_verified, score_cached, score_json, score_multi_json, verify_json,
+    warm_up,
+)
+from ..cache import RESULTS
+from ..metrics import METRICS, record_verdict, stage
+from ..executor import ExecutionBackend
+from ..admission import AdmissionController, Overloaded, SingleFlight
+from ..sessions import abort_session, add_components_json, finalize_session, open_session_json
+from ..audit import AUDIT, AuditRecord
+
+BACKEND = ExecutionBackend.from_env()
+# ORIGINGATE_MAX_PENDING: computations queued or running before new ones get a 429 (default 32 per worker)
+ADMISSION = AdmissionController.from_env(BACKEND.max_in_flight)
+COALESCE = SingleFlight()
+
+log = logging.getLogger(__name__)
+
+OPENAPI_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "openapi.yaml")
+_static: dict = {}
+
+def _openapi_yaml() -> str:
+    text = _static.get("openapi")
+    if text is None:
+        with open(OPENAPI_PATH, "r", encoding="utf-8") as f:
+            text = _static["openapi"] = f.read()
+    return text
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Fail fast: compile every policy in policies/ before serving traffic
+    REGISTRY.preload()
+    warm_up()
+    _openapi_yaml()
+    BACKEND.start()
+    if AUDIT is not None:
+        AUDIT.start()
+    yield
+    BACKEND.shutdown()
+    if AUDIT is not None:
+        AUDIT.close()
+    STORE.close()
+
+app = FastAPI(title="OriginGate", version="0.1.0", lifespan=lifespan)
 
-app = FastAPI(title="OriginGate", version="0.1.0")
+class _MetricsMiddleware:
+    # Pure ASGI (no BaseHTTPMiddleware task/queue overhead); labels by route template to bound cardinality
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        status = [500]
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+        t0 = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            path = getattr(route, "path", "unmatched")
+            METRICS.observe("origingate_http_request_duration_seconds", time.perf_counter() - t0, (("route", path),))
+            METRICS.inc("origingate_http_requests_total", (("route", path), ("method", scope["method"]), ("status", str(status[0]))))
+
+app.add_middleware(_MetricsMiddleware)
+
+def _collect_cache_stats():
+    out = {("origingate_result_cache", (("stat", k),)): float(v) for k, v in RESULTS.stats().items()}
+    out.update({("origingate_baseline_store", (("stat", k),)): float(v) for k, v in STORE.stats().items()})
+    out[("origingate_pending_requests", ())] = float(ADMISSION.pending)
+    if AUDIT is not None:
+        out.update({("origingate_audit", (("stat", k),)): float(v) for k, v in AUDIT.stats().items()})
+    return out
+
+METRICS.collector(_collect_cache_stats)
 
 @app.get("/v1/health")
-def health():
+async def health():
     return {"ok": True, "service": "origingate", "version": "0.1.0"}
 
+@app.get("/v1/metrics", response_class=PlainTextResponse)
+async def metrics():
+    # collectors may query the baseline store
+    return PlainTextResponse(await run_in_threadpool(METRICS.render), media_type="text/plain; version=0.0.4")
+
 @app.get("/v1/openapi.yaml", response_class=PlainTextResponse)
-def openapi_yaml():
-    repo_root = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
-    path = os.path.join(repo_root, "openapi.yaml")
-    return open(path, "r", encoding="utf-8").read()
+async def openapi_yaml():
+    return _openapi_yaml()
 
-@app.post("/v1/dossiers/verify", response_model=VerifyResponse)
-def dossiers_verify(req: dict):
-    # We accept dict so users can post raw JSON; validate into model
+def _busy(e: Overloaded) -> HTTPException:
+    return HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "1"})
+
+# Bodies at least this large are hashed on the thread pool (hashlib releases the GIL); smaller ones inline.
+_HASH_INLINE_MAX = 64 * 1024
+
+async def _sha256(body: bytes) -> str:
+    if len(body) < _HASH_INLINE_MAX:
+        return hashlib.sha256(body).hexdigest()
+    return await run_in_threadpool(lambda: hashlib.sha256(body).hexdigest())
+
+async def _compute(fn: Callable[..., Any], body: bytes, admit: bool = True, with_digest: bool = False) -> Any:
+    # Identical concurrent bodies (same dossier, policy and context) share one computation; each new
+    # computation takes an admission slot until it finishes, so overload surfaces as a 429 instead of queueing.
+    # The body is hashed once; with_digest passes the hex digest on so the engine does not hash it again.
+    digest = await _sha256(body)
+    args = (body, digest) if with_digest else (body,)
+    async def run() -> Any:
+        if not admit:
+            return await BACKEND.run(fn, *args, size=len(body))
+        with ADMISSION.slot():
+            return await BACKEND.run(fn, *args, size=len(body))
+    return await COALESCE.do((fn.__name__, digest), run)
+
+async def _engine_call(request: Request, fn: Callable[..., Any], with_digest: bool = False) -> Any:
+    # Dossier-bearing bodies are passed to the engine as raw bytes and validated there in one step
+    body = await request.body()
     try:
-        from ..models import SoftwareOriginDossier
-        d = SoftwareOriginDossier.model_validate(req)
-    except Exception as e:
-        return VerifyResponse(ok=False, errors=[f"schema validation error: {e}"])
-    return verify_dossier(d)
+        return await _compute(fn, body, with_digest=with_digest)
+    except AssessError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+    except Overloaded as e:
+        raise _busy(e)
+
+async def _engine_response(request: Request, fn: Callable[[bytes], bytes]) -> Response:
+    return Response(content=await _engine_call(request, fn), media_type="application/json")
+
+def _audit(rec: Optional[AuditRecord]) -> None:
+    # decisions are audited in this process (engine calls may run in pool workers and only return the record)
+    if AUDIT is not None and rec is not None:
+        AUDIT.record(rec)
+
+async def _offload(fn, *args):
+    # blocking work outside the engine (baseline store, upload sessions) on the thread pool, under admission control
+    try:
+        with ADMISSION.slot():
+            return await run_in_threadpool(fn, *args)
+    except AssessError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+    except Overloaded as e:
+        raise _busy(e)
+
+@app.post("/v1/dossiers/verify", response_model=VerifyResponse)
+async def dossiers_verify(request: Request):
+    # Schema errors come back as ok=false rather than a 422
+    return await _engine_response(request, verify_json)
 
 @app.post("/v1/origin/score", response_model=ScoreResponse)
-def origin_score(req: ScoreRequest):
-    vr = verify_dossier(req.dossier)
-    if not vr.ok:
-        raise HTTPException(status_code=400, detail={"errors": vr.errors})
-    ocs, foi, signals, explanations = score_origin(req.dossier, req.weights, req.target_jurisdiction)
-    return ScoreResponse(ocs=ocs, foi=foi, signals=signals, explanations=explanations)
+async def origin_score(request: Request):
+    return await _engine_response(request, score_json)
+
+@app.post("/v1/origin/score:multi", response_model=MultiScoreResponse)
+async def origin_score_multi(request: Request):
+    # one score block per target jurisdiction, from a single SBOM traversal
+    return await _engine_response(request, score_multi_json)
 
 @app.post("/v1/policy/decide", response_model=DecisionResponse)
-def policy_decide(req: DecideRequest):
-    return decide(req.ocs, req.foi, req.policy_name, req.context)
+async def policy_decide(req: DecideRequest):
+    # get_policy may stat the policy file and recompile it, so this runs on the thread pool too
+    return await _offload(_decide, req)
+
+def _decide(req: DecideRequest) -> DecisionResponse:
+    try:
+        p = get_policy(req.policy_name)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except PolicyError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    with stage("decide"):
+        decision = p.decide(req.ocs, req.foi, req.context, explain=req.explain != "none")
+    record_verdict(req.policy_name, decision.verdict)
+    if AUDIT is not None and "log_audit" in decision.actions:
+        _audit(AuditRecord("decide", hashlib.sha256(req.model_dump_json().encode()).hexdigest(), req.policy_name, p.version,
+                           decision.verdict, req.ocs, req.foi, decision.fee_usd))
+    return decision
+
+@app.post("/v1/policies/reload")
+async def policies_reload(name: str | None = None):
+    try:
+        compiled = await run_in_threadpool(REGISTRY.reload, name)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except PolicyError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    return {"reloaded": {n: p.version for n, p in compiled.items()}}
 
 @app.post("/v1/assess", response_model=AssessResponse)
-def assess(req: AssessRequest):
-    vr = verify_dossier(req.dossier)
-    if not vr.ok:
-        raise HTTPException(status_code=400, detail={"errors": vr.errors})
-    ocs, foi, signals, explanations = score_origin(req.dossier, target=req.target_jurisdiction, weights=__import__("origingate.models", fromlist=["ScoreWeights"]).ScoreWeights())
-    decision = decide(ocs, foi, req.policy_name, req.context)
-    return AssessResponse(**decision.model_dump(), ocs=ocs, foi=foi, explanations=explanations)
+async def assess(request: Request):
+    # Raw body goes to the execution backend, so large dossiers are parsed in a pool worker
+    out, rec = await _engine_call(request, assess_audited, with_digest=True)
+    _audit(rec)
+    return Response(content=out, media_type="application/json")
+
+# Chunked uploads: sessions hold running SBOM accumulators in this process, so they stay on the thread pool
+@app.post("/v1/dossiers/sessions", response_model=SessionInfo)
+async def open_session(request: Request):
+    out = await _offload(open_session_json, await request.body())
+    return Response(content=out, media_type="application/json")
+
+@app.post("/v1/dossiers/sessions/{session_id}/components", response_model=SessionInfo)
+async def session_components(session_id: str, request: Request, seq: Optional[int] = None):
+    out = await _offload(add_components_json, session_id, await request.body(), seq)
+    return Response(content=out, media_type="application/json")
+
+@app.post("/v1/dossiers/sessions/{session_id}/finalize", response_model=AssessResponse)
+async def session_finalize(session_id: str):
+    out, rec = await _offload(finalize_session, session_id)
+    _audit(rec)
+    return Response(content=out, media_type="application/json")
+
+@app.delete("/v1/dossiers/sessions/{session_id}")
+async def delete_session(session_id: str):
+    return await run_in_threadpool(abort_session, session_id)
+
+# Upper bound on a single NDJSON line; longer lines are reported as errors and skipped.
+BATCH_MAX_LINE_BYTES = int(os.environ.get("ORIGINGATE_BATCH_MAX_LINE_BYTES", 64 * 1024 * 1024))
+
+async def _ndjson_lines(chunks: AsyncIterator[bytes], max_line: int) -> AsyncIterator[Optional[bytes]]:
+    # Yields one bytes object per line (None for an oversized line) without buffering more than max_line bytes.
+    buf = bytearray()
+    overflow = False
+    async for chunk in chunks:
+        start = 0
+        while True:
+            nl = chunk.find(b"\n", start)
+            end = len(chunk) if nl < 0 else nl
+            if not overflow:
+                buf += chunk[start:end]
+                if len(buf) > max_line:
+                    overflow = True
+                    buf.clear()
+            if nl < 0:
+                break
+            yield None if overflow else bytes(buf)
+            buf.clear()
+            overflow = False
+            start = nl + 1
+    if overflow:
+        yield None
+    elif buf.strip():
+        yield bytes(buf)
+
+class _DuplexStreamingResponse(StreamingResponse):
+    # StreamingResponse normally drains receive() to watch for disconnects, which races the
+    # handler still reading the request body; here a disconnect surfaces via request.stream().
+    async def __call__(self, scope, receive, send) -> None:
+        await self.stream_response(send)
+
+def _line_error(status_code: int, detail: Any) -> bytes:
+    return b'"error": ' + json.dumps({"status_code": status_code, "detail": detail}).encode()
+
+async def _assess_line(line: bytes) -> bytes:
+    # a failing line becomes an "error" object; nothing raised here may end the stream for the other lines
+    try:
+        out, rec = await _compute(assess_audited, line, admit=False, with_digest=True)
+        _audit(rec)
+        return b'"result": ' + out
+    except AssessError as e:
+        return _line_error(e.status_code, e.detail)
+    except PolicyError as e:
+        return _line_error(503, str(e))
+    except Exception:
+        log.exception("batch line failed")
+        return _line_error(500, "internal error while assessing this line")
+
+@app.post("/v1/assess:batch")
+async def assess_batch(request: Request):
+    # NDJSON in, NDJSON out: one {"line", "result"|"error"} object per non-empty input line, in input order.
+    # Up to BACKEND.max_in_flight lines are assessed concurrently; that window is the batch's own backpressure,
+    # so lines skip per-computation admission and only the batch as a whole is refused when the server is saturated.
+    try:
+        ADMISSION.check()
+    except Overloaded as e:
+        raise _busy(e)
+    async def results():
+        n = 0
+        pending: collections.deque = collections.deque()
+        async for line in _ndjson_lines(request.stream(), BATCH_MAX_LINE_BYTES):
+            n += 1
+            if line is None:
+                fut = asyncio.get_running_loop().create_future()
+                fut.set_result(_line_error(413, f"line exceeds {BATCH_MAX_LINE_BYTES} bytes"))
+            elif not line.strip():
+                continue
+            else:
+                fut = asyncio.ensure_future(_assess_line(line))
+            pending.append((n, fut))
+            if len(pending) >= BACKEND.max_in_flight:
+                ln, fut = pending.popleft()
+                yield b'{"line": %d, ' % ln + await fut + b"}\n"
+        while pending:
+            ln, fut = pending.popleft()
+            yield b'{"line": %d, ' % ln + await fut + b"}\n"
+    return _DuplexStreamingResponse(results(), media_type="application/x-ndjson")
+
+def _parse(model, body: bytes):
+    try:
+        return parse(model, body)
+    except AssessError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+
+def _require_verified(d) -> None:
+    try:
+        require_verified(d)
+    except AssessError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
 
 @app.post("/v1/baselines", response_model=BaselineCreateResponse)
-def create_baseline(req: BaselineCreateRequest):
-    vr = verify_dossier(req.dossier)
-    if not vr.ok:
-        raise HTTPException(status_code=400, detail={"errors": vr.errors})
-    from ..models import ScoreWeights
-    ocs, foi, _, _ = score_origin(req.dossier, ScoreWeights(), req.target_jurisdiction)
-    put_baseline(Baseline(baseline_id=req.baseline_id, ocs0=ocs, foi0=foi, artifact_digest=req.dossier.artifact.digest))
+async def create_baseline(request: Request):
+    # baselines live in this process's store, so they always run on the thread pool
+    return await _offload(_create_baseline, await request.body())
+
+def _create_baseline(body: bytes) -> BaselineCreateResponse:
+    req = _parse(BaselineCreateRequest, body)
+    _require_verified(req.dossier)
+    _, (ocs, foi, _, _) = score_cached(req.dossier, DEFAULT_WEIGHTS, req.target_jurisdiction, detail="none")
+    put_baseline(baseline_from_dossier(req.baseline_id, req.dossier, ocs, foi, req.target_jurisdiction))
     return BaselineCreateResponse(baseline_id=req.baseline_id, ocs0=ocs, foi0=foi)
 
+def _baseline_info(b: Baseline) -> BaselineInfo:
+    return BaselineInfo(baseline_id=b.baseline_id, artifact_digest=b.artifact_digest, product_name=b.product_name,
+                        product_version=b.product_version, ocs0=b.ocs0, foi0=b.foi0)
+
+@app.get("/v1/baselines", response_model=List[BaselineInfo])
+async def list_baselines(artifact_digest: Optional[str] = None, product_name: Optional[str] = None,
+                         product_version: Optional[str] = None, limit: int = Query(100, ge=1, le=1000)):
+    found = await run_in_threadpool(STORE.find, artifact_digest, product_name, product_version, limit)
+    return [_baseline_info(b) for b in found]
+
+@app.get("/v1/baselines/{baseline_id}", response_model=BaselineInfo)
+async def read_baseline(baseline_id: str):
+    b = await run_in_threadpool(get_baseline, baseline_id)
+    if not b:
+        raise HTTPException(status_code=404, detail="baseline not found")
+    return _baseline_info(b)
+
 @app.post("/v1/updates/evaluate", response_model=UpdateEvaluateResponse)
-def evaluate_update(req: UpdateEvaluateRequest):
+async def evaluate_update(request: Request):
+    return await _offload(_evaluate_update, await request.body())
+
+def _evaluate_update(body: bytes) -> UpdateEvaluateResponse:
+    req = _parse(UpdateEvaluateRequest, body)
     b = get_baseline(req.baseline_id)
     if not b:
         raise HTTPException(status_code=404, detail="baseline not found")
-    from ..models import ScoreWeights
     # Score update
-    vr = verify_dossier(req.dossier)
-    if not vr.ok:
-        raise HTTPException(status_code=400, detail={"errors": vr.errors})
-    ocs, foi, _, _ = score_origin(req.dossier, ScoreWeights(), "US")
+    _require_verified(req.dossier)
+    if b.components is None:
+        # legacy baseline without a component index: full rescore, no attribution
+        _, (ocs, foi, _, _) = score_cached(req.dossier, DEFAULT_WEIGHTS, b.target, detail="none")
+        changes, top = {}, []
+    else:
+        with stage("score"):
+            r = evaluate_drift(b.components, b.foi_sum, req.dossier, DEFAULT_WEIGHTS, b.target)
+        ocs, foi, changes = r.ocs, r.foi, r.changes
+        top = [DriftContributor(**asdict(t)) for t in r.top]
     drift = float(round(b.ocs0 - ocs, 4))
     reclassify = drift > float(req.drift_threshold)
-    decision = decide(ocs, foi, req.policy_name, req.context)
-    return UpdateEvaluateResponse(baseline_id=req.baseline_id, drift=drift, reclassify=reclassify, decision=decision)
+    try:
+        p = get_policy(req.policy_name)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    with stage("decide"):
+        decision = p.decide(ocs, foi, req.context, explain=req.explain != "none")
+    record_verdict(req.policy_name, decision.verdict)
+    if "log_audit" in decision.actions:
+        d = req.dossier
+        _audit(AuditRecord("update", hashlib.sha256(body).hexdigest(), req.policy_name, p.version, decision.verdict, ocs, foi,
+                           decision.fee_usd, d.product.name, d.product.version, d.artifact.digest, b.target))
+    return UpdateEvaluateResponse(baseline_id=req.baseline_id, drift=drift, reclassify=reclassify, decision=decision,
+                                  foi_drift=float(round(foi - b.foi0, 4)), changes=changes, top_contributors=top)
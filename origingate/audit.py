@@ -0,0 +1,330 @@
+from __future__ import annotations
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import fcntl, glob, gzip, heapq, json, os, queue, re, threading, time
+from .metrics import METRICS
+
+# Append-only decision audit log. The request path only enqueues (bounded, non-blocking); a single
+# writer thread drains the queue in batches, appends them to the active segment as JSON lines and
+# fsyncs once per batch (group commit). Full segments are sealed: gzip-compressed, with a small
+# .idx.json summary (time range, products, verdicts, policies) that lets queries skip them unread.
+#
+# Each writer (one per process, e.g. per uvicorn worker) claims a slot directory by holding an exclusive
+# flock on its LOCK file, so writers sharing ORIGINGATE_AUDIT_DIR never touch each other's segments. A slot
+# whose lock is free belongs to nobody alive: the next writer to claim it seals what its last owner left.
+#
+# Layout of ORIGINGATE_AUDIT_DIR:
+#   w000/LOCK                     held by the slot's live writer
+#   w000/seg-00000042.jsonl       active segment (at most one per slot; left over after a crash, sealed on next claim)
+#   w000/seg-00000041.jsonl.gz    sealed segment
+#   w000/seg-00000041.idx.json    its summary
+
+AUDIT_DIR = os.environ.get("ORIGINGATE_AUDIT_DIR", "")
+
+@dataclass(frozen=True)
+class AuditRecord:
+    """One decision; the log line adds "ts" (epoch seconds, taken at enqueue time)."""
+    kind: str                # assess | session | decide | update
+    inputs_hash: str         # sha256 of the request input(s)
+    policy: str
+    policy_version: str
+    verdict: str
+    ocs: float
+    foi: float
+    fee_usd: float
+    product: str = ""
+    product_version: str = ""
+    artifact_digest: str = ""
+    target: str = ""
+
+_SEG = re.compile(r"seg-(\d{8})\.jsonl(\.gz)?$")
+
+def _seg_path(directory: str, seq: int, suffix: str) -> str:
+    return os.path.join(directory, f"seg-{seq:08d}{suffix}")
+
+def _claim_slot(directory: str) -> Tuple[str, Any]:
+    """First slot directory whose LOCK is free, with the open (flocked) lock file; held until closed."""
+    k = 0
+    while True:
+        slot = os.path.join(directory, f"w{k:03d}")
+        os.makedirs(slot, exist_ok=True)
+        lock = open(os.path.join(slot, "LOCK"), "ab")
+        try:
+            fcntl.flock(lock.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return slot, lock
+        except BlockingIOError:
+            lock.close()
+            k += 1
+
+class _Summary:
+    __slots__ = ("first_ts", "last_ts", "records", "products", "verdicts", "policies")
+
+    def __init__(self):
+        self.first_ts = self.last_ts = None
+        self.records = 0
+        self.products: Dict[str, None] = {}
+        self.verdicts: Dict[str, int] = {}
+        self.policies: Dict[str, None] = {}
+
+    def add(self, ts: float, product: str, verdict: str, policy: str) -> None:
+        if self.first_ts is None:
+            self.first_ts = ts
+        self.last_ts = ts
+        self.records += 1
+        self.products[product] = None
+        self.verdicts[verdict] = self.verdicts.get(verdict, 0) + 1
+        self.policies[policy] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"first_ts": self.first_ts, "last_ts": self.last_ts, "records": self.records,
+                "products": sorted(self.products), "verdicts": self.verdicts, "policies": sorted(self.policies)}
+
+class AuditLog:
+    def __init__(self, directory: str, segment_bytes: int = 64 * 1024 * 1024, segment_seconds: float = 3600.0,
+                 max_queue: int = 65536, batch_max: int = 4096, fsync: bool = True):
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.segment_seconds = segment_seconds
+        self.batch_max = batch_max
+        self.fsync = fsync
+        self.slot = ""  # claimed by start()
+        self._lock = None
+        self._q: "queue.Queue[Optional[Tuple[float, AuditRecord]]]" = queue.Queue(maxsize=max_queue)
+        self._thread: Optional[threading.Thread] = None
+        self._sealers: List[threading.Thread] = []
+        self._f = None
+        self._seq = 0
+        self._opened = 0.0
+        self._summary = _Summary()
+
+    @classmethod
+    def from_env(cls) -> Optional["AuditLog"]:
+        if not AUDIT_DIR:
+            return None
+        return cls(
+            AUDIT_DIR,
+            segment_bytes=int(os.environ.get("ORIGINGATE_AUDIT_SEGMENT_BYTES", str(64 * 1024 * 1024))),
+            segment_seconds=float(os.environ.get("ORIGINGATE_AUDIT_SEGMENT_SECONDS", "3600")),
+            max_queue=int(os.environ.get("ORIGINGATE_AUDIT_QUEUE", "65536")),
+            fsync=os.environ.get("ORIGINGATE_AUDIT_FSYNC", "1") == "1",
+        )
+
+    # --- request path ---------------------------------------------------------------
+
+    def record(self, rec: AuditRecord) -> bool:
+        """Enqueues without blocking; when the queue is full the record is dropped and counted."""
+        try:
+            self._q.put_nowait((time.time(), rec))
+            return True
+        except queue.Full:
+            METRICS.inc("origingate_audit_dropped_total")
+            return False
+
+    def stats(self) -> Dict[str, int]:
+        return {"queued": self._q.qsize(), "segment": self._seq}
+
+    # --- writer ---------------------------------------------------------------------
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self.slot, self._lock = _claim_slot(self.directory)
+        seqs = []
+        for path in glob.glob(os.path.join(self.slot, "seg-*.jsonl*")):
+            m = _SEG.search(path)
+            if m:
+                seqs.append(int(m.group(1)))
+                if not m.group(2):
+                    self._seal(path, None)  # unsealed leftover from the slot's previous (dead) owner
+        self._seq = max(seqs, default=0)
+        self._open_segment()
+        self._thread = threading.Thread(target=self._run, name="origingate-audit", daemon=True)
+        self._thread.start()
+
+    def close(self) -> None:
+        if self._thread is None:
+            return
+        self._q.put(None)
+        self._thread.join()
+        self._thread = None
+        self._rotate(reopen=False)
+        for t in self._sealers:
+            t.join()
+        self._sealers.clear()
+        self._lock.close()  # releases the slot
+        self._lock = None
+
+    def _open_segment(self) -> None:
+        self._seq += 1
+        self._f = open(_seg_path(self.slot, self._seq, ".jsonl"), "ab")
+        self._opened = time.monotonic()
+        self._summary = _Summary()
+
+    def _run(self) -> None:
+        q, f_dumps = self._q, json.dumps
+        while True:
+            item = q.get()
+            batch = [item]
+            # group commit: everything queued while the previous batch was being written goes in this one
+            while item is not None and len(batch) < self.batch_max:
+                try:
+                    item = q.get_nowait()
+                except queue.Empty:
+                    break
+                batch.append(item)
+            stop = batch[-1] is None
+            lines = []
+            for entry in batch:
+                if entry is None:
+                    continue
+                ts, rec = entry
+                lines.append(f_dumps({"ts": ts, **asdict(rec)}, separators=(",", ":")))
+                self._summary.add(ts, rec.product, rec.verdict, rec.policy)
+            if lines:
+                try:
+                    with METRICS.time("origingate_audit_commit_seconds"):
+                        self._f.write(("\n".join(lines) + "\n").encode())
+                        self._f.flush()
+                        if self.fsync:
+                            os.fsync(self._f.fileno())
+                    METRICS.inc("origingate_audit_records_total", value=float(len(lines)))
+                except OSError:
+                    METRICS.inc("origingate_audit_dropped_total", value=float(len(lines)))
+            if stop:
+                return
+            if self._f.tell() >= self.segment_bytes or time.monotonic() - self._opened >= self.segment_seconds:
+                self._rotate()
+
+    def _rotate(self, reopen: bool = True) -> None:
+        f, summary = self._f, self._summary
+        f.close()
+        self._f = None
+        if reopen:
+            self._open_segment()
+        if summary.records == 0:
+            os.unlink(f.name)
+            return
+        # compression happens off the writer thread so appends are not held up
+        t = threading.Thread(target=self._seal, args=(f.name, summary), name="origingate-audit-seal", daemon=True)
+        self._sealers = [s for s in self._sealers if s.is_alive()] + [t]
+        t.start()
+
+    @staticmethod
+    def _seal(path: str, summary: Optional[_Summary]) -> None:
+        if summary is None:
+            summary = _Summary()
+            with open(path, "rb") as f:
+                data = f.read()
+            keep = data[:data.rfind(b"\n") + 1]  # drop a torn final line
+            for line in keep.splitlines():
+                r = json.loads(line)
+                summary.add(r["ts"], r.get("product", ""), r["verdict"], r["policy"])
+            if len(keep) != len(data):
+                with open(path, "r+b") as f:
+                    f.truncate(len(keep))
+            if not summary.records:
+                os.unlink(path)
+                return
+        base = path[:-len(".jsonl")]
+        with open(path, "rb") as src, gzip.open(path + ".gz.tmp", "wb", compresslevel=6) as dst:
+            while True:
+                chunk = src.read(1 << 20)
+                if not chunk:
+                    break
+                dst.write(chunk)
+        os.replace(path + ".gz.tmp", path + ".gz")
+        with open(base + ".idx.json.tmp", "w", encoding="utf-8") as f:
+            json.dump(summary.to_dict(), f)
+        os.replace(base + ".idx.json.tmp", base + ".idx.json")
+        os.unlink(path)
+
+# --- queries -------------------------------------------------------------------------
+
+def _segments(directory: str) -> List[Tuple[int, str]]:
+    found: Dict[int, str] = {}
+    for path in glob.glob(os.path.join(directory, "seg-*.jsonl*")):
+        m = _SEG.search(path)
+        if m and (int(m.group(1)) not in found or not m.group(2)):
+            found[int(m.group(1))] = path  # an unsealed file wins over a half-written .gz
+    return sorted(found.items())
+
+def _skip(idx: Dict[str, Any], product: Optional[str], verdict: Optional[str], policy: Optional[str],
+          since: Optional[float], until: Optional[float]) -> bool:
+    return ((since is not None and idx["last_ts"] < since) or (until is not None and idx["first_ts"] >= until)
+            or (product is not None and product not in idx["products"])
+            or (verdict is not None and not idx["verdicts"].get(verdict))
+            or (policy is not None and policy not in idx["policies"]))
+
+def scan(directory: str, product: Optional[str] = None, verdict: Optional[str] = None, policy: Optional[str] = None,
+         since: Optional[float] = None, until: Optional[float] = None) -> Iterator[Dict[str, Any]]:
+    """Records matching every given filter (time range is [since, until)), oldest first across all writer slots.
+
+    Sealed segments whose summary rules them out are not opened; within a segment, lines are
+    pre-filtered on their raw bytes and only candidates are parsed.
+    """
+    needles = [(b'"%s":' % k.encode()) + json.dumps(v).encode() for k, v in
+               (("product", product), ("verdict", verdict), ("policy", policy)) if v is not None]
+    slots = sorted(glob.glob(os.path.join(directory, "w[0-9][0-9][0-9]"))) + [directory]  # + segments from before slots
+    return heapq.merge(*(_scan_slot(slot, needles, product, verdict, policy, since, until) for slot in slots),
+                       key=lambda r: r["ts"])
+
+def _scan_slot(directory: str, needles: List[bytes], product: Optional[str], verdict: Optional[str], policy: Optional[str],
+               since: Optional[float], until: Optional[float]) -> Iterator[Dict[str, Any]]:
+    for seq, path in _segments(directory):
+        if path.endswith(".gz"):
+            try:
+                with open(_seg_path(directory, seq, ".idx.json"), "r", encoding="utf-8") as f:
+                    if _skip(json.load(f), product, verdict, policy, since, until):
+                        continue
+            except FileNotFoundError:
+                pass
+        opener = gzip.open if path.endswith(".gz") else open
+        with opener(path, "rb") as f:
+            for line in f:
+                if not line.endswith(b"\n") or not all(n in line for n in needles):
+                    continue
+                r = json.loads(line)
+                if (since is not None and r["ts"] < since) or (until is not None and r["ts"] >= until):
+                    continue
+                yield r
+
+def _when(s: str) -> float:
+    try:
+        return float(s)
+    except ValueError:
+        dt = datetime.fromisoformat(s)
+        return (dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)).timestamp()
+
+AUDIT = AuditLog.from_env()
+
+if __name__ == "__main__":
+    import argparse, csv, sys
+    ap = argparse.ArgumentParser(description="Query the decision audit log")
+    ap.add_argument("--dir", default=AUDIT_DIR or "audit", help="audit directory (default: $ORIGINGATE_AUDIT_DIR)")
+    ap.add_argument("--product")
+    ap.add_argument("--verdict")
+    ap.add_argument("--policy")
+    ap.add_argument("--since", help="ISO 8601 time (UTC if no offset) or epoch seconds, inclusive")
+    ap.add_argument("--until", help="ISO 8601 time (UTC if no offset) or epoch seconds, exclusive")
+    ap.add_argument("--format", choices=("jsonl", "csv", "summary"), default="jsonl",
+                    help="summary: counts per product and verdict")
+    args = ap.parse_args()
+    rows = scan(args.dir, args.product, args.verdict, args.policy,
+                _when(args.since) if args.since else None, _when(args.until) if args.until else None)
+    if args.format == "jsonl":
+        for r in rows:
+            sys.stdout.write(json.dumps(r) + "\n")
+    elif args.format == "csv":
+        fields = ["ts", *AuditRecord.__dataclass_fields__]
+        w = csv.DictWriter(sys.stdout, fieldnames=fields)
+        w.writeheader()
+        for r in rows:
+            w.writerow(r)
+    else:
+        counts: Dict[Tuple[str, str], int] = {}
+        for r in rows:
+            key = (r["product"], r["verdict"])
+            counts[key] = counts.get(key, 0) + 1
+        for (product, verdict), n in sorted(counts.items()):
+            print(f"{product}\t{verdict}\t{n}")
@@ -0,0 +1,86 @@
+from __future__ import annotations
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+import hashlib, json, os, threading, time
+from .models import SoftwareOriginDossier, ScoreWeights
+
+class ResultCache:
+    """Thread-safe LRU with a per-entry TTL and optional tags for bulk invalidation."""
+
+    def __init__(self, maxsize: int = 4096, ttl: float = 600.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._d: "OrderedDict[Hashable, Tuple[float, str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @classmethod
+    def from_env(cls) -> "ResultCache":
+        return cls(
+            maxsize=int(os.environ.get("ORIGINGATE_CACHE_SIZE", "4096")),
+            ttl=float(os.environ.get("ORIGINGATE_CACHE_TTL", "600")),
+        )
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._d.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if time.monotonic() - entry[0] > self.ttl:
+                del self._d[key]
+                self.evictions += 1
+                self.misses += 1
+                return None
+            self._d.move_to_end(key)
+            self.hits += 1
+            return entry[2]
+
+    def put(self, key: Hashable, value: Any, tag: str = "") -> None:
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._d[key] = (time.monotonic(), tag, value)
+            self._d.move_to_end(key)
+            while len(self._d) > self.maxsize:
+                self._d.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate_tag(self, tag: str) -> int:
+        with self._lock:
+            stale = [k for k, (_, t, _) in self._d.items() if t == tag]
+            for k in stale:
+                del self._d[k]
+        return len(stale)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._d.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {"size": len(self._d), "hits": self.hits, "misses": self.misses, "evictions": self.evictions}
+
+def _sha256(*parts: bytes) -> str:
+    h = hashlib.sha256()
+    for p in parts:
+        h.update(p)
+        h.update(b"\0")
+    return h.hexdigest()
+
+def dossier_digest(d: SoftwareOriginDossier) -> str:
+    # canonical form = validated model re-serialized, so formatting/key order of the request does not matter
+    return _sha256(d.model_dump_json().encode())
+
+def score_key(dossier_hash: str, weights: ScoreWeights, target: str, detail: str = "full") -> str:
+    return "score:" + _sha256(dossier_hash.encode(), weights.model_dump_json().encode(), target.encode(), detail.encode())
+
+def assess_key(skey: str, policy_name: str, policy_version: str, context: Dict[str, Any]) -> str:
+    ctx = json.dumps(context, sort_keys=True, separators=(",", ":"), default=str)
+    return "assess:" + _sha256(skey.encode(), policy_name.encode(), policy_version.encode(), ctx.encode())
+
+def policy_tag(policy_name: str) -> str:
+    return f"policy:{policy_name}"
+
+RESULTS = ResultCache.from_env()
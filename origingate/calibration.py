@@ -0,0 +1,226 @@
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Sequence, Tuple
+import json, os
+from .models import ScoreWeights, SoftwareOriginDossier
+from .scoring import PortfolioScores, pack_portfolio, score_columns
+
+if TYPE_CHECKING:
+    import numpy as np
+
+# Policy calibration: score a labelled portfolio once into per-dossier signal vectors, then evaluate
+# grids of ScoreWeights x tau x gamma x review band without rescoring. OCS is linear in the weights
+# (O_c only depends on the criticality table), so each weight vector costs one matrix-vector product;
+# thresholds are swept with prefix counts over the OCS-sorted portfolio.
+#
+# A dossier counts as "flagged" when its verdict is anything but ALLOW; ground truth is foreign-dominant
+# (label "foreign" or "laundered"). benchmarks/run_eval uses the same definitions.
+
+FOREIGN_LABELS = ("foreign", "laundered")
+FLAGGED_LABEL = "flagged = verdict other than ALLOW"
+
+def flagged(verdict: str) -> bool:
+    return verdict != "ALLOW"
+
+@dataclass
+class Signals:
+    O_b: "np.ndarray"
+    O_c: "np.ndarray"
+    O_s: "np.ndarray"
+    O_h: "np.ndarray"
+    foi: "np.ndarray"   # rounded like score_origin
+    truth: "np.ndarray" # bool, foreign-dominant ground truth
+
+    def __len__(self) -> int:
+        return len(self.foi)
+
+def _concat(parts: List[Tuple[PortfolioScores, "np.ndarray", "np.ndarray"]]) -> Signals:
+    import numpy as np
+    cat = lambda get: np.concatenate([get(s)[ok] for s, _, ok in parts]) if parts else np.zeros(0)
+    return Signals(O_b=cat(lambda s: s.O_b), O_c=cat(lambda s: s.O_c), O_s=cat(lambda s: s.O_s), O_h=cat(lambda s: s.O_h),
+                   foi=cat(lambda s: s.foi), truth=np.concatenate([t[ok] for _, t, ok in parts]) if parts else np.zeros(0, dtype=bool))
+
+def collect_signals(portfolio: str, target: str = "US", chunk_size: int = 10_000) -> Signals:
+    """Scores a columnar .ogp file or a JSON portfolio directory once; dossiers failing verification are dropped."""
+    import numpy as np
+    from .verify import verify_dossier
+
+    w = ScoreWeights()
+    parts = []
+    if portfolio.endswith(".ogp"):
+        from .portfolio import ColumnarPortfolio
+        p = ColumnarPortfolio(portfolio)
+        for start, cols in p.iter_columns(target, chunk_size):
+            stop = start + len(cols)
+            truth = np.array([l in FOREIGN_LABELS for l in p.labels(start, stop)], dtype=bool)
+            ok = np.array([not p.verify_errors(i) for i in range(start, stop)], dtype=bool)
+            parts.append((score_columns(cols, w), truth, ok))
+        return _concat(parts)
+
+    with open(os.path.join(portfolio, "labels.json"), "r", encoding="utf-8") as f:
+        labels = json.load(f)
+    for i in range(0, len(labels), chunk_size):
+        rows = labels[i:i + chunk_size]
+        dossiers = []
+        for row in rows:
+            with open(os.path.join(portfolio, row["file"]), "rb") as f:
+                dossiers.append(SoftwareOriginDossier.model_validate_json(f.read()))
+        truth = np.array([row["class"] in FOREIGN_LABELS for row in rows], dtype=bool)
+        ok = np.array([verify_dossier(d).ok for d in dossiers], dtype=bool)
+        parts.append((score_columns(pack_portfolio(dossiers, target), w), truth, ok))
+    return _concat(parts)
+
+@dataclass
+class SweepResult:
+    """One row per candidate (weights, tau, gamma, review band); counts are over the portfolio."""
+    weights: "np.ndarray"      # (K, 4): w_build, w_sbom, w_signing, w_hosting
+    tau: "np.ndarray"
+    gamma: "np.ndarray"
+    review_low: "np.ndarray"   # NaN = no review band
+    review_high: "np.ndarray"
+    tp: "np.ndarray"
+    fp: "np.ndarray"
+    fn: "np.ndarray"
+    tn: "np.ndarray"
+    allow: "np.ndarray"
+    review: "np.ndarray"
+    allow_with_fee: "np.ndarray"
+    deny: "np.ndarray"
+    fee_usd: "np.ndarray"
+
+    def __len__(self) -> int:
+        return len(self.tau)
+
+    @property
+    def precision(self) -> "np.ndarray":
+        import numpy as np
+        d = self.tp + self.fp
+        return np.divide(self.tp, d, out=np.zeros(len(self), dtype=np.float64), where=d > 0)
+
+    @property
+    def recall(self) -> "np.ndarray":
+        import numpy as np
+        d = self.tp + self.fn
+        return np.divide(self.tp, d, out=np.zeros(len(self), dtype=np.float64), where=d > 0)
+
+    @property
+    def f1(self) -> "np.ndarray":
+        import numpy as np
+        p, r = self.precision, self.recall
+        return np.divide(2 * p * r, p + r, out=np.zeros(len(self), dtype=np.float64), where=(p + r) > 0)
+
+    def row(self, i: int) -> Dict[str, float]:
+        w = self.weights[i]
+        return {
+            "w_build": float(w[0]), "w_sbom": float(w[1]), "w_signing": float(w[2]), "w_hosting": float(w[3]),
+            "tau": float(self.tau[i]), "gamma": float(self.gamma[i]),
+            "review_low": float(self.review_low[i]), "review_high": float(self.review_high[i]),
+            "tp": int(self.tp[i]), "fp": int(self.fp[i]), "fn": int(self.fn[i]), "tn": int(self.tn[i]),
+            "precision": float(self.precision[i]), "recall": float(self.recall[i]), "f1": float(self.f1[i]),
+            "allow": int(self.allow[i]), "review": int(self.review[i]),
+            "allow_with_fee": int(self.allow_with_fee[i]), "deny": int(self.deny[i]), "fee_usd": float(self.fee_usd[i]),
+        }
+
+    def top(self, k: int = 10, key: str = "f1") -> List[Dict[str, float]]:
+        import numpy as np
+        order = np.argsort(-getattr(self, key), kind="stable")[:k]
+        return [self.row(int(i)) for i in order]
+
+def weight_grid(step: float = 0.1) -> "np.ndarray":
+    """Every (w_build, w_sbom, w_signing, w_hosting) on the simplex with the given step."""
+    import numpy as np
+    n = int(round(1.0 / step))
+    rows = [(a, b, c, n - a - b - c) for a in range(n + 1) for b in range(n + 1 - a) for c in range(n + 1 - a - b)]
+    return np.array(rows, dtype=np.float64) / n
+
+def sweep(
+    signals: Signals,
+    weights: "np.ndarray",
+    taus: Sequence[float],
+    gammas: Sequence[float],
+    review_bands: Iterable[Optional[Tuple[float, Optional[float]]]] = (None,),
+    fee_enabled: bool = True,
+    fee_rate: float = 0.10,
+    usage_usd: float = 1_000_000.0,
+) -> SweepResult:
+    """Evaluates every combination of weights x taus x gammas x review_bands.
+
+    review_bands: None for no band, or (ocs_low, ocs_high); ocs_high=None means "up to tau", as in policy YAML.
+    Verdict semantics follow CompiledPolicy.decide (review band first, then allow / foreign-dominant / deny);
+    with fee_enabled, fee_usd sums the rounded per-dossier fee over ALLOW and ALLOW_WITH_FEE verdicts.
+    """
+    import numpy as np
+
+    W = np.atleast_2d(np.asarray(weights, dtype=np.float64))
+    taus = np.asarray(taus, dtype=np.float64)
+    gammas = np.asarray(gammas, dtype=np.float64)
+    bands = list(review_bands)
+    low = np.array([np.inf if b is None else b[0] for b in bands], dtype=np.float64)
+    high = np.array([np.inf if b is None else (np.nan if b[1] is None else b[1]) for b in bands], dtype=np.float64)
+    G, T, B, n = len(gammas), len(taus), len(bands), len(signals)
+    truth = signals.truth
+    n_true = int(truth.sum())
+
+    def prefix(x: "np.ndarray") -> "np.ndarray":
+        out = np.zeros(x.shape[:-1] + (x.shape[-1] + 1,), dtype=np.float64)
+        np.cumsum(x, axis=-1, out=out[..., 1:])
+        return out
+
+    gi = np.arange(G)[:, None, None]
+    out: Dict[str, List["np.ndarray"]] = {k: [] for k in ("tp", "fp", "fn", "tn", "allow", "review", "awf", "fee")}
+    for w in W:
+        # same summation order as score_columns, then rounded like score_origin
+        ocs = np.round(w[0] * signals.O_b + w[1] * signals.O_c + w[2] * signals.O_s + w[3] * signals.O_h, 4)
+        order = np.argsort(ocs, kind="stable")
+        so, t, f = ocs[order], truth[order], signals.foi[order]
+        le = f[None, :] <= gammas[:, None]                                 # (G, n)
+        Tle, Ale = prefix(le & t), prefix(le.astype(np.float64))
+        Tgt, Agt = prefix(~le & t), prefix((~le).astype(np.float64))
+        # per-dossier fee, rounded like decide(); charged on ALLOW and ALLOW_WITH_FEE alike
+        fee = np.round(usage_usd * fee_rate * (1.0 - so), 2)
+        Fle, Fgt = prefix(np.where(le, fee, 0.0)), prefix(np.where(~le, fee, 0.0))
+        Rt, Ra = prefix(t.astype(np.float64)), prefix(np.ones(n))
+
+        # index of the first dossier with ocs >= x; intervals [a, b) of OCS become index ranges
+        idx = lambda x: np.searchsorted(so, x, side="left")
+        it = np.broadcast_to(idx(taus)[None, :, None], (G, T, B))
+        ilo = np.broadcast_to(idx(low)[None, None, :], (G, T, B))
+        hi_val = np.where(np.isnan(high)[None, :], taus[:, None], high[None, :])  # (T, B)
+        ihi = np.broadcast_to(idx(hi_val)[None, :, :], (G, T, B))
+        band = lambda C, a, b: C[gi, np.maximum(a, b)] - C[gi, a]  # count in [a, b), 0 if b <= a
+        band1 = lambda C, a, b: C[np.maximum(a, b)] - C[a]
+
+        allow_t = (Tle[:, n][:, None, None] - Tle[gi, it]) - band(Tle, np.maximum(ilo, it), ihi)
+        allow_a = (Ale[:, n][:, None, None] - Ale[gi, it]) - band(Ale, np.maximum(ilo, it), ihi)
+        review_a = np.broadcast_to(band1(Ra, ilo[0], ihi[0])[None], (G, T, B))
+        fd_a = Agt[gi, it] - band(Agt, ilo, np.minimum(ihi, it))
+        allow_fee = (Fle[:, n][:, None, None] - Fle[gi, it]) - band(Fle, np.maximum(ilo, it), ihi)
+        fd_fee = Fgt[gi, it] - band(Fgt, ilo, np.minimum(ihi, it))
+
+        out["tp"].append((n_true - allow_t).ravel())
+        out["fp"].append(((n - n_true) - (allow_a - allow_t)).ravel())
+        out["fn"].append(allow_t.ravel())
+        out["tn"].append((allow_a - allow_t).ravel())
+        out["allow"].append(allow_a.ravel())
+        out["review"].append(review_a.ravel())
+        out["awf"].append(fd_a.ravel())
+        out["fee"].append((allow_fee + fd_fee).ravel())
+
+    K = G * T * B
+    cat = lambda k: np.rint(np.concatenate(out[k])).astype(np.int64)
+    awf = cat("awf")
+    allow, review = cat("allow"), cat("review")
+    fee_usd = np.round(np.concatenate(out["fee"]), 2) if fee_enabled else np.zeros(K * len(W))
+    return SweepResult(
+        weights=np.repeat(W, K, axis=0),
+        tau=np.tile(np.broadcast_to(taus[None, :, None], (G, T, B)).ravel(), len(W)),
+        gamma=np.tile(np.broadcast_to(gammas[:, None, None], (G, T, B)).ravel(), len(W)),
+        review_low=np.tile(np.broadcast_to(np.where(np.isinf(low), np.nan, low)[None, None, :], (G, T, B)).ravel(), len(W)),
+        review_high=np.tile(np.broadcast_to(np.where(np.isinf(high)[None, :], np.nan, hi_val)[None], (G, T, B)).ravel(), len(W)),
+        tp=cat("tp"), fp=cat("fp"), fn=cat("fn"), tn=cat("tn"),
+        allow=allow,
+        review=review,
+        allow_with_fee=awf if fee_enabled else np.zeros_like(awf),
+        deny=n - allow - review - (awf if fee_enabled else 0),
+        fee_usd=fee_usd,
+    )
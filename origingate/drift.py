@@ -0,0 +1,99 @@
+from __future__ import annotations
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Tuple
+import heapq
+from .models import ScoreWeights, SoftwareOriginDossier
+from .scoring import _oc_from_foi, _signal_build, _signal_hosting, _signal_signing, component_contrib
+from .jurisdiction import INDEX
+
+# Per-component FOI contribution index stored with a baseline:
+#   key -> [version, supplier (canonical code), criticality, foreign_control_risk, contrib (unscaled)]
+# Keys are component names; repeated names get a "#n" suffix by occurrence.
+ComponentIndex = Dict[str, list]
+
+TOP_K_DRIFT = 10
+
+@dataclass
+class DriftContribution:
+    component: str
+    change: str  # added | removed | version_bumped | supplier_changed | modified
+    foi_delta: float
+    from_version: Optional[str] = None
+    to_version: Optional[str] = None
+
+@dataclass
+class DriftResult:
+    ocs: float
+    foi: float
+    foi_sum: float
+    changes: Dict[str, int] = field(default_factory=dict)
+    top: List[DriftContribution] = field(default_factory=list)
+
+def _keyed(d: SoftwareOriginDossier) -> Iterator[Tuple[str, object]]:
+    seen: Dict[str, int] = {}
+    for c in d.sbom.components:
+        n = seen.get(c.name, 0)
+        seen[c.name] = n + 1
+        yield (c.name if n == 0 else f"{c.name}#{n}"), c
+
+def component_index(d: SoftwareOriginDossier, target: str) -> Tuple[float, ComponentIndex]:
+    """Returns (unscaled FOI sum, index) for storing alongside a baseline."""
+    domestic = INDEX.evaluator(target).match
+    foi_sum = 0.0
+    index: ComponentIndex = {}
+    for key, c in _keyed(d):
+        supplier = INDEX.code(c.supplier_jurisdiction)
+        _, contrib = component_contrib(c.criticality, c.foreign_control_risk, domestic(supplier))
+        foi_sum += contrib
+        index[key] = [c.version, supplier, c.criticality, c.foreign_control_risk, contrib]
+    return foi_sum, index
+
+def evaluate_drift(base: ComponentIndex, base_foi_sum: float, d: SoftwareOriginDossier, weights: ScoreWeights,
+                   target: str, k: int = TOP_K_DRIFT) -> DriftResult:
+    """Scores an update as baseline FOI plus the contribution deltas of added/removed/changed components.
+
+    Unchanged components cost one dict lookup and are never rescored. FOI can differ from a fresh
+    score_origin in the last floating-point bits because the sum is accumulated in a different order.
+    """
+    domestic = INDEX.evaluator(target).match
+    delta_sum = 0.0
+    changes: Dict[str, int] = {}
+    deltas: List[DriftContribution] = []
+    seen = set()
+
+    for key, c in _keyed(d):
+        seen.add(key)
+        supplier = INDEX.code(c.supplier_jurisdiction)
+        prev = base.get(key)
+        if prev is not None and prev[0] == c.version and prev[1] == supplier and prev[2] == c.criticality and prev[3] == c.foreign_control_risk:
+            continue
+        _, contrib = component_contrib(c.criticality, c.foreign_control_risk, domestic(supplier))
+        if prev is None:
+            change, delta, from_v = "added", contrib, None
+        else:
+            change = "version_bumped" if prev[0] != c.version else "supplier_changed" if prev[1] != supplier else "modified"
+            delta, from_v = contrib - prev[4], prev[0]
+        delta_sum += delta
+        changes[change] = changes.get(change, 0) + 1
+        deltas.append(DriftContribution(key, change, delta, from_v, c.version))
+
+    matched = len(seen) - changes.get("added", 0)
+    if matched < len(base):
+        for key, prev in base.items():
+            if key not in seen:
+                delta_sum -= prev[4]
+                changes["removed"] = changes.get("removed", 0) + 1
+                deltas.append(DriftContribution(key, "removed", -prev[4], prev[0], None))
+
+    foi_sum = base_foi_sum + delta_sum
+    foi_scaled = foi_sum * 100.0
+    O_b, _ = _signal_build(d, target)
+    O_s, _ = _signal_signing(d, target)
+    O_h, _ = _signal_hosting(d, target)
+    O_c, _ = _oc_from_foi(foi_scaled)
+    ocs = weights.w_build * O_b + weights.w_sbom * O_c + weights.w_signing * O_s + weights.w_hosting * O_h
+
+    top = heapq.nlargest(k, deltas, key=lambda x: abs(x.foi_delta))
+    for t in top:
+        t.foi_delta = float(round(t.foi_delta * 100.0, 4))
+    return DriftResult(ocs=float(round(ocs,4)), foi=float(round(foi_scaled,4)), foi_sum=foi_sum, changes=changes, top=top)
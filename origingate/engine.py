@@ -0,0 +1,172 @@
+from __future__ import annotations
+from typing import Any, Dict, List, Optional, Tuple, Type
+import hashlib, json
+from pydantic import ValidationError
+from .cache import RESULTS, assess_key, dossier_digest, policy_tag, score_key
+from .ingest import M, adapter, parse_json
+from .models import (
+    AssessRequest, AssessResponse, DecisionResponse, MultiScoreRequest, MultiScoreResponse, ScoreRequest, ScoreResponse, ScoreWeights,
+    SoftwareOriginDossier, TargetScore, VerifyResponse,
+)
+from .verify import verify_dossier
+from .scoring import Explanation, format_explanations, score_records, score_records_multi
+from .policy import REGISTRY, CompiledPolicy, PolicyError, get_policy
+from .metrics import record_sbom_size, record_verdict, stage
+from .audit import AuditRecord
+
+# verify -> score -> decide pipeline, free of any web framework so it can run in pool workers
+DEFAULT_WEIGHTS = ScoreWeights()
+
+# explanations stay unformatted records until a response is serialized
+ScoreResult = Tuple[float, float, Dict[str, float], List[Explanation]]
+
+# a recompiled policy can never be served from the cache (its version is in the key); this just frees the entries
+REGISTRY.subscribe(lambda name: RESULTS.invalidate_tag(policy_tag(name)))
+
+class AssessError(Exception):
+    def __init__(self, status_code: int, detail: Any):
+        super().__init__(status_code, detail)
+        self.status_code = status_code
+        self.detail = detail
+
+def warm_up() -> None:
+    """Builds the validators the models defer to first use, so long-running processes pay for them at startup."""
+    for model in (AssessRequest, ScoreRequest, MultiScoreRequest, SoftwareOriginDossier):
+        adapter(model).rebuild()
+    for model in (AssessResponse, ScoreResponse, MultiScoreResponse, VerifyResponse, DecisionResponse):
+        model.model_rebuild()
+
+def parse(model: Type[M], body: bytes) -> M:
+    try:
+        with stage("validate"):
+            obj = parse_json(model, body)
+    except ValidationError as e:
+        raise AssessError(422, json.loads(e.json(include_url=False))) from None
+    d = getattr(obj, "dossier", None)
+    if isinstance(d, SoftwareOriginDossier):
+        record_sbom_size(len(d.sbom.components))
+    return obj
+
+def require_verified(d: SoftwareOriginDossier) -> None:
+    with stage("verify"):
+        vr = verify_dossier(d)
+    if not vr.ok:
+        raise AssessError(400, {"errors": vr.errors})
+
+def score_cached(d: SoftwareOriginDossier, weights: ScoreWeights, target: str, dossier_hash: Optional[str] = None,
+                 detail: str = "full") -> Tuple[str, ScoreResult]:
+    """score_records memoized on (canonical dossier hash, weights, target, detail); returns (score key, result)."""
+    skey = score_key(dossier_hash or dossier_digest(d), weights, target, detail)
+    result = RESULTS.get(skey)
+    if result is None:
+        with stage("score"):
+            result = score_records(d, weights, target, detail)
+        RESULTS.put(skey, result)
+    return skey, result
+
+def score_multi_cached(d: SoftwareOriginDossier, weights: ScoreWeights, targets: List[str], detail: str = "full") -> Dict[str, ScoreResult]:
+    """Per-target results share the single-target cache entries; only the missing targets are scored, in one pass."""
+    dhash = dossier_digest(d)
+    keys = {t: score_key(dhash, weights, t, detail) for t in dict.fromkeys(targets)}
+    out: Dict[str, ScoreResult] = {}
+    missing = []
+    for t, k in keys.items():
+        hit = RESULTS.get(k)
+        if hit is None:
+            missing.append(t)
+        else:
+            out[t] = hit
+    if missing:
+        with stage("score"):
+            fresh = score_records_multi(d, weights, missing, detail)
+        for t, result in fresh.items():
+            RESULTS.put(keys[t], result)
+        out.update(fresh)
+    return out
+
+def _policy(name: str) -> CompiledPolicy:
+    try:
+        return get_policy(name)
+    except FileNotFoundError as e:
+        raise AssessError(404, str(e)) from None
+    except PolicyError as e:  # malformed on disk and no good version compiled yet
+        raise AssessError(503, str(e)) from None
+
+def _assess_bytes(req: AssessRequest, weights: ScoreWeights, inputs_hash: str = "") -> Tuple[bytes, str, str, Optional[AuditRecord]]:
+    # returns (response JSON, policy version, verdict, audit record if the decision's actions include log_audit)
+    require_verified(req.dossier)
+    p = _policy(req.policy_name)
+    skey, (ocs, foi, signals, explanations) = score_cached(req.dossier, weights, req.target_jurisdiction, detail=req.explain)
+    akey = assess_key(skey, req.policy_name, p.version, req.context)
+    hit = RESULTS.get(akey)
+    if hit is None:
+        with stage("decide"):
+            decision = p.decide(ocs, foi, req.context, explain=req.explain != "none")
+        hit = (assess_response(decision, ocs, foi, explanations), decision.verdict, decision.fee_usd, "log_audit" in decision.actions)
+        RESULTS.put(akey, hit, tag=policy_tag(req.policy_name))
+    out, verdict, fee_usd, audited = hit
+    record_verdict(req.policy_name, verdict)
+    rec = None
+    if audited:
+        d = req.dossier
+        rec = AuditRecord("assess", inputs_hash, req.policy_name, p.version, verdict, ocs, foi, fee_usd,
+                          d.product.name, d.product.version, d.artifact.digest, req.target_jurisdiction)
+    return out, p.version, verdict, rec
+
+def assess_response(decision: DecisionResponse, ocs: float, foi: float, explanations: List[Explanation]) -> bytes:
+    return AssessResponse(**decision.model_dump(), ocs=ocs, foi=foi, explanations=format_explanations(explanations)).model_dump_json().encode()
+
+def assess(req: AssessRequest, weights: ScoreWeights = DEFAULT_WEIGHTS) -> AssessResponse:
+    return AssessResponse.model_validate_json(_assess_bytes(req, weights)[0])
+
+def assess_json(body: bytes) -> bytes:
+    return assess_audited(body)[0]
+
+def assess_audited(body: bytes, inputs_hash: Optional[str] = None) -> Tuple[bytes, Optional[AuditRecord]]:
+    # Raw AssessRequest JSON in, AssessResponse JSON (+ audit record) out: parsing and serialization stay in the
+    # caller's process. Byte-identical resubmissions are answered from the cache without parsing, as long as the
+    # policy version matches. The audit record is returned rather than logged, since this may run in a pool worker.
+    # inputs_hash is the body's SHA-256 hex digest when the caller has already computed it.
+    inputs_hash = inputs_hash or hashlib.sha256(body).hexdigest()
+    raw_key = "raw:" + inputs_hash
+    hit = RESULTS.get(raw_key)
+    if hit is not None:
+        policy_name, version, out, verdict, rec = hit
+        try:
+            if get_policy(policy_name).version == version:
+                record_verdict(policy_name, verdict)
+                return out, rec
+        except FileNotFoundError:
+            pass
+    req = parse(AssessRequest, body)
+    out, version, verdict, rec = _assess_bytes(req, DEFAULT_WEIGHTS, inputs_hash)
+    RESULTS.put(raw_key, (req.policy_name, version, out, verdict, rec), tag=policy_tag(req.policy_name))
+    return out, rec
+
+def verify_json(body: bytes) -> bytes:
+    # schema problems are reported in the VerifyResponse rather than as a 422
+    try:
+        with stage("validate"):
+            d = parse_json(SoftwareOriginDossier, body)
+    except ValidationError as e:
+        return VerifyResponse(ok=False, errors=[f"schema validation error: {e}"]).model_dump_json().encode()
+    record_sbom_size(len(d.sbom.components))
+    with stage("verify"):
+        return verify_dossier(d).model_dump_json().encode()
+
+def score_json(body: bytes) -> bytes:
+    req = parse(ScoreRequest, body)
+    require_verified(req.dossier)
+    _, (ocs, foi, signals, explanations) = score_cached(req.dossier, req.weights, req.target_jurisdiction, detail=req.explain)
+    return ScoreResponse(ocs=ocs, foi=foi, signals=signals, explanations=format_explanations(explanations)).model_dump_json().encode()
+
+def score_multi_json(body: bytes) -> bytes:
+    req = parse(MultiScoreRequest, body)
+    require_verified(req.dossier)
+    results = score_multi_cached(req.dossier, req.weights, req.target_jurisdictions, req.explain)
+    scores = [TargetScore(target_jurisdiction=t, ocs=ocs, foi=foi, signals=signals, explanations=format_explanations(explanations))
+              for t, (ocs, foi, signals, explanations) in results.items()]
+    # keep request order (cached and freshly scored targets are merged above)
+    order = {t: i for i, t in enumerate(dict.fromkeys(req.target_jurisdictions))}
+    scores.sort(key=lambda s: order[s.target_jurisdiction])
+    return MultiScoreResponse(scores=scores).model_dump_json().encode()
@@ -0,0 +1,75 @@
+from __future__ import annotations
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from typing import Any, Callable, Optional, Tuple
+import asyncio, multiprocessing, os
+from .metrics import METRICS
+
+MODES = ("inline", "thread", "process")
+
+def _init_worker() -> None:
+    # Pre-warm: import the engine and compile every policy once per worker process
+    from . import engine
+    from .policy import REGISTRY
+    engine.warm_up()
+    REGISTRY.preload()
+
+def _ping() -> int:
+    return os.getpid()
+
+def _metered(fn: Callable[..., Any], *args: Any) -> Tuple[Any, dict]:
+    # pool workers are not scraped: ship what the task recorded (stages, verdicts, SBOM sizes) back with its result
+    return fn(*args), METRICS.drain()
+
+class ExecutionBackend:
+    """Where CPU-bound engine work runs: on the event loop (inline), a thread pool, or a pre-warmed process pool.
+
+    In process mode only payloads of at least process_min_bytes are shipped to the pool (as raw bytes);
+    smaller ones are cheaper to run on the thread pool than to pickle across processes.
+    """
+
+    def __init__(self, mode: str = "thread", workers: Optional[int] = None, process_min_bytes: int = 256 * 1024):
+        if mode not in MODES:
+            raise ValueError(f"Unknown execution mode {mode!r}; expected one of {MODES}")
+        self.mode = mode
+        self.workers = workers or os.cpu_count() or 1
+        self.process_min_bytes = process_min_bytes
+        self._threads: Optional[Executor] = None
+        self._procs: Optional[Executor] = None
+
+    @classmethod
+    def from_env(cls) -> "ExecutionBackend":
+        return cls(
+            mode=os.environ.get("ORIGINGATE_EXECUTOR", "thread"),
+            workers=int(os.environ.get("ORIGINGATE_EXECUTOR_WORKERS", "0")) or None,
+            process_min_bytes=int(os.environ.get("ORIGINGATE_PROCESS_MIN_BYTES", str(256 * 1024))),
+        )
+
+    @property
+    def max_in_flight(self) -> int:
+        return 1 if self.mode == "inline" else self.workers
+
+    def start(self) -> None:
+        if self.mode != "inline" and self._threads is None:
+            self._threads = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="origingate")
+        if self.mode == "process" and self._procs is None:
+            self._procs = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"), initializer=_init_worker)
+            # force every worker up front so the first requests don't pay for spawn + imports
+            wait([self._procs.submit(_ping) for _ in range(self.workers)])
+
+    def shutdown(self) -> None:
+        for ex in (self._threads, self._procs):
+            if ex is not None:
+                ex.shutdown(wait=True, cancel_futures=True)
+        self._threads = self._procs = None
+
+    async def run(self, fn: Callable[..., Any], *args: Any, size: int = 0) -> Any:
+        if self.mode == "inline":
+            return fn(*args)
+        if self._threads is None:
+            self.start()
+        loop = asyncio.get_running_loop()
+        if self._procs is not None and size >= self.process_min_bytes:
+            result, recorded = await loop.run_in_executor(self._procs, _metered, fn, *args)
+            METRICS.merge(recorded)
+            return result
+        return await loop.run_in_executor(self._threads, fn, *args)
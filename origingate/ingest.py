@@ -0,0 +1,44 @@
+from __future__ import annotations
+from functools import lru_cache
+from typing import Any, List, Type, TypeVar
+import json, os
+from pydantic import BaseModel, TypeAdapter, create_model
+from .models import CompactSBOMComponent, CompactSoftwareOriginDossier, SBOMComponent, SoftwareOriginDossier
+
+# Request bodies are validated straight from bytes (no intermediate dict graph), except large bodies in
+# the default mode: there json.loads + validate_python is faster than validate_json (at the price of a
+# transient dict graph, i.e. a higher peak). With ORIGINGATE_COMPACT_SBOM=1 every dossier is built as a
+# CompactSoftwareOriginDossier, always from bytes, since that mode is about memory.
+COMPACT_SBOM = os.environ.get("ORIGINGATE_COMPACT_SBOM", "0") == "1"
+DICT_PARSE_MIN_BYTES = int(os.environ.get("ORIGINGATE_DICT_PARSE_MIN_BYTES", str(256 * 1024)))
+
+M = TypeVar("M", bound=BaseModel)
+
+def compact_variant(model: Type[M]) -> Type[M]:
+    """Subclass of model with every SoftwareOriginDossier field swapped for the compact dossier."""
+    if model is SoftwareOriginDossier:
+        return CompactSoftwareOriginDossier  # type: ignore[return-value]
+    swapped = {name: (CompactSoftwareOriginDossier, f) for name, f in model.model_fields.items() if f.annotation is SoftwareOriginDossier}
+    if not swapped:
+        return model
+    return create_model(f"Compact{model.__name__}", __base__=model, **swapped)  # type: ignore[call-overload]
+
+@lru_cache(maxsize=None)
+def adapter(model: Type[M], compact: bool = COMPACT_SBOM) -> TypeAdapter:
+    return TypeAdapter(compact_variant(model) if compact else model)
+
+def parse_json(model: Type[M], body: Any, compact: bool = COMPACT_SBOM) -> M:
+    # raises pydantic.ValidationError
+    a = adapter(model, compact)
+    if not compact and len(body) >= DICT_PARSE_MIN_BYTES:
+        try:
+            data = json.loads(body)
+        except ValueError:
+            return a.validate_json(body)  # for pydantic's json_invalid error
+        return a.validate_python(data)
+    return a.validate_json(body)
+
+@lru_cache(maxsize=None)
+def components_adapter(compact: bool = COMPACT_SBOM) -> TypeAdapter:
+    # a bare JSON array of SBOM components (one chunk of an upload session)
+    return TypeAdapter(List[CompactSBOMComponent] if compact else List[SBOMComponent])
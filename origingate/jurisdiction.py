@@ -0,0 +1,109 @@
+from __future__ import annotations
+from typing import Any, Dict, FrozenSet, Optional
+import os, sys
+from .precompiled import load_yaml
+
+# Precompiled jurisdiction index (data in jurisdictions.yaml): canonical codes with aliases, bloc
+# membership, and cloud region -> jurisdiction. A jurisdiction "satisfies" a target when it is the
+# target or belongs to it (DE satisfies EU). Normalized codes are interned and each per-target
+# evaluator memoizes its answers, so the scoring hot path is dict lookups with no string building.
+
+JURISDICTIONS_PATH = os.environ.get(
+    "ORIGINGATE_JURISDICTIONS", os.path.join(os.path.dirname(os.path.dirname(__file__)), "jurisdictions.yaml"))
+
+# memo tables are keyed by raw request strings; stop growing them past this size
+_MEMO_MAX = 4096
+
+class TargetEvaluator:
+    """Signal values for one target jurisdiction; obtain via JurisdictionIndex.evaluator()."""
+    __slots__ = ("target", "_index", "_build", "_match")
+
+    def __init__(self, index: "JurisdictionIndex", target: str):
+        self._index = index
+        self.target = index.code(target)
+        self._build: Dict[Optional[str], float] = {}
+        self._match: Dict[str, bool] = {}
+
+    def match(self, code: str) -> bool:
+        """code must already be canonical (JurisdictionIndex.code)."""
+        m = self._match.get(code)
+        if m is None:
+            m = self.target in self._index.covers(code)
+            if len(self._match) < _MEMO_MAX:
+                self._match[code] = m
+        return m
+
+    def build(self, region: Optional[str]) -> float:
+        v = self._build.get(region)
+        if v is None:
+            v = 1.0 if self.target in self._index.region(region) else 0.0
+            if len(self._build) < _MEMO_MAX:
+                self._build[region] = v
+        return v
+
+    def signing(self, key_jurisdiction: Optional[str]) -> float:
+        return 1.0 if self.match(self._index.code(key_jurisdiction)) else 0.0
+
+    def hosting(self, hosting_jurisdiction: Optional[str]) -> float:
+        if not hosting_jurisdiction:
+            return 0.5
+        return 1.0 if self.match(self._index.code(hosting_jurisdiction)) else 0.0
+
+class JurisdictionIndex:
+    def __init__(self, data: Dict[str, Any]):
+        entries = (data or {}).get("jurisdictions")
+        if not isinstance(entries, dict):
+            raise ValueError("jurisdiction index must be a mapping under 'jurisdictions'")
+        self._alias: Dict[str, str] = {}
+        self._blocs: Dict[str, FrozenSet[str]] = {}
+        self._regions: Dict[str, FrozenSet[str]] = {}
+        self._codes: Dict[Optional[str], str] = {}
+        self._evaluators: Dict[str, TargetEvaluator] = {}
+        for code, spec in entries.items():
+            code = sys.intern(str(code).strip().upper())
+            spec = spec or {}
+            self._alias[code] = code
+            for a in spec.get("aliases") or ():
+                self._alias[str(a).strip().upper()] = code
+            self._blocs[code] = frozenset(sys.intern(str(b).strip().upper()) for b in spec.get("member_of") or ())
+        for code, spec in entries.items():
+            code = str(code).strip().upper()
+            for r in (spec or {}).get("regions") or ():
+                self._regions[str(r).strip().lower()] = self.covers(code)
+
+    @classmethod
+    def load(cls, path: str = JURISDICTIONS_PATH) -> "JurisdictionIndex":
+        with open(path, "rb") as f:
+            return cls(load_yaml(f.read()))
+
+    def code(self, raw: Optional[str]) -> str:
+        """Canonical, interned jurisdiction code ('' when missing); aliases resolve to their jurisdiction."""
+        c = self._codes.get(raw)
+        if c is None:
+            norm = (raw or "").strip().upper()
+            c = self._alias.get(norm) or sys.intern(norm)
+            if len(self._codes) < _MEMO_MAX:
+                self._codes[raw] = c
+        return c
+
+    def covers(self, code: str) -> FrozenSet[str]:
+        """Jurisdictions satisfied by a canonical code: itself plus the blocs it belongs to."""
+        return frozenset((code,)) | self._blocs.get(code, frozenset())
+
+    def region(self, region: Optional[str]) -> FrozenSet[str]:
+        """Jurisdictions satisfied by a cloud region (or by a build_region given as a jurisdiction code)."""
+        covered = self._regions.get((region or "").strip().lower())
+        if covered is None:
+            code = self.code(region)
+            covered = self.covers(code) if code else frozenset()
+        return covered
+
+    def evaluator(self, target: str) -> TargetEvaluator:
+        ev = self._evaluators.get(target)
+        if ev is None:
+            ev = TargetEvaluator(self, target)
+            if len(self._evaluators) < _MEMO_MAX:
+                self._evaluators[target] = ev
+        return ev
+
+INDEX = JurisdictionIndex.load()
@@ -0,0 +1,161 @@
+from __future__ import annotations
+from bisect import bisect_left
+from typing import Callable, Dict, List, Sequence, Tuple
+import threading, time
+
+# Low-overhead in-process metrics. Every thread writes to its own shard (no locks on the hot path);
+# shards are only summed when /v1/metrics renders them. Each uvicorn worker keeps its own numbers, as
+# usual for Prometheus per-process scraping. Process-pool workers have no endpoint: they drain() what they
+# recorded after each task and the API process merge()s it (see executor.py).
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (10, 100, 1_000, 10_000, 100_000, 1_000_000)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+class _Timer:
+    __slots__ = ("_m", "_name", "_labels", "_t0")
+
+    def __init__(self, m: "Metrics", name: str, labels: Labels):
+        self._m, self._name, self._labels = m, name, labels
+
+    def __enter__(self) -> "_Timer":
+        self._t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._m.observe(self._name, time.perf_counter() - self._t0, self._labels)
+
+class Metrics:
+    def __init__(self):
+        self._local = threading.local()
+        self._shards: List[Dict[Tuple[str, Labels], object]] = []
+        self._lock = threading.Lock()
+        self._help: Dict[str, Tuple[str, str, Sequence[float]]] = {}
+        self._collectors: List[Callable[[], Dict[Tuple[str, Labels], float]]] = []
+
+    def counter(self, name: str, help: str) -> None:
+        self._help[name] = ("counter", help, ())
+
+    def gauge(self, name: str, help: str) -> None:
+        self._help[name] = ("gauge", help, ())
+
+    def histogram(self, name: str, help: str, buckets: Sequence[float] = LATENCY_BUCKETS) -> None:
+        self._help[name] = ("histogram", help, tuple(buckets))
+
+    def collector(self, fn: Callable[[], Dict[Tuple[str, Labels], float]]) -> None:
+        """fn() -> {(metric, labels): value}, evaluated at render time (for gauges owned elsewhere)."""
+        self._collectors.append(fn)
+
+    def _shard(self) -> dict:
+        s = getattr(self._local, "shard", None)
+        if s is None:
+            s = self._local.shard = {}
+            with self._lock:
+                self._shards.append(s)
+        return s
+
+    def inc(self, name: str, labels: Labels = (), value: float = 1.0) -> None:
+        s = self._shard()
+        key = (name, labels)
+        s[key] = s.get(key, 0.0) + value
+
+    def observe(self, name: str, value: float, labels: Labels = ()) -> None:
+        s = self._shard()
+        key = (name, labels)
+        h = s.get(key)
+        if h is None:
+            buckets = self._help[name][2]
+            h = s[key] = [0] * (len(buckets) + 1) + [0.0]
+        h[bisect_left(self._help[name][2], value)] += 1
+        h[-1] += value
+
+    def time(self, name: str, labels: Labels = ()) -> _Timer:
+        return _Timer(self, name, labels)
+
+    def snapshot(self) -> Dict[Tuple[str, Labels], object]:
+        total: Dict[Tuple[str, Labels], object] = {}
+        with self._lock:
+            shards = list(self._shards)
+        for s in shards:
+            _add(total, list(s.items()))
+        for fn in self._collectors:
+            total.update(fn())
+        return total
+
+    def drain(self) -> Dict[Tuple[str, Labels], object]:
+        """Recorded values summed over all shards, which are then reset; only for single-threaded pool workers."""
+        total: Dict[Tuple[str, Labels], object] = {}
+        with self._lock:
+            shards = list(self._shards)
+        for s in shards:
+            items = list(s.items())
+            s.clear()
+            _add(total, items)
+        return total
+
+    def merge(self, values: Dict[Tuple[str, Labels], object]) -> None:
+        """Adds another process's drain() into the calling thread's shard."""
+        _add(self._shard(), list(values.items()), copy=False)
+
+    def render(self) -> str:
+        """Prometheus text exposition format (0.0.4)."""
+        by_name: Dict[str, List[Tuple[Labels, object]]] = {}
+        for (name, labels), v in self.snapshot().items():
+            by_name.setdefault(name, []).append((labels, v))
+        lines: List[str] = []
+        for name in sorted(by_name):
+            kind, help, buckets = self._help.get(name, ("untyped", "", ()))
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, v in sorted(by_name[name], key=lambda x: x[0]):
+                if kind == "histogram":
+                    cum = 0
+                    for le, n in zip([*buckets, "+Inf"], v[:-1]):
+                        cum += n
+                        lines.append(f"{name}_bucket{_fmt(labels + (('le', str(le)),))} {cum}")
+                    lines.append(f"{name}_sum{_fmt(labels)} {v[-1]}")
+                    lines.append(f"{name}_count{_fmt(labels)} {cum}")
+                else:
+                    lines.append(f"{name}{_fmt(labels)} {v}")
+        return "\n".join(lines) + "\n"
+
+def _add(total: dict, items: List[Tuple[Tuple[str, Labels], object]], copy: bool = True) -> None:
+    for key, v in items:
+        if isinstance(v, list):
+            acc = total.get(key)
+            total[key] = (list(v) if copy else v) if acc is None else [a + b for a, b in zip(acc, v)]
+        else:
+            total[key] = total.get(key, 0.0) + v
+
+def _fmt(labels: Labels) -> str:
+    if not labels:
+        return ""
+    esc = lambda s: str(s).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return "{" + ",".join(f'{k}="{esc(v)}"' for k, v in labels) + "}"
+
+METRICS = Metrics()
+METRICS.counter("origingate_http_requests_total", "HTTP requests by route, method and status")
+METRICS.histogram("origingate_http_request_duration_seconds", "HTTP request latency by route (until the response body is complete)")
+METRICS.histogram("origingate_stage_duration_seconds", "Engine stage latency (validate, verify, score, decide)")
+METRICS.counter("origingate_verdicts_total", "Decisions by policy and verdict")
+METRICS.counter("origingate_policy_compile_failures_total", "Policy file changes that failed to compile (the last good version is kept)")
+METRICS.histogram("origingate_sbom_components", "SBOM component count per ingested dossier", SIZE_BUCKETS)
+METRICS.gauge("origingate_result_cache", "Result cache counters (hits, misses, evictions, size)")
+METRICS.gauge("origingate_baseline_store", "Baseline store counters (baselines, cache_hits, cache_misses)")
+METRICS.gauge("origingate_pending_requests", "Computations admitted and not yet finished (queued or running)")
+METRICS.counter("origingate_coalesced_requests_total", "Requests answered by joining an identical in-flight computation")
+METRICS.counter("origingate_admission_rejected_total", "Requests rejected with 429 because too many computations were pending")
+METRICS.counter("origingate_audit_records_total", "Decisions written to the audit log")
+METRICS.counter("origingate_audit_dropped_total", "Decisions not audited (audit queue full or write failed)")
+METRICS.histogram("origingate_audit_commit_seconds", "Audit log group commit latency (write + fsync)")
+METRICS.gauge("origingate_audit", "Audit log state (queued records, current segment number)")
+
+def stage(name: str) -> _Timer:
+    return METRICS.time("origingate_stage_duration_seconds", (("stage", name),))
+
+def record_verdict(policy: str, verdict: str) -> None:
+    METRICS.inc("origingate_verdicts_total", (("policy", policy), ("verdict", verdict)))
+
+def record_sbom_size(n: int) -> None:
+    METRICS.observe("origingate_sbom_components", n)
@@ -1,43 +1,48 @@
 from __future__ import annotations
-from typing import Any, Dict, List, Optional
-from pydantic import BaseModel, Field
+from dataclasses import dataclass
+from typing import Annotated, Any, Dict, List, Optional
+from pydantic import BaseModel, ConfigDict, Field, model_validator
 
-class Product(BaseModel):
+class _Model(BaseModel):
+    # validators are built on first use, so importing the models (CLI, pool workers) stays cheap
+    model_config = ConfigDict(defer_build=True)
+
+class Product(_Model):
     name: str
     version: str
 
-class Artifact(BaseModel):
+class Artifact(_Model):
     digest: str
     uri: Optional[str] = None
 
-class Provenance(BaseModel):
+class Provenance(_Model):
     builder_id: str
     build_region: str
     timestamp: str
     source_repo: str
     commit: str
 
-class SBOMComponent(BaseModel):
+class SBOMComponent(_Model):
     name: str
     version: str
     supplier_jurisdiction: str
     criticality: str = Field(pattern="^(crypto|auth|network|data|ui|other)$")
     foreign_control_risk: float = Field(ge=0.0, le=1.0)
 
-class SBOM(BaseModel):
+class SBOM(_Model):
     format: str
     components: List[SBOMComponent]
 
-class Signing(BaseModel):
+class Signing(_Model):
     key_jurisdiction: str
     signature: str
 
-class Hosting(BaseModel):
+class Hosting(_Model):
     type: Optional[str] = None
     control_plane_region: Optional[str] = None
     jurisdiction: Optional[str] = None
 
-class SoftwareOriginDossier(BaseModel):
+class SoftwareOriginDossier(_Model):
     product: Product
     artifact: Artifact
     provenance: Provenance
@@ -46,71 +51,159 @@ class SoftwareOriginDossier(BaseModel):
     hosting: Optional[Hosting] = None
     attestation: Optional[Dict[str, Any]] = None
 
-class VerifyResponse(BaseModel):
+# Compact SBOM representation: same JSON shape and validation rules, but components are
+# __slots__ dataclasses instead of BaseModel instances (far smaller and faster to build).
+@dataclass(slots=True)
+class CompactSBOMComponent:
+    name: str
+    version: str
+    supplier_jurisdiction: str
+    criticality: Annotated[str, Field(pattern="^(crypto|auth|network|data|ui|other)$")]
+    foreign_control_risk: Annotated[float, Field(ge=0.0, le=1.0)]
+
+class CompactSBOM(SBOM):
+    components: List[CompactSBOMComponent]
+
+class CompactSoftwareOriginDossier(SoftwareOriginDossier):
+    sbom: CompactSBOM
+
+class VerifyResponse(_Model):
     ok: bool
     errors: List[str] = []
 
-class ScoreWeights(BaseModel):
+class ScoreWeights(_Model):
     w_build: float = 0.35
     w_sbom: float = 0.30
     w_signing: float = 0.20
     w_hosting: float = 0.15
 
-class ScoreRequest(BaseModel):
+# Explanation detail: none | summary (one line per signal) | full (signals + top 8 FOI contributors) | top-k=N
+ExplainDetail = Annotated[str, Field(pattern=r"^(none|summary|full|top-k=\d{1,3})$")]
+
+class ScoreRequest(_Model):
     dossier: SoftwareOriginDossier
-    weights: ScoreWeights = ScoreWeights()
+    weights: ScoreWeights = Field(default_factory=ScoreWeights)
     target_jurisdiction: str = "US"
+    explain: ExplainDetail = "full"
 
-class ScoreResponse(BaseModel):
+class ScoreResponse(_Model):
     ocs: float
     foi: float
     signals: Dict[str, float]
     explanations: List[str]
 
-class DecideRequest(BaseModel):
+class MultiScoreRequest(_Model):
+    dossier: SoftwareOriginDossier
+    weights: ScoreWeights = Field(default_factory=ScoreWeights)
+    target_jurisdictions: List[str] = Field(min_length=1, max_length=64)
+    explain: ExplainDetail = "full"
+
+class TargetScore(ScoreResponse):
+    target_jurisdiction: str
+
+class MultiScoreResponse(_Model):
+    scores: List[TargetScore]
+
+class DecideRequest(_Model):
     ocs: float
     foi: float
     policy_name: str
     context: Dict[str, Any] = {}
+    explain: ExplainDetail = "full"
 
-class DecisionResponse(BaseModel):
+class DecisionResponse(_Model):
     verdict: str
     allow: bool
     fee_usd: float
     actions: List[str]
     reasons: List[str]
 
-class AssessRequest(BaseModel):
+class AssessRequest(_Model):
     dossier: SoftwareOriginDossier
     policy_name: str
     context: Dict[str, Any] = {}
     target_jurisdiction: str = "US"
+    explain: ExplainDetail = "full"
 
 class AssessResponse(DecisionResponse):
     ocs: float
     foi: float
     explanations: List[str]
 
-class BaselineCreateRequest(BaseModel):
+class SBOMHeader(_Model):
+    format: str
+
+    @model_validator(mode="before")
+    @classmethod
+    def _no_components(cls, data: Any) -> Any:
+        # silently dropping them would score the dossier without part of its SBOM
+        if isinstance(data, dict) and "components" in data:
+            raise ValueError("sbom.components is not accepted when opening an upload session; send components as chunks")
+        return data
+
+class DossierHeader(_Model):
+    """A dossier without its SBOM components; components are streamed into an upload session."""
+    product: Product
+    artifact: Artifact
+    provenance: Provenance
+    sbom: SBOMHeader
+    signing: Signing
+    hosting: Optional[Hosting] = None
+    attestation: Optional[Dict[str, Any]] = None
+
+class SessionOpenRequest(_Model):
+    dossier: DossierHeader
+    policy_name: str
+    context: Dict[str, Any] = {}
+    target_jurisdiction: str = "US"
+    weights: ScoreWeights = Field(default_factory=ScoreWeights)
+    explain: ExplainDetail = "full"
+
+class SessionInfo(_Model):
+    session_id: str
+    components: int
+    chunks: int
+    expires_in: float
+
+class BaselineCreateRequest(_Model):
     baseline_id: str
     dossier: SoftwareOriginDossier
     policy_name: str
     target_jurisdiction: str = "US"
 
-class BaselineCreateResponse(BaseModel):
+class BaselineCreateResponse(_Model):
+    baseline_id: str
+    ocs0: float
+    foi0: float
+
+class BaselineInfo(_Model):
     baseline_id: str
+    artifact_digest: str
+    product_name: str = ""
+    product_version: str = ""
     ocs0: float
     foi0: float
 
-class UpdateEvaluateRequest(BaseModel):
+class UpdateEvaluateRequest(_Model):
     baseline_id: str
     dossier: SoftwareOriginDossier
     policy_name: str
     context: Dict[str, Any] = {}
     drift_threshold: float = 0.10
+    explain: ExplainDetail = "full"
+
+class DriftContributor(_Model):
+    component: str
+    change: str
+    foi_delta: float
+    from_version: Optional[str] = None
+    to_version: Optional[str] = None
 
-class UpdateEvaluateResponse(BaseModel):
+class UpdateEvaluateResponse(_Model):
     baseline_id: str
     drift: float
     reclassify: bool
     decision: DecisionResponse
+    foi_drift: float = 0.0
+    changes: Dict[str, int] = {}
+    top_contributors: List[DriftContributor] = []
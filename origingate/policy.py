@@ -1,11 +1,18 @@
 from __future__ import annotations
 from dataclasses import dataclass
-from typing import Any, Dict, List, Tuple
-import os, yaml
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import glob, logging, os, threading
+from .metrics import METRICS
 from .models import DecisionResponse
+from .precompiled import digest, load_yaml
 
 POLICY_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "policies")
 
+log = logging.getLogger(__name__)
+
+class PolicyError(ValueError):
+    pass
+
 @dataclass
 class Policy:
     name: str
@@ -14,69 +21,217 @@ class Policy:
     fee: Dict[str, Any]
     review_band: Dict[str, float] | None = None
 
-def load_policy(name: str) -> Policy:
-    path = os.path.join(POLICY_DIR, f"{name}.yaml")
-    if not os.path.exists(path):
-        raise FileNotFoundError(f"Policy not found: {path}")
-    data = yaml.safe_load(open(path, "r", encoding="utf-8"))
+def _policy_path(name: str, policy_dir: str = POLICY_DIR) -> str:
+    return os.path.join(policy_dir, f"{name}.yaml")
+
+def _parse_policy(data: Any, path: str) -> Policy:
+    if not isinstance(data, dict) or "name" not in data:
+        raise PolicyError(f"Malformed policy (expected a mapping with 'name'): {path}")
     return Policy(
         name=data["name"],
-        thresholds=data.get("thresholds", {}),
-        actions=data.get("actions", {}),
-        fee=data.get("fee", {"enabled": False}),
+        thresholds=data.get("thresholds") or {},
+        actions=data.get("actions") or {},
+        fee=data.get("fee") or {"enabled": False},
         review_band=data.get("review_band"),
     )
 
-def decide(ocs: float, foi: float, policy_name: str, context: Dict[str, Any] | None = None) -> DecisionResponse:
-    context = context or {}
-    p = load_policy(policy_name)
+def load_policy(name: str) -> Policy:
+    path = _policy_path(name)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Policy not found: {path}")
+    with open(path, "rb") as f:
+        return _parse_policy(load_yaml(f.read()), path)
+
+@dataclass(frozen=True)
+class CompiledPolicy:
+    """A policy with every threshold, band, fee setting and action list pre-resolved."""
+    name: str
+    version: str
+    tau: float
+    gamma: float
+    review_low: Optional[float]
+    review_high: Optional[float]
+    fee_enabled: bool
+    fee_rate: float
+    usage_field: str
+    on_allow: Tuple[str, ...]
+    on_review: Tuple[str, ...]
+    on_deny: Tuple[str, ...]
 
-    tau = float(p.thresholds.get("tau_min_ocs", 0.6))
-    gamma = float(p.thresholds.get("gamma_max_foi", 25.0))
+    def decide(self, ocs: float, foi: float, context: Dict[str, Any] | None = None, explain: bool = True) -> DecisionResponse:
+        """explain=False leaves reasons empty (nothing is formatted); verdict, fee and actions are unaffected."""
+        context = context or {}
+        tau, gamma = self.tau, self.gamma
 
-    reasons: List[str] = []
-    actions: List[str] = []
-    fee_usd = 0.0
+        reasons: List[str] = []
+        fee_usd = 0.0
 
-    # review band (optional)
-    if p.review_band:
-        low = float(p.review_band.get("ocs_low", 0.45))
-        high = float(p.review_band.get("ocs_high", tau))
-        if low <= ocs < high:
-            verdict = "REVIEW"
-            allow = False
-            reasons.append(f"OCS in review band: {ocs:.3f} in [{low},{high})")
-            actions = p.actions.get("on_review", ["log_audit","manual_review"])
-            return DecisionResponse(verdict=verdict, allow=allow, fee_usd=fee_usd, actions=actions, reasons=reasons)
-
-    # allow path
-    if ocs >= tau and foi <= gamma:
-        verdict = "ALLOW"
-        allow = True
-        reasons.append(f"Meets thresholds: OCS={ocs:.3f}>=tau={tau}, FOI={foi:.2f}<=gamma={gamma}")
-        actions = p.actions.get("on_allow", ["log_audit","approve"])
-    else:
-        # foreign-dominant path
-        if ocs < tau and foi > gamma:
-            verdict = "ALLOW_WITH_FEE" if p.fee.get("enabled", False) else "DENY"
-            allow = p.fee.get("enabled", False)
-            reasons.append(f"Foreign-dominant: OCS={ocs:.3f}<tau={tau} and FOI={foi:.2f}>gamma={gamma}")
-            if allow:
-                actions = p.actions.get("on_allow", ["log_audit","approve"])
-            else:
-                actions = p.actions.get("on_deny", ["log_audit","deny"])
+        # review band (optional)
+        if self.review_low is not None:
+            low, high = self.review_low, self.review_high
+            if low <= ocs < high:
+                if explain:
+                    reasons.append(f"OCS in review band: {ocs:.3f} in [{low},{high})")
+                return DecisionResponse(verdict="REVIEW", allow=False, fee_usd=fee_usd, actions=list(self.on_review), reasons=reasons)
+
+        # allow path
+        if ocs >= tau and foi <= gamma:
+            verdict = "ALLOW"
+            allow = True
+            if explain:
+                reasons.append(f"Meets thresholds: OCS={ocs:.3f}>=tau={tau}, FOI={foi:.2f}<=gamma={gamma}")
+            actions = self.on_allow
+        elif ocs < tau and foi > gamma:
+            # foreign-dominant path
+            verdict = "ALLOW_WITH_FEE" if self.fee_enabled else "DENY"
+            allow = self.fee_enabled
+            if explain:
+                reasons.append(f"Foreign-dominant: OCS={ocs:.3f}<tau={tau} and FOI={foi:.2f}>gamma={gamma}")
+            actions = self.on_allow if allow else self.on_deny
         else:
             verdict = "DENY"
             allow = False
-            reasons.append(f"Does not meet thresholds: OCS={ocs:.3f}, FOI={foi:.2f}")
-            actions = p.actions.get("on_deny", ["log_audit","deny"])
-
-    # fee calculation if enabled + allowed
-    if allow and p.fee.get("enabled", False):
-        rate = float(p.fee.get("rate", 0.10))
-        usage_field = p.fee.get("usage_field", "annual_usage_usd")
-        U = float(context.get(usage_field, 0.0))
-        fee_usd = max(0.0, U * rate * (1.0 - float(ocs)))
-        reasons.append(f"Fee computed: U={U} rate={rate} (1-OCS)={1-ocs:.3f} => fee={fee_usd:.2f}")
-
-    return DecisionResponse(verdict=verdict, allow=allow, fee_usd=float(round(fee_usd,2)), actions=actions, reasons=reasons)
+            if explain:
+                reasons.append(f"Does not meet thresholds: OCS={ocs:.3f}, FOI={foi:.2f}")
+            actions = self.on_deny
+
+        # fee calculation if enabled + allowed
+        if allow and self.fee_enabled:
+            rate = self.fee_rate
+            U = float(context.get(self.usage_field, 0.0))
+            fee_usd = max(0.0, U * rate * (1.0 - float(ocs)))
+            if explain:
+                reasons.append(f"Fee computed: U={U} rate={rate} (1-OCS)={1-ocs:.3f} => fee={fee_usd:.2f}")
+
+        return DecisionResponse(verdict=verdict, allow=allow, fee_usd=float(round(fee_usd,2)), actions=list(actions), reasons=reasons)
+
+def _actions(p: Policy, key: str, default: List[str]) -> Tuple[str, ...]:
+    acts = p.actions.get(key, default)
+    if not isinstance(acts, list) or not all(isinstance(a, str) for a in acts):
+        raise PolicyError(f"Policy {p.name}: actions.{key} must be a list of strings")
+    return tuple(acts)
+
+def compile_policy(p: Policy, version: str = "") -> CompiledPolicy:
+    try:
+        tau = float(p.thresholds.get("tau_min_ocs", 0.6))
+        gamma = float(p.thresholds.get("gamma_max_foi", 25.0))
+        review_low = review_high = None
+        if p.review_band:
+            review_low = float(p.review_band.get("ocs_low", 0.45))
+            review_high = float(p.review_band.get("ocs_high", tau))
+        fee_enabled = bool(p.fee.get("enabled", False))
+        fee_rate = float(p.fee.get("rate", 0.10))
+        usage_field = str(p.fee.get("usage_field", "annual_usage_usd"))
+    except (AttributeError, TypeError, ValueError) as e:
+        raise PolicyError(f"Policy {p.name}: {e}") from e
+    if review_low is not None and review_low > review_high:
+        raise PolicyError(f"Policy {p.name}: review_band.ocs_low > ocs_high")
+    return CompiledPolicy(
+        name=p.name,
+        version=version,
+        tau=tau,
+        gamma=gamma,
+        review_low=review_low,
+        review_high=review_high,
+        fee_enabled=fee_enabled,
+        fee_rate=fee_rate,
+        usage_field=usage_field,
+        on_allow=_actions(p, "on_allow", ["log_audit","approve"]),
+        on_review=_actions(p, "on_review", ["log_audit","manual_review"]),
+        on_deny=_actions(p, "on_deny", ["log_audit","deny"]),
+    )
+
+StatKey = Tuple[int, int, int]  # (mtime_ns, inode, size)
+
+class PolicyRegistry:
+    """Compiles each policy file once; recompiles when the file's mtime/inode/size changes.
+
+    A change that fails to compile (a bad edit, or a file caught mid-write) is logged and counted, and
+    the last good version keeps being served; the broken file is not retried until it changes again.
+    """
+
+    def __init__(self, policy_dir: str = POLICY_DIR):
+        self.policy_dir = policy_dir
+        self._entries: Dict[str, Tuple[StatKey, CompiledPolicy]] = {}
+        self._failed: Dict[str, Tuple[StatKey, str]] = {}  # name -> stat key and error of the last failed compile
+        self._lock = threading.Lock()
+        self._listeners: List[Callable[[str], None]] = []
+
+    def subscribe(self, fn: Callable[[str], None]) -> None:
+        """Register fn(name), called whenever a previously compiled policy is recompiled to a new version."""
+        self._listeners.append(fn)
+
+    def _replace(self, name: str, entry: Tuple[StatKey, CompiledPolicy]) -> None:
+        old = self._entries.get(name)
+        self._entries[name] = entry
+        self._failed.pop(name, None)
+        if old is not None and old[1].version != entry[1].version:
+            for fn in self._listeners:
+                fn(name)
+
+    def _compile_file(self, name: str, path: str) -> Tuple[StatKey, CompiledPolicy]:
+        with open(path, "rb") as f:
+            st = os.fstat(f.fileno())
+            raw = f.read()
+        try:
+            data = load_yaml(raw)
+        except ValueError as e:
+            raise PolicyError(f"Malformed policy YAML {path}: {e}") from e
+        version = digest(raw)[:12]
+        return (st.st_mtime_ns, st.st_ino, st.st_size), compile_policy(_parse_policy(data, path), version)
+
+    def get(self, name: str) -> CompiledPolicy:
+        path = _policy_path(name, self.policy_dir)
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            with self._lock:
+                self._entries.pop(name, None)
+            raise FileNotFoundError(f"Policy not found: {path}") from None
+        key = (st.st_mtime_ns, st.st_ino, st.st_size)
+        entry = self._entries.get(name)
+        if entry is not None and entry[0] == key:
+            return entry[1]
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is not None and entry[0] == key:  # compiled by another thread meanwhile
+                return entry[1]
+            failed = self._failed.get(name)
+            if failed is None or failed[0] != key:
+                try:
+                    fresh = self._compile_file(name, path)
+                except PolicyError as e:
+                    METRICS.inc("origingate_policy_compile_failures_total", (("policy", name),))
+                    log.error("policy %s: %s (%s)", name, e, "still serving the last good version" if entry else "no good version")
+                    failed = self._failed[name] = (key, str(e))
+                else:
+                    self._replace(name, fresh)
+                    return fresh[1]
+            if entry is None:
+                raise PolicyError(failed[1])
+            return entry[1]
+
+    def names(self) -> List[str]:
+        return sorted(os.path.splitext(os.path.basename(p))[0] for p in glob.glob(os.path.join(self.policy_dir, "*.yaml")))
+
+    def reload(self, name: str | None = None) -> Dict[str, CompiledPolicy]:
+        """Drop cached entries and recompile; raises PolicyError on the first malformed policy."""
+        names = [name] if name else self.names()
+        compiled = {n: self._compile_file(n, _policy_path(n, self.policy_dir)) for n in names}
+        with self._lock:
+            if name is None:
+                for gone in set(self._entries) - set(compiled):
+                    del self._entries[gone]
+            for n, entry in compiled.items():
+                self._replace(n, entry)
+        return {n: e[1] for n, e in compiled.items()}
+
+    preload = reload
+
+REGISTRY = PolicyRegistry()
+
+def get_policy(name: str) -> CompiledPolicy:
+    return REGISTRY.get(name)
+
+def decide(ocs: float, foi: float, policy_name: str, context: Dict[str, Any] | None = None, explain: bool = True) -> DecisionResponse:
+    return get_policy(policy_name).decide(ocs, foi, context, explain)
@@ -0,0 +1,266 @@
+from __future__ import annotations
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import json, os, shutil, struct, tempfile
+from .jurisdiction import INDEX
+from .scoring import CRIT_CODES, PortfolioColumns, build_signal, hosting_signal, signing_signal
+
+# Columnar binary portfolio (".ogp"): every component of every dossier packed into flat arrays,
+# plus per-dossier offsets and header fields. Readers memory-map the file, so scoring streams over
+# it without building Pydantic objects. JSON dossiers remain the import/export format.
+#
+# Layout:  MAGIC | column bytes (64-byte aligned) ... | footer JSON | u64 footer offset | MAGIC
+# The footer lists each column's dtype/offset/length and the string tables of categorical columns.
+
+MAGIC = b"OGPF0001"
+FORMAT_VERSION = 1
+_ALIGN = 64
+
+# component columns
+_COMPONENT_COLUMNS = {"crit": "int8", "supplier": "int32", "risk": "float64"}
+# per-dossier categorical columns (code into a string table; -1 = missing)
+_CATEGORICAL = ("build_region", "key_jurisdiction", "hosting_jurisdiction", "label")
+# variable-length strings: blob (uint8) + offsets (int64, len n+1)
+_STRINGS = ("name", "version", "header")
+
+class PortfolioWriter:
+    """Streams dossiers (as JSON-shaped dicts) into a columnar file with bounded memory.
+
+    Each column is spooled to its own temp file while dossiers are added; close() concatenates them.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._tmp = tempfile.mkdtemp(prefix=".ogp-", dir=os.path.dirname(os.path.abspath(path)))
+        self._files = {}
+        for name in (*_COMPONENT_COLUMNS, *_CATEGORICAL, "offsets", *(f"{s}_blob" for s in _STRINGS), *(f"{s}_offsets" for s in _STRINGS)):
+            self._files[name] = open(os.path.join(self._tmp, name), "wb")
+        self._tables: Dict[str, Dict[str, int]] = {c: {} for c in ("supplier", *_CATEGORICAL)}
+        self._crit = {k: i for i, k in enumerate(CRIT_CODES)}
+        self._str_pos = {s: 0 for s in _STRINGS}
+        self.n_dossiers = 0
+        self.n_components = 0
+        self._files["offsets"].write(struct.pack("<q", 0))
+        for s in _STRINGS:
+            self._files[f"{s}_offsets"].write(struct.pack("<q", 0))
+
+    def _code(self, table: str, value: Optional[str]) -> int:
+        if value is None:
+            return -1
+        t = self._tables[table]
+        code = t.get(value)
+        if code is None:
+            code = t[value] = len(t)
+        return code
+
+    def _string(self, col: str, value: str) -> None:
+        b = value.encode("utf-8")
+        self._files[f"{col}_blob"].write(b)
+        self._str_pos[col] += len(b)
+        self._files[f"{col}_offsets"].write(struct.pack("<q", self._str_pos[col]))
+
+    def add(self, dossier: Dict[str, Any], label: Optional[str] = None) -> None:
+        comps = dossier["sbom"]["components"]
+        # checked before anything is written, so a rejected dossier leaves the file consistent
+        for j, c in enumerate(comps):
+            if c.get("criticality") not in self._crit:
+                raise ValueError(f"Dossier {self.n_dossiers}, component {j} ({c.get('name')!r}): criticality "
+                                 f"{c.get('criticality')!r} is not one of {', '.join(CRIT_CODES)}")
+        hosting = dossier.get("hosting") or {}
+        categorical = (("build_region", dossier["provenance"]["build_region"]),
+                       ("key_jurisdiction", dossier["signing"]["key_jurisdiction"]),
+                       ("hosting_jurisdiction", hosting.get("jurisdiction")),
+                       ("label", label))
+        crit = bytearray()
+        supplier: List[int] = []
+        risk: List[float] = []
+        for c in comps:
+            crit.append(self._crit[c["criticality"]])
+            supplier.append(self._code("supplier", c["supplier_jurisdiction"]))
+            risk.append(float(c["foreign_control_risk"]))
+            self._string("name", c["name"])
+            self._string("version", c["version"])
+        self._files["crit"].write(bytes(crit))
+        self._files["supplier"].write(struct.pack(f"<{len(supplier)}i", *supplier))
+        self._files["risk"].write(struct.pack(f"<{len(risk)}d", *risk))
+        self.n_components += len(comps)
+        self._files["offsets"].write(struct.pack("<q", self.n_components))
+
+        for col, value in categorical:
+            self._files[col].write(struct.pack("<i", self._code(col, value)))
+        header = {k: v for k, v in dossier.items() if k != "sbom"}
+        header["sbom"] = {"format": dossier["sbom"]["format"]}
+        self._string("header", json.dumps(header, separators=(",", ":")))
+        self.n_dossiers += 1
+
+    def close(self) -> None:
+        columns: Dict[str, Dict[str, Any]] = {}
+        dtypes = {**_COMPONENT_COLUMNS, **{c: "int32" for c in _CATEGORICAL}, "offsets": "int64",
+                  **{f"{s}_blob": "uint8" for s in _STRINGS}, **{f"{s}_offsets": "int64" for s in _STRINGS}}
+        with open(self.path, "wb") as out:
+            out.write(MAGIC)
+            for name, f in self._files.items():
+                f.close()
+                pad = (-out.tell()) % _ALIGN
+                out.write(b"\0" * pad)
+                offset = out.tell()
+                with open(f.name, "rb") as src:
+                    shutil.copyfileobj(src, out, 1 << 20)
+                columns[name] = {"dtype": dtypes[name], "offset": offset, "nbytes": out.tell() - offset}
+            footer = {
+                "format_version": FORMAT_VERSION,
+                "n_dossiers": self.n_dossiers,
+                "n_components": self.n_components,
+                "crit_codes": list(CRIT_CODES),
+                "columns": columns,
+                "tables": {k: list(t) for k, t in self._tables.items()},
+            }
+            footer_offset = out.tell()
+            out.write(json.dumps(footer).encode())
+            out.write(struct.pack("<Q", footer_offset))
+            out.write(MAGIC)
+        shutil.rmtree(self._tmp, ignore_errors=True)
+
+    def __enter__(self) -> "PortfolioWriter":
+        return self
+
+    def __exit__(self, exc_type, *exc) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            for f in self._files.values():
+                f.close()
+            shutil.rmtree(self._tmp, ignore_errors=True)
+
+class ColumnarPortfolio:
+    """Memory-mapped reader for .ogp files; column accessors return zero-copy NumPy views."""
+
+    def __init__(self, path: str):
+        import numpy as np
+
+        self.path = path
+        with open(path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"Not an OriginGate columnar portfolio: {path}")
+            f.seek(-(8 + len(MAGIC)), os.SEEK_END)
+            (footer_offset,) = struct.unpack("<Q", f.read(8))
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"Truncated columnar portfolio: {path}")
+            end = f.seek(0, os.SEEK_END) - 8 - len(MAGIC)
+            f.seek(footer_offset)
+            self.footer = json.loads(f.read(end - footer_offset))
+        if self.footer["format_version"] != FORMAT_VERSION:
+            raise ValueError(f"Unsupported columnar portfolio version {self.footer['format_version']}")
+        if tuple(self.footer["crit_codes"]) != CRIT_CODES:
+            raise ValueError("Columnar portfolio was written with a different criticality code table")
+        self._mm = np.memmap(path, dtype=np.uint8, mode="r")
+        self.tables: Dict[str, List[str]] = self.footer["tables"]
+        self.n_dossiers: int = self.footer["n_dossiers"]
+        self.n_components: int = self.footer["n_components"]
+        self._lookup_cache: Dict[str, Tuple[Any, ...]] = {}
+
+    def __len__(self) -> int:
+        return self.n_dossiers
+
+    def column(self, name: str):
+        spec = self.footer["columns"][name]
+        return self._mm[spec["offset"]:spec["offset"] + spec["nbytes"]].view(spec["dtype"])
+
+    def _string(self, col: str, i: int) -> str:
+        offs = self.column(f"{col}_offsets")
+        return bytes(self.column(f"{col}_blob")[offs[i]:offs[i + 1]]).decode("utf-8")
+
+    def labels(self, start: int = 0, stop: Optional[int] = None) -> List[Optional[str]]:
+        table = self.tables["label"]
+        return [table[c] if c >= 0 else None for c in self.column("label")[start:stop].tolist()]
+
+    def header(self, i: int) -> Dict[str, Any]:
+        return json.loads(self._string("header", i))
+
+    def dossier(self, i: int) -> Dict[str, Any]:
+        """Rebuilds dossier i as a JSON-shaped dict (export path)."""
+        d = self.header(i)
+        offsets = self.column("offsets")
+        lo, hi = int(offsets[i]), int(offsets[i + 1])
+        crit, supplier, risk = self.column("crit")[lo:hi], self.column("supplier")[lo:hi], self.column("risk")[lo:hi]
+        suppliers = self.tables["supplier"]
+        d["sbom"]["components"] = [
+            {"name": self._string("name", j), "version": self._string("version", j),
+             "supplier_jurisdiction": suppliers[int(supplier[j - lo])], "criticality": CRIT_CODES[int(crit[j - lo])],
+             "foreign_control_risk": float(risk[j - lo])}
+            for j in range(lo, hi)
+        ]
+        return d
+
+    def verify_errors(self, i: int) -> List[str]:
+        from .verify import verify_fields
+        h = self.header(i)
+        offsets = self.column("offsets")
+        return verify_fields(h["artifact"]["digest"], h["signing"]["signature"], int(offsets[i + 1] - offsets[i]))
+
+    def _signal_table(self, col: str, fn, target: str):
+        import numpy as np
+        # one slot per table entry plus a trailing slot for "missing" (code -1)
+        vals = [fn(v, target) for v in self.tables[col]] + [fn(None, target) if col == "hosting_jurisdiction" else 0.0]
+        return np.array(vals, dtype=np.float64)
+
+    def _lookups(self, target: str):
+        lk = self._lookup_cache.get(target)
+        if lk is None:
+            import numpy as np
+            ev = INDEX.evaluator(target)
+            domestic = np.array([ev.match(INDEX.code(s)) for s in self.tables["supplier"]] + [False], dtype=bool)
+            lk = self._lookup_cache[target] = (
+                domestic,
+                self._signal_table("build_region", build_signal, target),
+                self._signal_table("key_jurisdiction", signing_signal, target),
+                self._signal_table("hosting_jurisdiction", hosting_signal, target),
+            )
+        return lk
+
+    def columns(self, start: int, stop: int, target: str = "US") -> PortfolioColumns:
+        """PortfolioColumns for dossiers [start, stop), ready for scoring.score_columns."""
+        import numpy as np
+
+        domestic, ob, os_, oh = self._lookups(target)
+        offsets = self.column("offsets")
+        lo, hi = int(offsets[start]), int(offsets[stop])
+        return PortfolioColumns(
+            target=target,
+            crit=self.column("crit")[lo:hi],
+            domestic=domestic[self.column("supplier")[lo:hi]],
+            risk=self.column("risk")[lo:hi],
+            offsets=np.asarray(offsets[start:stop + 1]) - lo,
+            O_b=ob[self.column("build_region")[start:stop]],
+            O_s=os_[self.column("key_jurisdiction")[start:stop]],
+            O_h=oh[self.column("hosting_jurisdiction")[start:stop]],
+        )
+
+    def iter_columns(self, target: str = "US", chunk_size: int = 10_000) -> Iterator[Tuple[int, PortfolioColumns]]:
+        """Yields (first dossier index, PortfolioColumns) chunks."""
+        for start in range(0, self.n_dossiers, chunk_size):
+            yield start, self.columns(start, min(start + chunk_size, self.n_dossiers), target)
+
+def import_json_dir(portfolio_dir: str, out_path: str) -> int:
+    """Converts a JSON portfolio (labels.json + one file per dossier) into a columnar file."""
+    with open(os.path.join(portfolio_dir, "labels.json"), "r", encoding="utf-8") as f:
+        labels = json.load(f)
+    with PortfolioWriter(out_path) as w:
+        for row in labels:
+            with open(os.path.join(portfolio_dir, row["file"]), "r", encoding="utf-8") as f:
+                w.add(json.load(f), row.get("class"))
+    return len(labels)
+
+def export_json_dir(path: str, out_dir: str) -> int:
+    """Writes a columnar portfolio back out as labels.json + one JSON file per dossier."""
+    p = ColumnarPortfolio(path)
+    os.makedirs(out_dir, exist_ok=True)
+    labels = []
+    for i, label in enumerate(p.labels()):
+        d = p.dossier(i)
+        fn = f"{d['product']['name']}_{d['product']['version']}.json"
+        with open(os.path.join(out_dir, fn), "w", encoding="utf-8") as f:
+            json.dump(d, f, indent=2)
+        labels.append({"file": fn, "class": label})
+    with open(os.path.join(out_dir, "labels.json"), "w", encoding="utf-8") as f:
+        json.dump(labels, f, indent=2)
+    return len(labels)
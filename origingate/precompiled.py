@@ -0,0 +1,66 @@
+from __future__ import annotations
+from typing import Any, Dict, Iterable, Optional
+import hashlib, json, os
+
+# Precompiled configuration: policy files and jurisdictions.yaml parsed once into a JSON file keyed by
+# the sha256 of each source file. Loaders still read (and hash) the source, so an edited file can never
+# be served stale, but a cache hit skips the YAML parser and the yaml import altogether. Build it with
+# `python -m origingate compile`; without it (or for files it does not cover) everything falls back to YAML.
+
+PRECOMPILED_PATH = os.environ.get(
+    "ORIGINGATE_PRECOMPILED", os.path.join(os.path.dirname(os.path.dirname(__file__)), "precompiled.json"))
+
+FORMAT = 1
+
+_entries: Optional[Dict[str, Any]] = None
+
+def _cache() -> Dict[str, Any]:
+    global _entries
+    if _entries is None:
+        try:
+            with open(PRECOMPILED_PATH, "rb") as f:
+                data = json.load(f)
+            _entries = data["entries"] if data.get("format") == FORMAT else {}
+        except (OSError, ValueError, KeyError, AttributeError):
+            _entries = {}
+    return _entries
+
+def digest(raw: bytes) -> str:
+    return hashlib.sha256(raw).hexdigest()
+
+def load_yaml(raw: bytes) -> Any:
+    """Parsed YAML document; raises ValueError for malformed YAML."""
+    data = _cache().get(digest(raw))
+    if data is not None:
+        return data
+    import yaml
+    try:
+        return yaml.safe_load(raw)
+    except yaml.YAMLError as e:
+        raise ValueError(str(e)) from e
+
+def compile_files(paths: Iterable[str], out: str = PRECOMPILED_PATH) -> int:
+    """Writes the cache for paths (atomically); returns the number of files it covers.
+
+    Documents that do not survive a JSON round trip unchanged (non-string keys, dates, ...) are left out.
+    """
+    global _entries
+    import yaml
+    entries: Dict[str, Any] = {}
+    for path in paths:
+        with open(path, "rb") as f:
+            raw = f.read()
+        data = yaml.safe_load(raw)
+        try:
+            if json.loads(json.dumps(data)) != data:
+                continue
+        except (TypeError, ValueError):
+            continue
+        entries[digest(raw)] = data
+    tmp = out + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"format": FORMAT, "entries": entries}, f, separators=(",", ":"))
+    os.replace(tmp, out)
+    if out == PRECOMPILED_PATH:
+        _entries = None
+    return len(entries)
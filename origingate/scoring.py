@@ -1,6 +1,14 @@
 from __future__ import annotations
-from typing import Dict, List, Tuple
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple, Union
+import heapq
+from itertools import chain
+from operator import attrgetter
 from .models import SoftwareOriginDossier, ScoreWeights
+from .jurisdiction import INDEX
+
+if TYPE_CHECKING:
+    import numpy as np
 
 CRIT_WEIGHT = {
     "crypto": 0.35,
@@ -11,70 +19,146 @@ CRIT_WEIGHT = {
     "other": 0.03,
 }
 
-US_REGIONS = {"us-east-1","us-east-2","us-west-1","us-west-2","us-gov-east-1","us-gov-west-1"}
+# Region and jurisdiction matching is data-driven (jurisdictions.yaml, see jurisdiction.py)
 
-def _signal_build(d: SoftwareOriginDossier, target: str) -> Tuple[float, str]:
-    region = (d.provenance.build_region or "").lower()
-    if target.upper() == "US":
-        ok = region in US_REGIONS
-        return (1.0 if ok else 0.0, f"Build region={d.provenance.build_region} -> {'US' if ok else 'non-US'}")
-    ok = d.provenance.build_region.upper() == target.upper()
-    return (1.0 if ok else 0.0, f"Build region={d.provenance.build_region} vs target={target}")
+def build_signal(build_region: str, target: str) -> float:
+    return INDEX.evaluator(target).build(build_region)
 
-def _signal_signing(d: SoftwareOriginDossier, target: str) -> Tuple[float, str]:
-    kj = (d.signing.key_jurisdiction or "").upper()
-    ok = kj == target.upper()
-    return (1.0 if ok else 0.0, f"Signing key jurisdiction={kj} vs target={target.upper()}")
+def signing_signal(key_jurisdiction: str, target: str) -> float:
+    return INDEX.evaluator(target).signing(key_jurisdiction)
 
-def _signal_hosting(d: SoftwareOriginDossier, target: str) -> Tuple[float, str]:
-    if not d.hosting or not d.hosting.jurisdiction:
-        return (0.5, "Hosting jurisdiction missing -> neutral 0.5")
-    hj = d.hosting.jurisdiction.upper()
-    ok = hj == target.upper()
-    return (1.0 if ok else 0.0, f"Hosting jurisdiction={hj} vs target={target.upper()}")
+def hosting_signal(hosting_jurisdiction: Optional[str], target: str) -> float:
+    return INDEX.evaluator(target).hosting(hosting_jurisdiction)
 
-def compute_foi(d: SoftwareOriginDossier, target: str) -> Tuple[float, List[str]]:
-    foi = 0.0
-    explanations: List[str] = []
-    top_contrib = []
+# Explanations are (template, args) records, formatted into strings only when a response is
+# serialized (format_explanations). The detail level decides how many are produced at all:
+# "none" (no records), "summary" (one per signal), "full" (signals + top 8 FOI contributors)
+# or "top-k=N" (signals + top N contributors).
+Explanation = Tuple[str, tuple]
 
-    for c in d.sbom.components:
-        crit = c.criticality
-        v = CRIT_WEIGHT.get(crit, 0.03)
-        # foreign-control risk is already 0..1; if supplier is target, dampen
-        supplier = (c.supplier_jurisdiction or "").upper()
-        r = c.foreign_control_risk
-        if supplier == target.upper():
-            r = min(r, 0.15)
-        contrib = v * r
-        foi += contrib
-        top_contrib.append((contrib, c.name, crit, supplier, r))
-
-    top_contrib.sort(reverse=True, key=lambda x: x[0])
-    for contrib, name, crit, supplier, r in top_contrib[:8]:
-        explanations.append(f"FOI contrib {contrib:.3f}: {name} ({crit}) supplier={supplier} risk={r:.2f}")
-
-    # scale to a more human-friendly range
-    foi_scaled = foi * 100.0
-    return foi_scaled, explanations
+TOP_K_EXPLANATIONS = 8
+MAX_EXPLAIN_K = 100
 
-def compute_ocssbomsignal(d: SoftwareOriginDossier, target: str) -> Tuple[float, str]:
+def explain_depth(detail: str) -> Optional[int]:
+    """FOI contributors to explain for a detail level; None means no explanations at all."""
+    if detail == "full":
+        return TOP_K_EXPLANATIONS
+    if detail == "summary":
+        return 0
+    if detail == "none":
+        return None
+    if detail.startswith("top-k=") and detail[6:].isdigit():
+        return min(int(detail[6:]), MAX_EXPLAIN_K)
+    raise ValueError(f"explanation detail must be none, summary, full or top-k=N, got {detail!r}")
+
+def format_explanations(records: Iterable[Explanation]) -> List[str]:
+    return [template.format(*args) for template, args in records]
+
+def _signal_build(d: SoftwareOriginDossier, target: str) -> Tuple[float, Explanation]:
+    ev = INDEX.evaluator(target)
+    v = ev.build(d.provenance.build_region)
+    if ev.target == "US":
+        return (v, ("Build region={} -> {}", (d.provenance.build_region, "US" if v else "non-US")))
+    return (v, ("Build region={} vs target={}", (d.provenance.build_region, ev.target)))
+
+def _signal_signing(d: SoftwareOriginDossier, target: str) -> Tuple[float, Explanation]:
+    ev = INDEX.evaluator(target)
+    kj = INDEX.code(d.signing.key_jurisdiction)
+    return (1.0 if ev.match(kj) else 0.0, ("Signing key jurisdiction={} vs target={}", (kj, ev.target)))
+
+def _signal_hosting(d: SoftwareOriginDossier, target: str) -> Tuple[float, Explanation]:
+    hj = d.hosting.jurisdiction if d.hosting else None
+    if not hj:
+        return (0.5, ("Hosting jurisdiction missing -> neutral 0.5", ()))
+    ev = INDEX.evaluator(target)
+    code = INDEX.code(hj)
+    return (1.0 if ev.match(code) else 0.0, ("Hosting jurisdiction={} vs target={}", (code, ev.target)))
+
+Contributor = Tuple[float, str, str, str, float]
+
+class FOIAccumulator:
+    """Running FOI sum and top-k contributors for one target.
+
+    Feed components in SBOM order, in as many batches as convenient; only the k heap entries are retained.
+    """
+    __slots__ = ("k", "n", "foi", "_heap", "_domestic")
+
+    def __init__(self, target: str, k: int = TOP_K_EXPLANATIONS):
+        self.k = k
+        self.n = 0
+        self.foi = 0.0
+        self._heap: List[Tuple[float, int, str, str, str, float]] = []
+        self._domestic = INDEX.evaluator(target).match
+
+    def add(self, components: Iterable) -> None:
+        # Accumulates FOI and keeps the top-k contributors in a bounded min-heap.
+        # Ties keep SBOM order (same result as a stable full sort).
+        code, domestic, k, heap = INDEX.code, self._domestic, self.k, self._heap
+        foi = self.foi
+        i = self.n - 1
+        for i, c in enumerate(components, self.n):
+            crit = c.criticality
+            v = CRIT_WEIGHT.get(crit, 0.03)
+            # foreign-control risk is already 0..1; if supplier is target, dampen
+            supplier = code(c.supplier_jurisdiction)
+            r = c.foreign_control_risk
+            if domestic(supplier):
+                r = min(r, 0.15)
+            contrib = v * r
+            foi += contrib
+            if len(heap) < k:
+                heapq.heappush(heap, (contrib, -i, c.name, crit, supplier, r))
+            elif heap and contrib > heap[0][0]:
+                heapq.heapreplace(heap, (contrib, -i, c.name, crit, supplier, r))
+        self.foi = foi
+        self.n = i + 1
+
+    def result(self) -> Tuple[float, List[Contributor]]:
+        top = [(contrib, name, crit, supplier, r) for contrib, _, name, crit, supplier, r in sorted(self._heap, reverse=True)]
+        # scale to a more human-friendly range
+        return self.foi * 100.0, top
+
+def _sbom_pass(d: SoftwareOriginDossier, target: str, k: int = TOP_K_EXPLANATIONS) -> Tuple[float, List[Contributor]]:
+    acc = FOIAccumulator(target, k)
+    acc.add(d.sbom.components)
+    return acc.result()
+
+def component_contrib(criticality: str, risk: float, domestic: bool) -> Tuple[float, float]:
+    # Same per-component rule as _sbom_pass (which inlines it); returns (dampened risk, FOI contribution)
+    r = min(risk, 0.15) if domestic else risk
+    return r, CRIT_WEIGHT.get(criticality, 0.03) * r
+
+def _foi_explanations(top: List[Contributor]) -> List[Explanation]:
+    return [("FOI contrib {:.3f}: {} ({}) supplier={} risk={:.2f}", t) for t in top]
+
+def _oc_from_foi(foi_scaled: float) -> Tuple[float, Explanation]:
     # Convert FOI into an SBOM-origin signal in [0,1]: higher FOI -> lower O_c
-    foi_scaled, _ = compute_foi(d, target)
     # normalize with a soft cap; 0 -> 1, 50 -> ~0.5, 100 -> ~0.33
     oc = 1.0 / (1.0 + (foi_scaled / 50.0))
-    return float(max(0.0, min(1.0, oc))), f"SBOM signal from FOI={foi_scaled:.2f} -> O_c={oc:.2f}"
+    return float(max(0.0, min(1.0, oc))), ("SBOM signal from FOI={:.2f} -> O_c={:.2f}", (foi_scaled, oc))
 
-def score_origin(d: SoftwareOriginDossier, weights: ScoreWeights, target: str="US") -> Tuple[float, float, Dict[str,float], List[str]]:
-    explanations: List[str] = []
+def compute_foi(d: SoftwareOriginDossier, target: str) -> Tuple[float, List[str]]:
+    foi_scaled, top = _sbom_pass(d, target)
+    return foi_scaled, format_explanations(_foi_explanations(top))
 
-    O_b, eb = _signal_build(d, target); explanations.append(eb)
-    O_s, es = _signal_signing(d, target); explanations.append(es)
-    O_h, eh = _signal_hosting(d, target); explanations.append(eh)
-    O_c, ec = compute_ocssbomsignal(d, target); explanations.append(ec)
+def compute_ocssbomsignal(d: SoftwareOriginDossier, target: str) -> Tuple[float, str]:
+    foi_scaled, _ = _sbom_pass(d, target, k=0)
+    oc, e = _oc_from_foi(foi_scaled)
+    return oc, format_explanations([e])[0]
+
+ScoreRecords = Tuple[float, float, Dict[str, float], List[Explanation]]
+
+def score_from_foi(d: SoftwareOriginDossier, weights: ScoreWeights, target: str, foi: float,
+                   top: List[Contributor], explain: bool = True) -> ScoreRecords:
+    """Combines an SBOM pass result with the build/signing/hosting signals (d.sbom is not read).
 
-    foi, foi_expl = compute_foi(d, target)
-    explanations.extend(foi_expl)
+    Explanation records cover the signals plus every contributor in top; none at all when explain is false.
+    """
+    O_b, eb = _signal_build(d, target)
+    O_s, es = _signal_signing(d, target)
+    O_h, eh = _signal_hosting(d, target)
+    O_c, ec = _oc_from_foi(foi)
+    explanations = [eb, es, eh, ec] + _foi_explanations(top) if explain else []
 
     ocs = (
         weights.w_build * O_b +
@@ -85,3 +169,160 @@ def score_origin(d: SoftwareOriginDossier, weights: ScoreWeights, target: str="U
 
     signals = {"O_b":O_b, "O_c":O_c, "O_s":O_s, "O_h":O_h}
     return float(round(ocs,4)), float(round(foi,4)), signals, explanations
+
+def score_records(d: SoftwareOriginDossier, weights: ScoreWeights, target: str = "US", detail: str = "full") -> ScoreRecords:
+    """score_origin with unformatted explanation records."""
+    k = explain_depth(detail)
+    foi, top = _sbom_pass(d, target, k or 0)
+    return score_from_foi(d, weights, target, foi, top, k is not None)
+
+def score_origin(d: SoftwareOriginDossier, weights: ScoreWeights, target: str="US", detail: str = "full") -> Tuple[float, float, Dict[str,float], List[str]]:
+    ocs, foi, signals, records = score_records(d, weights, target, detail)
+    return ocs, foi, signals, format_explanations(records)
+
+# --- Multi-target scoring ------------------------------------------------------
+
+def _sbom_pass_multi(d: SoftwareOriginDossier, targets: Sequence[str], k: int = TOP_K_EXPLANATIONS) -> List[Tuple[float, List[Contributor]]]:
+    # One walk over the SBOM for every target. Each distinct supplier code gets a bitmask of the
+    # targets it is domestic for (computed once), so per component only the FOI accumulation and
+    # the top-k heaps are per target. Per-target sums run in component order, as in _sbom_pass.
+    evs = [INDEX.evaluator(t) for t in targets]
+    code = INDEX.code
+    masks: Dict[str, int] = {}
+    n = len(evs)
+    foi = [0.0] * n
+    heaps: List[List[Tuple[float, int, str, str, str, float]]] = [[] for _ in range(n)]
+
+    for i, c in enumerate(d.sbom.components):
+        crit = c.criticality
+        v = CRIT_WEIGHT.get(crit, 0.03)
+        supplier = code(c.supplier_jurisdiction)
+        mask = masks.get(supplier)
+        if mask is None:
+            mask = masks[supplier] = sum(1 << t for t, ev in enumerate(evs) if ev.match(supplier))
+        risk = c.foreign_control_risk
+        damped = min(risk, 0.15)
+        for t in range(n):
+            r = damped if mask >> t & 1 else risk
+            contrib = v * r
+            foi[t] += contrib
+            heap = heaps[t]
+            if len(heap) < k:
+                heapq.heappush(heap, (contrib, -i, c.name, crit, supplier, r))
+            elif heap and contrib > heap[0][0]:
+                heapq.heapreplace(heap, (contrib, -i, c.name, crit, supplier, r))
+
+    return [(foi[t] * 100.0, [(contrib, name, crit, supplier, r) for contrib, _, name, crit, supplier, r in sorted(heaps[t], reverse=True)])
+            for t in range(n)]
+
+def score_records_multi(d: SoftwareOriginDossier, weights: ScoreWeights, targets: Sequence[str], detail: str = "full") -> Dict[str, ScoreRecords]:
+    """score_records for several targets with a single SBOM traversal; keyed by target as given (duplicates collapse)."""
+    k = explain_depth(detail)
+    targets = list(dict.fromkeys(targets))
+    return {target: score_from_foi(d, weights, target, foi, top, k is not None)
+            for target, (foi, top) in zip(targets, _sbom_pass_multi(d, targets, k or 0))}
+
+def score_origin_multi(d: SoftwareOriginDossier, weights: ScoreWeights, targets: Sequence[str], detail: str = "full") -> Dict[str, Tuple[float, float, Dict[str, float], List[str]]]:
+    return {t: (ocs, foi, signals, format_explanations(records))
+            for t, (ocs, foi, signals, records) in score_records_multi(d, weights, targets, detail).items()}
+
+# --- Portfolio (batch) scoring -------------------------------------------------
+# Columnar, NumPy-backed equivalent of score_origin for many dossiers at once.
+# Results match the scalar path (same summation order via bincount); explanations
+# are not produced. Packing Pydantic dossiers costs about as much as scoring them one
+# by one; the speedup comes from reusing packed columns or reading them from a .ogp file.
+
+CRIT_CODES: Tuple[str, ...] = tuple(CRIT_WEIGHT)
+
+@dataclass
+class PortfolioColumns:
+    target: str
+    crit: "np.ndarray"          # int8 index into CRIT_CODES, len(CRIT_CODES) for unknown
+    domestic: "np.ndarray"      # bool, supplier_jurisdiction == target
+    risk: "np.ndarray"          # float64 foreign_control_risk
+    offsets: "np.ndarray"       # int64, len N+1; components of dossier i are [offsets[i], offsets[i+1])
+    O_b: "np.ndarray"
+    O_s: "np.ndarray"
+    O_h: "np.ndarray"
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+@dataclass
+class PortfolioScores:
+    ocs: "np.ndarray"
+    foi: "np.ndarray"
+    O_b: "np.ndarray"
+    O_c: "np.ndarray"
+    O_s: "np.ndarray"
+    O_h: "np.ndarray"
+
+    def __len__(self) -> int:
+        return len(self.ocs)
+
+    def signals(self, i: int) -> Dict[str, float]:
+        return {"O_b": float(self.O_b[i]), "O_c": float(self.O_c[i]), "O_s": float(self.O_s[i]), "O_h": float(self.O_h[i])}
+
+_CRITICALITY = attrgetter("criticality")
+_SUPPLIER = attrgetter("supplier_jurisdiction")
+_RISK = attrgetter("foreign_control_risk")
+
+def pack_portfolio(dossiers: Sequence[SoftwareOriginDossier], target: str = "US") -> PortfolioColumns:
+    # One attribute pass over all components; criticality and supplier strings are resolved once per
+    # distinct value (a portfolio has a handful of each), not once per component.
+    import numpy as np
+
+    ev = INDEX.evaluator(target)
+    n = len(dossiers)
+    offsets = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.fromiter((len(d.sbom.components) for d in dossiers), dtype=np.int64, count=n), out=offsets[1:])
+    total = int(offsets[-1])
+
+    comps = list(chain.from_iterable(d.sbom.components for d in dossiers))
+    crits = list(map(_CRITICALITY, comps))
+    suppliers = list(map(_SUPPLIER, comps))
+    code = {k: i for i, k in enumerate(CRIT_CODES)}
+    crit_of = {c: code.get(c, len(CRIT_CODES)) for c in set(crits)}
+    domestic_of = {s: ev.match(INDEX.code(s)) for s in set(suppliers)}
+    crit = np.fromiter(map(crit_of.__getitem__, crits), dtype=np.int8, count=total)
+    domestic = np.fromiter(map(domestic_of.__getitem__, suppliers), dtype=bool, count=total)
+    risk = np.fromiter(map(_RISK, comps), dtype=np.float64, count=total)
+
+    O_b = np.fromiter((ev.build(d.provenance.build_region) for d in dossiers), dtype=np.float64, count=n)
+    O_s = np.fromiter((ev.signing(d.signing.key_jurisdiction) for d in dossiers), dtype=np.float64, count=n)
+    O_h = np.fromiter((ev.hosting(d.hosting.jurisdiction if d.hosting else None) for d in dossiers), dtype=np.float64, count=n)
+    return PortfolioColumns(target=target, crit=crit, domestic=domestic, risk=risk, offsets=offsets, O_b=O_b, O_s=O_s, O_h=O_h)
+
+def score_columns(cols: PortfolioColumns, weights: ScoreWeights, crit_weight: Optional[Mapping[str, float]] = None) -> PortfolioScores:
+    import numpy as np
+
+    crit_weight = CRIT_WEIGHT if crit_weight is None else crit_weight
+    n = len(cols)
+    v_table = np.array([crit_weight.get(k, 0.03) for k in CRIT_CODES] + [0.03], dtype=np.float64)
+    r = np.where(cols.domestic, np.minimum(cols.risk, 0.15), cols.risk)
+    contrib = v_table[cols.crit] * r
+    seg = np.repeat(np.arange(n), np.diff(cols.offsets))
+    # bincount accumulates in component order, so sums are bit-identical to the scalar loop
+    foi_scaled = np.bincount(seg, weights=contrib, minlength=n) * 100.0
+    O_c = np.clip(1.0 / (1.0 + (foi_scaled / 50.0)), 0.0, 1.0)
+
+    ocs = (
+        weights.w_build * cols.O_b +
+        weights.w_sbom * O_c +
+        weights.w_signing * cols.O_s +
+        weights.w_hosting * cols.O_h
+    )
+    # Python's round() (correctly rounded) keeps parity with score_origin
+    ocs = np.fromiter((round(x, 4) for x in ocs.tolist()), dtype=np.float64, count=n)
+    foi = np.fromiter((round(x, 4) for x in foi_scaled.tolist()), dtype=np.float64, count=n)
+    return PortfolioScores(ocs=ocs, foi=foi, O_b=cols.O_b, O_c=O_c, O_s=cols.O_s, O_h=cols.O_h)
+
+def score_portfolio(
+    dossiers: Union[Sequence[SoftwareOriginDossier], PortfolioColumns],
+    weights: ScoreWeights,
+    target: str = "US",
+    crit_weight: Optional[Mapping[str, float]] = None,
+) -> PortfolioScores:
+    # Pass a PortfolioColumns (from pack_portfolio) to rescore without repacking.
+    cols = dossiers if isinstance(dossiers, PortfolioColumns) else pack_portfolio(dossiers, target)
+    return score_columns(cols, weights, crit_weight)
@@ -0,0 +1,145 @@
+from __future__ import annotations
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+import hashlib, json, os, threading, time, uuid
+from pydantic import ValidationError
+from .audit import AuditRecord
+from .engine import AssessError, _policy, assess_response, parse
+from .ingest import components_adapter
+from .metrics import record_sbom_size, record_verdict, stage
+from .models import DossierHeader, SessionInfo, SessionOpenRequest, ScoreWeights
+from .scoring import FOIAccumulator, explain_depth, score_from_foi
+from .verify import verify_fields
+
+# Chunked dossier uploads: the dossier header opens a session, SBOM components arrive as JSON-array
+# chunks and are folded into a FOIAccumulator straight away, and finalize verifies, scores and decides
+# from the accumulated state. Only the header and the top-k heap are kept, never the component list.
+#
+# Sessions live in this process; behind several API processes, route a session's requests to one of them.
+
+SESSION_TTL = float(os.environ.get("ORIGINGATE_SESSION_TTL", "900"))
+MAX_SESSIONS = int(os.environ.get("ORIGINGATE_MAX_SESSIONS", "1000"))
+
+class IngestSession:
+    __slots__ = ("session_id", "header", "policy_name", "context", "target", "weights", "explain", "acc", "inputs", "chunks", "touched", "lock")
+
+    def __init__(self, session_id: str, req: SessionOpenRequest, body: bytes = b""):
+        self.session_id = session_id
+        self.header: DossierHeader = req.dossier
+        self.policy_name = req.policy_name
+        self.context = req.context
+        self.target = req.target_jurisdiction
+        self.weights: ScoreWeights = req.weights
+        self.explain = req.explain != "none"
+        self.acc = FOIAccumulator(req.target_jurisdiction, explain_depth(req.explain) or 0)
+        self.inputs = hashlib.sha256(body)  # running hash of the open body and every accepted chunk
+        self.chunks = 0
+        self.touched = time.monotonic()
+        self.lock = threading.Lock()
+
+    def info(self, ttl: float) -> SessionInfo:
+        return SessionInfo(session_id=self.session_id, components=self.acc.n, chunks=self.chunks,
+                           expires_in=round(max(0.0, self.touched + ttl - time.monotonic()), 3))
+
+class SessionStore:
+    """Open upload sessions, expired after ttl seconds without a request."""
+
+    def __init__(self, max_sessions: int = MAX_SESSIONS, ttl: float = SESSION_TTL):
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self._sessions: "OrderedDict[str, IngestSession]" = OrderedDict()  # least recently touched first
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def _expire(self, now: float) -> None:
+        while self._sessions:
+            s = next(iter(self._sessions.values()))
+            if s.touched + self.ttl > now:
+                break
+            del self._sessions[s.session_id]
+
+    def open(self, req: SessionOpenRequest, body: bytes = b"") -> IngestSession:
+        with self._lock:
+            self._expire(time.monotonic())
+            if len(self._sessions) >= self.max_sessions:
+                raise AssessError(429, f"too many open upload sessions (limit {self.max_sessions})")
+            s = IngestSession(uuid.uuid4().hex, req, body)
+            self._sessions[s.session_id] = s
+            return s
+
+    def get(self, session_id: str) -> IngestSession:
+        with self._lock:
+            now = time.monotonic()
+            self._expire(now)
+            s = self._sessions.get(session_id)
+            if s is None:
+                raise AssessError(404, "upload session not found or expired")
+            s.touched = now
+            self._sessions.move_to_end(session_id)
+            return s
+
+    def pop(self, session_id: str) -> Optional[IngestSession]:
+        with self._lock:
+            return self._sessions.pop(session_id, None)
+
+SESSIONS = SessionStore()
+
+def open_session_json(body: bytes) -> bytes:
+    req = parse(SessionOpenRequest, body)
+    _policy(req.policy_name)  # unknown policies fail now rather than after the upload
+    return SESSIONS.open(req, body).info(SESSIONS.ttl).model_dump_json().encode()
+
+def add_components_json(session_id: str, body: bytes, seq: Optional[int] = None) -> bytes:
+    """Folds one chunk (a JSON array of SBOM components) into the session.
+
+    seq, when given, is the 0-based chunk number: resending the last accepted chunk is acknowledged
+    without being applied again, any other gap or reordering is a 409.
+    """
+    s = SESSIONS.get(session_id)
+    with s.lock:
+        if seq is not None and seq != s.chunks:
+            if seq == s.chunks - 1:
+                return s.info(SESSIONS.ttl).model_dump_json().encode()
+            raise AssessError(409, f"expected chunk seq {s.chunks}, got {seq}")
+        try:
+            with stage("validate"):
+                components = components_adapter().validate_json(body)
+        except ValidationError as e:
+            raise AssessError(422, json.loads(e.json(include_url=False))) from None
+        with stage("score"):
+            s.acc.add(components)
+        s.inputs.update(body)
+        s.chunks += 1
+        return s.info(SESSIONS.ttl).model_dump_json().encode()
+
+def finalize_session(session_id: str) -> Tuple[bytes, Optional[AuditRecord]]:
+    """AssessResponse JSON, plus an audit record when the decision's actions include log_audit.
+
+    Terminal: the session is gone afterwards, whatever the outcome.
+    """
+    s = SESSIONS.get(session_id)
+    with s.lock:
+        if SESSIONS.pop(session_id) is None:
+            raise AssessError(404, "upload session not found or expired")
+        d = s.header
+        record_sbom_size(s.acc.n)
+        with stage("verify"):
+            errors = verify_fields(d.artifact.digest, d.signing.signature, s.acc.n)
+        if errors:
+            raise AssessError(400, {"errors": errors})
+        p = _policy(s.policy_name)
+        with stage("score"):
+            ocs, foi, _, explanations = score_from_foi(d, s.weights, s.target, *s.acc.result(), explain=s.explain)
+        with stage("decide"):
+            decision = p.decide(ocs, foi, s.context, explain=s.explain)
+    record_verdict(s.policy_name, decision.verdict)
+    rec = None
+    if "log_audit" in decision.actions:
+        rec = AuditRecord("session", s.inputs.hexdigest(), s.policy_name, p.version, decision.verdict, ocs, foi,
+                          decision.fee_usd, d.product.name, d.product.version, d.artifact.digest, s.target)
+    return assess_response(decision, ocs, foi, explanations), rec
+
+def abort_session(session_id: str) -> Dict[str, bool]:
+    return {"deleted": SESSIONS.pop(session_id) is not None}
@@ -1,6 +1,10 @@
 from __future__ import annotations
-from dataclasses import dataclass
-from typing import Dict, Optional
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+import json, os, queue, sqlite3, threading, time
+from .cache import ResultCache
 from .models import SoftwareOriginDossier
 
 @dataclass
@@ -9,11 +13,238 @@ class Baseline:
     ocs0: float
     foi0: float
     artifact_digest: str
+    product_name: str = ""
+    product_version: str = ""
+    target: str = "US"
+    # unscaled FOI sum + per-component contribution index (see drift.component_index); None on legacy rows
+    foi_sum: float = 0.0
+    components: Optional[Dict[str, List[Any]]] = None
 
-_BASELINES: Dict[str, Baseline] = {}
+class BaselineStore(ABC):
+    """Interface for baseline backends. Implementations must be safe to share across threads."""
+
+    def put(self, b: Baseline) -> None:
+        self.put_many([b])
+
+    @abstractmethod
+    def put_many(self, baselines: Iterable[Baseline]) -> int: ...
+
+    @abstractmethod
+    def get(self, baseline_id: str) -> Optional[Baseline]: ...
+
+    @abstractmethod
+    def find(self, artifact_digest: Optional[str] = None, product_name: Optional[str] = None,
+             product_version: Optional[str] = None, limit: int = 100) -> List[Baseline]:
+        """Matching baselines for listing; backends may leave out the component index (use get() for it)."""
+
+    def stats(self) -> Dict[str, int]:
+        return {}
+
+    def close(self) -> None:
+        pass
+
+class MemoryBaselineStore(BaselineStore):
+    """Process-local store (baselines are lost on restart and not shared across workers)."""
+
+    def __init__(self):
+        self._baselines: Dict[str, Baseline] = {}
+        # put_many and find may run on different threadpool threads; find scans a snapshot
+        self._lock = threading.Lock()
+
+    def put_many(self, baselines: Iterable[Baseline]) -> int:
+        batch = list(baselines)
+        with self._lock:
+            for b in batch:
+                self._baselines[b.baseline_id] = b
+        return len(batch)
+
+    def get(self, baseline_id: str) -> Optional[Baseline]:
+        return self._baselines.get(baseline_id)
+
+    def find(self, artifact_digest=None, product_name=None, product_version=None, limit=100) -> List[Baseline]:
+        with self._lock:
+            snapshot = list(self._baselines.values())
+        out = []
+        for b in snapshot:
+            if artifact_digest is not None and b.artifact_digest != artifact_digest:
+                continue
+            if product_name is not None and b.product_name != product_name:
+                continue
+            if product_version is not None and b.product_version != product_version:
+                continue
+            out.append(b)
+            if len(out) >= limit:
+                break
+        return out
+
+    def stats(self) -> Dict[str, int]:
+        return {"baselines": len(self._baselines)}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS baselines (
+    baseline_id TEXT PRIMARY KEY,
+    artifact_digest TEXT NOT NULL,
+    product_name TEXT NOT NULL DEFAULT '',
+    product_version TEXT NOT NULL DEFAULT '',
+    payload TEXT NOT NULL,
+    updated_at REAL NOT NULL,
+    ocs0 REAL,
+    foi0 REAL
+);
+CREATE INDEX IF NOT EXISTS idx_baselines_digest ON baselines(artifact_digest);
+CREATE INDEX IF NOT EXISTS idx_baselines_product ON baselines(product_name, product_version);
+"""
+
+class SQLiteBaselineStore(BaselineStore):
+    """SQLite (WAL) backend shared by every worker pointing at the same file.
+
+    Reads go through a bounded in-process LRU; cache_ttl bounds how long another
+    process's overwrite of the same baseline_id can go unseen.
+    """
+
+    def __init__(self, path: str, pool_size: int = 4, cache_size: int = 10_000, cache_ttl: float = 5.0, batch_size: int = 1000):
+        self.path = path
+        self.batch_size = batch_size
+        self._cache = ResultCache(cache_size, cache_ttl)
+        self._pool: "queue.Queue[sqlite3.Connection]" = queue.Queue(maxsize=max(1, pool_size))
+        with self._conn() as conn:
+            conn.executescript(_SCHEMA)
+            self._migrate(conn)
+
+    @staticmethod
+    def _migrate(conn: sqlite3.Connection) -> None:
+        # files created before ocs0/foi0 became columns (find lists baselines without parsing payloads)
+        cols = {r[1] for r in conn.execute("PRAGMA table_info(baselines)")}
+        if "ocs0" in cols:
+            return
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            cols = {r[1] for r in conn.execute("PRAGMA table_info(baselines)")}
+            if "ocs0" not in cols:
+                conn.execute("ALTER TABLE baselines ADD COLUMN ocs0 REAL")
+                conn.execute("ALTER TABLE baselines ADD COLUMN foi0 REAL")
+                conn.execute("UPDATE baselines SET ocs0 = json_extract(payload, '$.ocs0'), foi0 = json_extract(payload, '$.foi0')")
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30.0, check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA busy_timeout=30000")
+        return conn
+
+    @contextmanager
+    def _conn(self) -> Iterator[sqlite3.Connection]:
+        # Reuse an idle pooled connection; open an extra one under contention and close it if the pool is full
+        try:
+            conn = self._pool.get_nowait()
+        except queue.Empty:
+            conn = self._connect()
+        try:
+            yield conn
+        finally:
+            try:
+                self._pool.put_nowait(conn)
+            except queue.Full:
+                conn.close()
+
+    @staticmethod
+    def _row(b: Baseline, now: float) -> tuple:
+        return (b.baseline_id, b.artifact_digest, b.product_name, b.product_version, json.dumps(asdict(b), separators=(",", ":")), now,
+                b.ocs0, b.foi0)
+
+    def put_many(self, baselines: Iterable[Baseline]) -> int:
+        # one transaction per batch_size rows
+        n = 0
+        batch: List[Baseline] = []
+        for b in baselines:
+            batch.append(b)
+            if len(batch) >= self.batch_size:
+                n += self._write(batch)
+                batch = []
+        if batch:
+            n += self._write(batch)
+        return n
+
+    def _write(self, batch: List[Baseline]) -> int:
+        now = time.time()
+        with self._conn() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.executemany("INSERT OR REPLACE INTO baselines (baseline_id, artifact_digest, product_name, product_version, payload, updated_at, ocs0, foi0) "
+                                 "VALUES (?,?,?,?,?,?,?,?)", [self._row(b, now) for b in batch])
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        for b in batch:
+            self._cache.put(b.baseline_id, b)
+        return len(batch)
+
+    def get(self, baseline_id: str) -> Optional[Baseline]:
+        b = self._cache.get(baseline_id)
+        if b is not None:
+            return b
+        with self._conn() as conn:
+            row = conn.execute("SELECT payload FROM baselines WHERE baseline_id = ?", (baseline_id,)).fetchone()
+        if row is None:
+            return None
+        b = Baseline(**json.loads(row[0]))
+        self._cache.put(baseline_id, b)
+        return b
+
+    def find(self, artifact_digest=None, product_name=None, product_version=None, limit=100) -> List[Baseline]:
+        # listing needs only the indexed columns and the initial scores, not the payload's component index
+        clauses, args = [], []
+        for col, val in (("artifact_digest", artifact_digest), ("product_name", product_name), ("product_version", product_version)):
+            if val is not None:
+                clauses.append(f"{col} = ?")
+                args.append(val)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._conn() as conn:
+            rows = conn.execute(f"SELECT baseline_id, ocs0, foi0, artifact_digest, product_name, product_version FROM baselines{where} LIMIT ?",
+                                (*args, limit)).fetchall()
+        return [Baseline(*r) for r in rows]
+
+    def stats(self) -> Dict[str, int]:
+        with self._conn() as conn:
+            (count,) = conn.execute("SELECT COUNT(*) FROM baselines").fetchone()
+        return {"baselines": count, "cache_hits": self._cache.hits, "cache_misses": self._cache.misses}
+
+    def close(self) -> None:
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                break
+
+def store_from_env() -> BaselineStore:
+    # ORIGINGATE_STORE: "memory" (default) or "sqlite:///path/to/baselines.db"
+    url = os.environ.get("ORIGINGATE_STORE", "memory")
+    if url == "memory":
+        return MemoryBaselineStore()
+    if url.startswith("sqlite:///"):
+        return SQLiteBaselineStore(
+            url[len("sqlite:///"):],
+            pool_size=int(os.environ.get("ORIGINGATE_STORE_POOL", "4")),
+            cache_size=int(os.environ.get("ORIGINGATE_STORE_CACHE", "10000")),
+        )
+    raise ValueError(f"Unsupported ORIGINGATE_STORE: {url}")
+
+STORE: BaselineStore = store_from_env()
+
+def baseline_from_dossier(baseline_id: str, d: SoftwareOriginDossier, ocs0: float, foi0: float, target: str = "US") -> Baseline:
+    from .drift import component_index
+    foi_sum, components = component_index(d, target)
+    return Baseline(baseline_id=baseline_id, ocs0=ocs0, foi0=foi0, artifact_digest=d.artifact.digest,
+                    product_name=d.product.name, product_version=d.product.version,
+                    target=target, foi_sum=foi_sum, components=components)
 
 def put_baseline(b: Baseline) -> None:
-    _BASELINES[b.baseline_id] = b
+    STORE.put(b)
 
 def get_baseline(baseline_id: str) -> Optional[Baseline]:
-    return _BASELINES.get(baseline_id)
+    return STORE.get(baseline_id)
@@ -2,20 +2,24 @@ from __future__ import annotations
 from typing import List
 from .models import SoftwareOriginDossier, VerifyResponse
 
-def verify_dossier(d: SoftwareOriginDossier) -> VerifyResponse:
+def verify_fields(digest: str, signature: str, n_components: int) -> List[str]:
     errors: List[str] = []
 
     # Demo verification: ensure digest is sha256:...
-    if not d.artifact.digest.startswith("sha256:"):
+    if not digest.startswith("sha256:"):
         errors.append("artifact.digest must start with 'sha256:'")
 
     # Demo signing check
-    if not d.signing.signature:
+    if not signature:
         errors.append("missing signing.signature")
 
     # SBOM sanity
-    if len(d.sbom.components) == 0:
+    if n_components == 0:
         errors.append("sbom.components empty")
 
+    return errors
+
+def verify_dossier(d: SoftwareOriginDossier) -> VerifyResponse:
+    errors = verify_fields(d.artifact.digest, d.signing.signature, len(d.sbom.components))
     ok = len(errors) == 0
     return VerifyResponse(ok=ok, errors=errors)
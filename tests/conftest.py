@@ -0,0 +1,41 @@
+from __future__ import annotations
+import random
+from typing import Any, Dict, List
+import pytest
+from origingate.models import SoftwareOriginDossier
+
+CRITS = ["crypto", "auth", "network", "data", "ui", "other"]
+# canonical codes, aliases, bloc members, lower case and padding, so jurisdiction matching is exercised too
+SUPPLIERS = ["US", "us", "EU", "DE", " fr ", "UK", "GB", "IN", "CN", "SG", "JP", "BR", ""]
+REGIONS = ["us-east-1", "eu-central-1", "europe-west3", "ap-south-1", "US", "DE", "", "unknown-region-9"]
+TARGETS = ["US", "EU", "DE", "GB", "UK", "IN", "eu-west-1"]
+
+def dossier_dict(rng: random.Random, name: str = "Prod", n_components: int = 120) -> Dict[str, Any]:
+    comps: List[Dict[str, Any]] = []
+    for i in range(n_components):
+        comps.append({
+            "name": f"lib{i % (n_components - 5)}",  # a few repeated names
+            "version": f"{rng.randint(0, 3)}.{rng.randint(0, 9)}",
+            "supplier_jurisdiction": rng.choice(SUPPLIERS),
+            "criticality": rng.choice(CRITS),
+            # a coarse grid, so equal contributions (top-k ties) are common
+            "foreign_control_risk": rng.choice([0.05, 0.1, 0.15, 0.2, 0.5, 0.8, 1.0, round(rng.random(), 3)]),
+        })
+    return {
+        "product": {"name": name, "version": "1.0.0"},
+        "artifact": {"digest": "sha256:" + "ab" * 32, "uri": f"oci://registry.example/{name}:1.0.0"},
+        "provenance": {"builder_id": "ci://test", "build_region": rng.choice(REGIONS), "timestamp": "2026-01-01T00:00:00Z",
+                       "source_repo": "https://git.example/org/repo", "commit": "0ab93e6d"},
+        "sbom": {"format": "cyclonedx-lite", "components": comps},
+        "signing": {"key_jurisdiction": rng.choice(SUPPLIERS), "signature": "demo-signature"},
+        "hosting": rng.choice([None, {"type": "saas", "jurisdiction": rng.choice(SUPPLIERS)}]),
+    }
+
+@pytest.fixture
+def dossier_dicts() -> List[Dict[str, Any]]:
+    rng = random.Random(2026)
+    return [dossier_dict(rng, f"Prod{i}", rng.choice([6, 40, 120, 400])) for i in range(25)]
+
+@pytest.fixture
+def dossiers(dossier_dicts) -> List[SoftwareOriginDossier]:
+    return [SoftwareOriginDossier.model_validate(d) for d in dossier_dicts]
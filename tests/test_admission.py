@@ -0,0 +1,85 @@
+from __future__ import annotations
+import asyncio, json, os, threading
+import httpx
+import pytest
+import origingate.api.main as api
+from origingate.admission import AdmissionController, Overloaded, SingleFlight
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def _body(version: str = "1.0.0") -> bytes:
+    with open(os.path.join(ROOT, "examples", "dossier_foreign.json"), encoding="utf-8") as f:
+        dossier = json.load(f)
+    dossier["product"]["version"] = version
+    return json.dumps({"dossier": dossier, "policy_name": "enterprise_moderate"}).encode()
+
+@pytest.fixture
+def slow_engine(monkeypatch):
+    # holds every engine call until released, so requests overlap deterministically
+    calls, gate = [], threading.Event()
+    real = api.assess_audited
+    def slow(body: bytes, inputs_hash=None):
+        calls.append(inputs_hash)
+        gate.wait(5)
+        return real(body, inputs_hash)
+    slow.__name__ = "assess_audited"
+    monkeypatch.setattr(api, "assess_audited", slow)
+    return calls, gate
+
+async def _post_all(bodies, release: threading.Event, delay: float = 0.2):
+    transport = httpx.ASGITransport(app=api.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        posts = [asyncio.ensure_future(client.post("/v1/assess", content=b)) for b in bodies]
+        await asyncio.sleep(delay)
+        release.set()
+        return await asyncio.gather(*posts)
+
+def test_identical_concurrent_requests_share_one_engine_call(slow_engine):
+    calls, gate = slow_engine
+    responses = asyncio.run(_post_all([_body()] * 8, gate))
+    assert [r.status_code for r in responses] == [200] * 8
+    assert len({r.content for r in responses}) == 1
+    assert len(calls) == 1 and len(api.COALESCE) == 0
+
+def test_distinct_requests_are_not_coalesced(slow_engine):
+    calls, gate = slow_engine
+    responses = asyncio.run(_post_all([_body(f"1.0.{i}") for i in range(3)], gate))
+    assert [r.status_code for r in responses] == [200] * 3
+    assert len(calls) == 3
+
+def test_admission_limit_returns_429_with_retry_after(slow_engine, monkeypatch):
+    calls, gate = slow_engine
+    monkeypatch.setattr(api, "ADMISSION", AdmissionController(2))
+    responses = asyncio.run(_post_all([_body(f"2.0.{i}") for i in range(4)], gate))
+    assert sorted(r.status_code for r in responses) == [200, 200, 429, 429]
+    for r in responses:
+        if r.status_code == 429:
+            assert r.headers["retry-after"] == "1" and "server busy" in r.json()["detail"]
+    assert len(calls) == 2 and api.ADMISSION.pending == 0
+
+def test_single_flight_shares_result_and_errors():
+    async def go():
+        sf, runs = SingleFlight(), []
+        async def work():
+            runs.append(1)
+            await asyncio.sleep(0.05)
+            return "ok"
+        async def fail():
+            await asyncio.sleep(0.05)
+            raise ValueError("bad")
+        assert await asyncio.gather(*(sf.do("k", work) for _ in range(5))) == ["ok"] * 5
+        assert len(runs) == 1 and len(sf) == 0
+        results = await asyncio.gather(*(sf.do("e", fail) for _ in range(3)), return_exceptions=True)
+        assert all(isinstance(e, ValueError) for e in results)
+        assert await sf.do("k", work) == "ok" and len(runs) == 2  # nothing is remembered after completion
+    asyncio.run(go())
+
+def test_admission_controller_releases_slots():
+    ac = AdmissionController(1)
+    with ac.slot():
+        with pytest.raises(Overloaded):
+            with ac.slot():
+                pass
+    assert ac.pending == 0
+    with ac.slot():
+        assert ac.pending == 1
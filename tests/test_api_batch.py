@@ -0,0 +1,30 @@
+from __future__ import annotations
+import json, os, shutil
+from fastapi.testclient import TestClient
+import origingate.api.main as api
+from origingate.policy import POLICY_DIR, REGISTRY
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def test_failing_lines_do_not_end_the_stream(tmp_path, monkeypatch):
+    shutil.copy(os.path.join(POLICY_DIR, "enterprise_moderate.yaml"), tmp_path)
+    (tmp_path / "broken.yaml").write_text("name: [unclosed\n")
+    monkeypatch.setattr(REGISTRY, "policy_dir", str(tmp_path))
+    real = api.assess_audited
+    def flaky(body: bytes, inputs_hash=None):
+        if b'"boom"' in body:
+            raise RuntimeError("boom")
+        return real(body, inputs_hash)
+    monkeypatch.setattr(api, "assess_audited", flaky)
+
+    with open(os.path.join(ROOT, "examples", "dossier_foreign.json"), encoding="utf-8") as f:
+        dossier = json.load(f)
+    line = lambda policy, **extra: json.dumps({"dossier": dossier, "policy_name": policy, **extra})
+    body = "\n".join([line("enterprise_moderate"), line("broken"), "{not json", line("enterprise_moderate", context={"boom": 1}),
+                      line("enterprise_moderate", target_jurisdiction="EU")])
+    r = TestClient(api.app).post("/v1/assess:batch", content=body)
+    assert r.status_code == 200
+    out = [json.loads(l) for l in r.text.splitlines()]
+    assert [o["line"] for o in out] == [1, 2, 3, 4, 5]
+    assert "result" in out[0] and "result" in out[4]
+    assert [o["error"]["status_code"] for o in out[1:4]] == [503, 422, 500]
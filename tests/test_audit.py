@@ -0,0 +1,35 @@
+from __future__ import annotations
+import os
+from origingate.audit import AuditLog, AuditRecord, scan
+
+def _rec(i: int) -> AuditRecord:
+    return AuditRecord("assess", f"h{i}", "enterprise_moderate", "v1", "DENY" if i % 3 == 0 else "ALLOW", 0.5, 1.0, 0.0, f"P{i % 4}")
+
+def test_writers_sharing_a_directory_keep_every_record(tmp_path):
+    logs = [AuditLog(str(tmp_path), segment_bytes=1500, fsync=False) for _ in range(2)]
+    for log in logs:
+        log.start()
+    assert logs[0].slot != logs[1].slot
+    for i in range(60):
+        logs[i % 2].record(_rec(i))
+    for log in logs:
+        log.close()
+    rows = list(scan(str(tmp_path)))
+    assert sorted(r["inputs_hash"] for r in rows) == sorted(f"h{i}" for i in range(60))
+    assert [r["ts"] for r in rows] == sorted(r["ts"] for r in rows)
+    assert len(list(scan(str(tmp_path), verdict="DENY", product="P0"))) == 5
+
+def test_leftover_segment_is_sealed_by_next_owner(tmp_path):
+    log = AuditLog(str(tmp_path), fsync=False)
+    log.start()
+    slot = log.slot
+    log.record(_rec(1))
+    log.close()
+    with open(os.path.join(slot, "seg-00000050.jsonl"), "wb") as f:  # crashed writer: one full line, one torn
+        f.write(b'{"ts":1.0,"product":"X","verdict":"ALLOW","policy":"p","inputs_hash":"x"}\n{"ts":2')
+    log = AuditLog(str(tmp_path), fsync=False)
+    log.start()
+    assert log.slot == slot
+    log.close()
+    assert os.path.exists(os.path.join(slot, "seg-00000050.jsonl.gz"))
+    assert sorted(r["inputs_hash"] for r in scan(str(tmp_path))) == ["h1", "x"]
@@ -0,0 +1,58 @@
+from __future__ import annotations
+import json, os, shutil
+from origingate.cache import RESULTS, policy_tag
+from origingate.engine import assess_audited, assess_json, score_json, score_multi_json
+from origingate.policy import POLICY_DIR, REGISTRY
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def _dossier() -> dict:
+    with open(os.path.join(ROOT, "examples", "dossier_foreign.json"), encoding="utf-8") as f:
+        return json.load(f)
+
+def test_cached_responses_are_byte_identical(monkeypatch):
+    d = _dossier()
+    bodies = {
+        assess_json: {"dossier": d, "policy_name": "enterprise_moderate", "context": {"annual_usage_usd": 500_000}},
+        score_json: {"dossier": d, "target_jurisdiction": "EU", "explain": "top-k=4"},
+        score_multi_json: {"dossier": d, "target_jurisdictions": ["US", "DE", "EU"]},
+    }
+    for fn, req in bodies.items():
+        body = json.dumps(req).encode()
+        # same request, other key order and whitespace: misses the raw-body key, hits the canonical score key
+        reordered = json.dumps(dict(reversed(list(req.items()))), indent=2).encode()
+        monkeypatch.setattr(RESULTS, "maxsize", 0)
+        RESULTS.clear()
+        uncached = fn(body)
+        monkeypatch.setattr(RESULTS, "maxsize", 4096)
+        cold = fn(body)
+        hits = RESULTS.hits
+        warm = fn(body)
+        assert RESULTS.hits > hits
+        hits = RESULTS.hits
+        assert uncached == cold == warm == fn(reordered), fn.__name__
+        assert RESULTS.hits > hits
+
+def test_policy_change_invalidates_cached_assessments(tmp_path, monkeypatch):
+    shutil.copy(os.path.join(POLICY_DIR, "enterprise_moderate.yaml"), tmp_path)
+    path = tmp_path / "enterprise_moderate.yaml"
+    monkeypatch.setattr(REGISTRY, "policy_dir", str(tmp_path))
+    RESULTS.clear()
+    body = json.dumps({"dossier": _dossier(), "policy_name": "enterprise_moderate", "context": {"annual_usage_usd": 1_000_000}}).encode()
+    before = json.loads(assess_json(body))
+    assert assess_json(body) == assess_json(body)
+    assert RESULTS.invalidate_tag(policy_tag("other")) == 0 and RESULTS.stats()["size"] > 0
+
+    path.write_text(path.read_text().replace("rate: 0.10", "rate: 0.20"))
+    os.utime(path, ns=(2_000_000_000, 2_000_000_000))
+    after = json.loads(assess_json(body))
+    assert after["fee_usd"] == before["fee_usd"] * 2
+    _, rec = assess_audited(body)
+    assert rec.policy_version == REGISTRY.get("enterprise_moderate").version
+
+    # the recompile dropped every entry tagged with this policy, so nothing stale is left to serve
+    path.write_text(path.read_text().replace("rate: 0.20", "rate: 0.10"))
+    os.utime(path, ns=(3_000_000_000, 3_000_000_000))
+    REGISTRY.get("enterprise_moderate")
+    assert not any(tag == policy_tag("enterprise_moderate") for _, tag, _ in RESULTS._d.values())
+    assert json.loads(assess_json(body)) == before
@@ -0,0 +1,62 @@
+from __future__ import annotations
+import numpy as np
+import pytest
+from origingate.calibration import Signals, collect_signals, sweep, weight_grid
+from origingate.models import ScoreWeights
+from origingate.policy import Policy, compile_policy, get_policy
+from benchmarks import generate_portfolio, run_eval
+
+def _signals(n: int, seed: int) -> Signals:
+    rng = np.random.default_rng(seed)
+    return Signals(O_b=rng.integers(0, 2, n).astype(float), O_c=np.round(rng.random(n), 3),
+                   O_s=rng.integers(0, 2, n).astype(float), O_h=rng.choice([0.0, 0.5, 1.0], n),
+                   foi=np.round(rng.random(n) * 60, 3), truth=rng.random(n) < 0.4)
+
+@pytest.mark.parametrize("fee_enabled", [True, False])
+def test_sweep_matches_compiled_policy_decide(fee_enabled):
+    sig = _signals(300, seed=7)
+    weights = weight_grid(0.25)
+    taus, gammas = [0.3, 0.45, 0.6, 0.75], [5.0, 20.0, 40.0]
+    bands = [None, (0.45, None), (0.2, 0.5), (0.5, 0.9)]
+    usage, rate = 1_000_000.0, 0.1
+    res = sweep(sig, weights, taus, gammas, bands, fee_enabled=fee_enabled, fee_rate=rate, usage_usd=usage)
+
+    rng = np.random.default_rng(11)
+    for i in rng.choice(len(res), 400, replace=False):
+        w = res.weights[i]
+        band = None if np.isnan(res.review_low[i]) else {"ocs_low": res.review_low[i], "ocs_high": res.review_high[i]}
+        if band and band["ocs_low"] > band["ocs_high"]:
+            continue  # not a valid policy (compile_policy rejects it)
+        p = compile_policy(Policy(name="cand", thresholds={"tau_min_ocs": res.tau[i], "gamma_max_foi": res.gamma[i]},
+                                  actions={}, fee={"enabled": fee_enabled, "rate": rate}, review_band=band))
+        ocs = np.round(w[0] * sig.O_b + w[1] * sig.O_c + w[2] * sig.O_s + w[3] * sig.O_h, 4)
+        counts = dict.fromkeys(("ALLOW", "REVIEW", "ALLOW_WITH_FEE", "DENY"), 0)
+        tp = fp = fn = tn = 0
+        fee = 0.0
+        for o, f, t in zip(ocs, sig.foi, sig.truth):
+            d = p.decide(float(o), float(f), {"annual_usage_usd": usage}, explain=False)
+            counts[d.verdict] += 1
+            fee += d.fee_usd
+            flagged = d.verdict != "ALLOW"
+            tp += flagged and t
+            fp += flagged and not t
+            fn += not flagged and t
+            tn += not flagged and not t
+        row = res.row(int(i))
+        assert (row["allow"], row["review"], row["allow_with_fee"], row["deny"]) == \
+            (counts["ALLOW"], counts["REVIEW"], counts["ALLOW_WITH_FEE"], counts["DENY"]), row
+        assert (row["tp"], row["fp"], row["fn"], row["tn"]) == (tp, fp, fn, tn), row
+        assert row["fee_usd"] == pytest.approx(fee, abs=0.02), row
+
+@pytest.mark.parametrize("policy", ["enterprise_moderate", "fed_strict"])
+def test_run_eval_and_sweep_agree_on_a_policy_operating_point(policy, tmp_path, capsys):
+    generate_portfolio.main(str(tmp_path), n=150, seed=3, fmt="columnar")
+    path = str(tmp_path / "portfolio.ogp")
+    c = run_eval.evaluate(path, (policy,), workers=0)[policy]
+    p, d = get_policy(policy), ScoreWeights()
+    ref = sweep(collect_signals(path), [[d.w_build, d.w_sbom, d.w_signing, d.w_hosting]], [p.tau], [p.gamma],
+                [None if p.review_low is None else (p.review_low, p.review_high)], fee_enabled=p.fee_enabled, fee_rate=p.fee_rate)
+    row = ref.row(0)
+    assert (row["tp"], row["fp"], row["fn"], row["tn"]) == (c["tp"], c["fp"], c["fn"], c["tn"])
+    assert (row["allow"], row["review"], row["allow_with_fee"], row["deny"]) == \
+        (c["verdict:ALLOW"], c["verdict:REVIEW"], c["verdict:ALLOW_WITH_FEE"], c["verdict:DENY"])
@@ -0,0 +1,108 @@
+from __future__ import annotations
+import json, os, subprocess, sys
+import pytest
+from origingate import precompiled
+from origingate.__main__ import EXIT_ALLOW, EXIT_BLOCK, EXIT_INVALID, main
+from origingate.policy import POLICY_DIR
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+EXAMPLES = os.path.join(ROOT, "examples")
+
+def _domestic(tmp_path, **changes) -> str:
+    with open(os.path.join(EXAMPLES, "dossier_domestic.json"), encoding="utf-8") as f:
+        d = json.load(f)
+    for c in d["sbom"]["components"]:
+        c.update(changes)
+    path = tmp_path / "dossier.json"
+    path.write_text(json.dumps(d))
+    return str(path)
+
+def test_assess_exit_codes(tmp_path, capsys):
+    clean = _domestic(tmp_path, foreign_control_risk=0.0)
+    assert main(["assess", clean, "--policy", "enterprise_moderate"]) == EXIT_ALLOW
+    assert json.loads(capsys.readouterr().out)["verdict"] == "ALLOW"
+    foreign = os.path.join(EXAMPLES, "dossier_foreign.json")
+    assert main(["assess", foreign, "--policy", "enterprise_moderate"]) == EXIT_ALLOW  # ALLOW_WITH_FEE still allows
+    assert json.loads(capsys.readouterr().out)["verdict"] == "ALLOW_WITH_FEE"
+    assert main(["assess", foreign, "--policy", "fed_strict"]) == EXIT_BLOCK
+    assert json.loads(capsys.readouterr().out)["verdict"] == "DENY"
+
+@pytest.mark.parametrize("argv", [
+    ["assess", "{dossier}", "--policy", "no_such_policy"],
+    ["assess", "{dossier}", "--policy", "enterprise_moderate", "--context", "{not json"],
+    ["assess", "{missing}", "--policy", "enterprise_moderate"],
+    ["assess", "{broken}", "--policy", "enterprise_moderate"],
+    ["score", "{broken}"],
+    ["score", "{dossier}", "--explain", "everything"],
+])
+def test_invalid_input_exits_2(argv, tmp_path, capsys):
+    broken = tmp_path / "broken.json"
+    broken.write_text('{"product": {"name": "x"}')
+    paths = {"dossier": os.path.join(EXAMPLES, "dossier_foreign.json"), "missing": str(tmp_path / "missing.json"), "broken": str(broken)}
+    argv = [paths.get(a.strip("{}"), a) for a in argv]
+    try:
+        rc = main(argv)
+    except SystemExit as e:
+        rc = e.code
+    assert rc == EXIT_INVALID
+    assert capsys.readouterr().err
+
+def test_process_exit_status_and_stdin():
+    with open(os.path.join(EXAMPLES, "dossier_foreign.json"), "rb") as f:
+        dossier = f.read()
+    run = lambda *argv: subprocess.run([sys.executable, "-m", "origingate", *argv], input=dossier, cwd=ROOT, capture_output=True)
+    assert run("assess", "-", "--policy", "enterprise_moderate").returncode == EXIT_ALLOW
+    assert run("assess", "-", "--policy", "fed_strict").returncode == EXIT_BLOCK
+    assert run("assess", "-", "--policy", "fed_strict", "--explain", "bogus").returncode == EXIT_INVALID
+    assert run("score", "-").returncode == EXIT_ALLOW
+
+@pytest.fixture
+def cache_file(tmp_path, monkeypatch):
+    path = str(tmp_path / "precompiled.json")
+    monkeypatch.setattr(precompiled, "PRECOMPILED_PATH", path)
+    monkeypatch.setattr(precompiled, "_entries", None)
+    return path
+
+def test_precompiled_hit_skips_yaml_and_edits_invalidate(cache_file, tmp_path, monkeypatch):
+    policy = tmp_path / "p.yaml"
+    policy.write_text("name: p\nthresholds:\n  tau_min_ocs: 0.6\n")
+    assert precompiled.compile_files([str(policy)], cache_file) == 1
+    import yaml
+    safe_load = yaml.safe_load
+    def no_yaml(raw):
+        raise AssertionError("YAML parsed despite a cache hit")
+    monkeypatch.setattr(yaml, "safe_load", no_yaml)
+    assert precompiled.load_yaml(policy.read_bytes()) == {"name": "p", "thresholds": {"tau_min_ocs": 0.6}}
+    monkeypatch.setattr(yaml, "safe_load", safe_load)
+    policy.write_text("name: p\nthresholds:\n  tau_min_ocs: 0.7\n")
+    assert precompiled.load_yaml(policy.read_bytes())["thresholds"]["tau_min_ocs"] == 0.7  # edited file: never stale
+
+def test_precompiled_skips_documents_json_cannot_hold(cache_file, tmp_path):
+    dated = tmp_path / "dated.yaml"
+    dated.write_text("name: dated\nexpires: 2026-01-01\n")
+    plain = tmp_path / "plain.yaml"
+    plain.write_text("name: plain\n")
+    assert precompiled.compile_files([str(dated), str(plain)], cache_file) == 1
+    assert str(precompiled.load_yaml(dated.read_bytes())["expires"]) == "2026-01-01"
+
+@pytest.mark.parametrize("content", ["{not json", '{"format": 999, "entries": {}}', "[]"])
+def test_unusable_cache_file_falls_back_to_yaml(cache_file, content):
+    with open(cache_file, "w", encoding="utf-8") as f:
+        f.write(content)
+    raw = b"name: p\n"
+    assert precompiled.load_yaml(raw) == {"name": "p"}
+
+def test_cli_gate_imports_yaml_only_without_a_cache(tmp_path):
+    cache = str(tmp_path / "precompiled.json")
+    env = dict(os.environ, PYTHONPATH=ROOT, ORIGINGATE_PRECOMPILED=cache)
+    subprocess.run([sys.executable, "-m", "origingate", "compile", "--out", cache], cwd=ROOT, env=env, check=True, capture_output=True)
+    probe = ("import sys; from origingate.__main__ import main; "
+             f"rc = main(['assess', {os.path.join(EXAMPLES, 'dossier_foreign.json')!r}, '--policy', 'enterprise_moderate', '--explain', 'none']); "
+             "print(rc, 'yaml' in sys.modules, 'fastapi' in sys.modules, file=sys.stderr)")
+    hit = subprocess.run([sys.executable, "-c", probe], cwd=ROOT, env=env, capture_output=True, text=True)
+    assert hit.stderr.split()[-3:] == ["0", "False", "False"], hit.stderr
+    miss = subprocess.run([sys.executable, "-c", probe], cwd=ROOT, env=dict(env, ORIGINGATE_PRECOMPILED=str(tmp_path / "none.json")),
+                          capture_output=True, text=True)
+    assert miss.stderr.split()[-3:] == ["0", "True", "False"], miss.stderr
+    with open(os.path.join(POLICY_DIR, "enterprise_moderate.yaml"), "rb") as f:
+        assert precompiled.digest(f.read()) in json.load(open(cache, encoding="utf-8"))["entries"]
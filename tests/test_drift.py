@@ -0,0 +1,46 @@
+from __future__ import annotations
+import copy, random
+import pytest
+from origingate.drift import component_index, evaluate_drift
+from origingate.models import ScoreWeights, SoftwareOriginDossier
+from origingate.scoring import score_origin
+from tests.conftest import SUPPLIERS, TARGETS
+
+def _mutate(rng: random.Random, d: dict) -> dict:
+    d = copy.deepcopy(d)
+    comps = d["sbom"]["components"]
+    for c in rng.sample(comps, min(len(comps), 6)):
+        edit = rng.choice(["version", "supplier", "risk"])
+        if edit == "version":
+            c["version"] += ".1"
+        elif edit == "supplier":
+            c["supplier_jurisdiction"] = rng.choice(SUPPLIERS)
+        else:
+            c["foreign_control_risk"] = round(rng.random(), 3)
+    for _ in range(rng.randint(0, 4)):
+        comps.pop(rng.randrange(len(comps)))
+    comps.extend(dict(comps[0], name=f"new{i}") for i in range(rng.randint(0, 3)))
+    return d
+
+def test_incremental_drift_matches_full_recompute(dossier_dicts):
+    rng = random.Random(5)
+    w = ScoreWeights()
+    for raw in dossier_dicts:
+        base = SoftwareOriginDossier.model_validate(raw)
+        update = SoftwareOriginDossier.model_validate(_mutate(rng, raw))
+        for target in TARGETS:
+            foi_sum, index = component_index(base, target)
+            got = evaluate_drift(index, foi_sum, update, w, target)
+            ocs, foi, _, _ = score_origin(update, w, target, "none")
+            # the incremental sum is accumulated in another order: equal up to the last bits
+            assert got.foi == pytest.approx(foi, abs=1e-9)
+            assert got.ocs == pytest.approx(ocs, abs=1e-4)
+            assert got.foi_sum == pytest.approx(component_index(update, target)[0], rel=1e-12, abs=1e-12)
+
+def test_unchanged_update_has_no_drift(dossiers):
+    w = ScoreWeights()
+    for d in dossiers:
+        foi_sum, index = component_index(d, "US")
+        got = evaluate_drift(index, foi_sum, d, w, "US")
+        assert got.changes == {} and got.top == []
+        assert (got.ocs, got.foi) == score_origin(d, w, "US", "none")[:2]
@@ -0,0 +1,65 @@
+from __future__ import annotations
+import asyncio, json, os, threading
+import pytest
+from origingate.engine import AssessError, assess_json
+from origingate.executor import ExecutionBackend
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def _body() -> bytes:
+    with open(os.path.join(ROOT, "examples", "dossier_foreign.json"), encoding="utf-8") as f:
+        dossier = json.load(f)
+    return json.dumps({"dossier": dossier, "policy_name": "enterprise_moderate", "explain": "summary"}).encode()
+
+@pytest.fixture(scope="module")
+def process_backend():
+    backend = ExecutionBackend("process", workers=2, process_min_bytes=1024)
+    backend.start()
+    yield backend
+    backend.shutdown()
+
+@pytest.fixture(params=["inline", "thread", "process"])
+def backend(request):
+    if request.param == "process":
+        yield request.getfixturevalue("process_backend")
+        return
+    b = ExecutionBackend(request.param, workers=2)
+    yield b
+    b.shutdown()
+
+def test_every_mode_returns_the_engine_result(backend):
+    body = _body()
+    assert asyncio.run(backend.run(assess_json, body, size=len(body))) == assess_json(body)
+
+def test_engine_errors_propagate_with_status_and_detail(backend):
+    body = b'{"policy_name": "enterprise_moderate", "dossier": {"product": 1}}' + b" " * 2048
+    with pytest.raises(AssessError) as e:
+        asyncio.run(backend.run(assess_json, body, size=len(body)))
+    assert e.value.status_code == 422
+    assert e.value.detail[0]["loc"][:2] == ["dossier", "product"]
+
+def test_work_runs_where_the_mode_says():
+    async def where(b: ExecutionBackend, size: int = 0):
+        return await b.run(threading.current_thread, size=size)
+    inline = ExecutionBackend("inline")
+    assert asyncio.run(where(inline)) is threading.main_thread() and inline.max_in_flight == 1
+    threads = ExecutionBackend("thread", workers=3)  # started lazily by the first run()
+    try:
+        assert asyncio.run(where(threads)).name.startswith("origingate") and threads.max_in_flight == 3
+    finally:
+        threads.shutdown()
+
+def test_process_mode_falls_back_to_threads_below_min_bytes(process_backend):
+    run = lambda size: asyncio.run(process_backend.run(os.getpid, size=size))
+    assert run(1023) == os.getpid()
+    pids = {run(1024) for _ in range(8)}
+    assert os.getpid() not in pids
+
+def test_unknown_mode_is_rejected(monkeypatch):
+    with pytest.raises(ValueError, match="Unknown execution mode"):
+        ExecutionBackend("fork")
+    monkeypatch.setenv("ORIGINGATE_EXECUTOR", "process")
+    monkeypatch.setenv("ORIGINGATE_EXECUTOR_WORKERS", "3")
+    monkeypatch.setenv("ORIGINGATE_PROCESS_MIN_BYTES", "10")
+    b = ExecutionBackend.from_env()
+    assert (b.mode, b.workers, b.process_min_bytes) == ("process", 3, 10)
@@ -0,0 +1,115 @@
+from __future__ import annotations
+import copy, json, os, subprocess, sys
+from typing import Any, List
+import pytest
+from pydantic import ValidationError
+from fastapi.testclient import TestClient
+import origingate.ingest as ingest
+from origingate.cache import RESULTS
+from origingate.models import CompactSBOMComponent, SBOMComponent, ScoreWeights, SoftwareOriginDossier
+from origingate.scoring import score_origin
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def _dossier() -> dict:
+    with open(os.path.join(ROOT, "examples", "dossier_foreign.json"), encoding="utf-8") as f:
+        return json.load(f)
+
+def _norm(status: int, body: Any) -> Any:
+    # validation messages name the (compact or regular) model class; compare where and why instead
+    if status == 422 and isinstance(body.get("detail"), list):
+        return status, [(e["loc"], e["type"]) for e in body["detail"]]
+    if isinstance(body, dict) and body.get("ok") is False:
+        return status, {"ok": False}
+    return status, body
+
+def _norm_line(line: dict) -> Any:
+    if "error" in line and isinstance(line["error"]["detail"], list):
+        return line["line"], _norm(422, {"detail": line["error"]["detail"]})
+    return line
+
+def exercise(client: TestClient) -> List[Any]:
+    """Every endpoint that takes a dossier, with valid and invalid bodies sent as raw bytes."""
+    d = _dossier()
+    bad = copy.deepcopy(d)
+    bad["sbom"]["components"][0]["criticality"] = "firmware"
+    bad["sbom"]["components"][1]["foreign_control_risk"] = 1.5
+    update = copy.deepcopy(d)
+    update["sbom"]["components"][0]["version"] += ".1"
+    update["sbom"]["components"].pop()
+    req = {"policy_name": "enterprise_moderate", "context": {"annual_usage_usd": 250_000}}
+    body = lambda obj: json.dumps(obj).encode()
+    calls = [
+        ("/v1/dossiers/verify", body(d)), ("/v1/dossiers/verify", body(bad)), ("/v1/dossiers/verify", b'{"product": '),
+        ("/v1/origin/score", body({"dossier": d, "explain": "top-k=3"})), ("/v1/origin/score", body({"dossier": bad})),
+        ("/v1/origin/score:multi", body({"dossier": d, "target_jurisdictions": ["US", "EU", "DE"]})),
+        ("/v1/assess", body({"dossier": d, **req})), ("/v1/assess", body({"dossier": bad, **req})), ("/v1/assess", b"{not json"),
+        ("/v1/baselines", body({"baseline_id": "ingest-test", "dossier": d, "policy_name": "enterprise_moderate"})),
+        ("/v1/baselines", body({"baseline_id": "ingest-bad", "dossier": bad, "policy_name": "enterprise_moderate"})),
+        ("/v1/updates/evaluate", body({"baseline_id": "ingest-test", "dossier": update, **req})),
+        ("/v1/updates/evaluate", body({"baseline_id": "ingest-test", "dossier": bad, **req})),
+    ]
+    out: List[Any] = []
+    for path, raw in calls:
+        RESULTS.clear()  # every call must really parse its body
+        r = client.post(path, content=raw, headers={"content-type": "application/json"})
+        out.append((path, *_norm(r.status_code, r.json())))
+    RESULTS.clear()
+    lines = b"\n".join([body({"dossier": d, **req}), body({"dossier": bad, **req}), body({"dossier": update, **req})])
+    r = client.post("/v1/assess:batch", content=lines)
+    out.append(("/v1/assess:batch", r.status_code, [_norm_line(json.loads(l)) for l in r.text.splitlines()]))
+    header = copy.deepcopy(d)
+    comps = header["sbom"].pop("components")
+    sid = client.post("/v1/dossiers/sessions", content=body({"dossier": header, **req})).json()["session_id"]
+    r = client.post(f"/v1/dossiers/sessions/{sid}/components", content=body(comps))
+    out.append(("chunk", r.status_code, r.json()["components"], r.json()["chunks"]))
+    bad_sid = client.post("/v1/dossiers/sessions", content=body({"dossier": header, **req})).json()["session_id"]
+    r = client.post(f"/v1/dossiers/sessions/{bad_sid}/components", content=body(bad["sbom"]["components"]))
+    out.append(("bad chunk", r.status_code))
+    RESULTS.clear()
+    r = client.post(f"/v1/dossiers/sessions/{sid}/finalize")
+    out.append(("finalize", r.status_code, r.json()))
+    return [list(x) if isinstance(x, tuple) else x for x in json.loads(json.dumps(out))]
+
+def test_dict_and_bytes_parse_paths_give_identical_responses(monkeypatch):
+    from origingate.api.main import app
+    client = TestClient(app)
+    monkeypatch.setattr(ingest, "DICT_PARSE_MIN_BYTES", 1 << 62)
+    from_bytes = exercise(client)
+    monkeypatch.setattr(ingest, "DICT_PARSE_MIN_BYTES", 0)
+    assert exercise(client) == from_bytes
+    statuses = [row[1] for row in from_bytes]
+    assert statuses[:13] == [200, 200, 200, 200, 422, 200, 200, 422, 422, 200, 422, 200, 422]
+
+def test_compact_mode_gives_identical_responses():
+    from origingate.api.main import app
+    assert not ingest.COMPACT_SBOM
+    expected = exercise(TestClient(app))
+    script = ("import json; from fastapi.testclient import TestClient; from origingate.api.main import app; "
+              "from origingate.ingest import COMPACT_SBOM; from tests.test_ingest import exercise; "
+              "assert COMPACT_SBOM; print(json.dumps(exercise(TestClient(app))))")
+    env = dict(os.environ, ORIGINGATE_COMPACT_SBOM="1", PYTHONPATH=ROOT)
+    p = subprocess.run([sys.executable, "-c", script], cwd=ROOT, env=env, capture_output=True, text=True, timeout=120)
+    assert p.returncode == 0, p.stderr
+    assert json.loads(p.stdout.splitlines()[-1]) == expected
+
+@pytest.mark.parametrize("min_bytes", [0, 1 << 62])
+def test_compact_parse_builds_slotted_components(monkeypatch, min_bytes):
+    monkeypatch.setattr(ingest, "DICT_PARSE_MIN_BYTES", min_bytes)
+    raw = json.dumps(_dossier()).encode()
+    full = ingest.parse_json(SoftwareOriginDossier, raw, compact=False)
+    compact = ingest.parse_json(SoftwareOriginDossier, raw, compact=True)
+    assert type(full.sbom.components[0]) is SBOMComponent
+    assert type(compact.sbom.components[0]) is CompactSBOMComponent and not hasattr(compact.sbom.components[0], "__dict__")
+    assert isinstance(compact, SoftwareOriginDossier)
+    w = ScoreWeights()
+    assert score_origin(compact, w) == score_origin(full, w)
+
+@pytest.mark.parametrize("field,value", [("criticality", "firmware"), ("foreign_control_risk", -0.1), ("name", None)])
+def test_compact_parse_keeps_validation_rules(field, value):
+    d = _dossier()
+    d["sbom"]["components"][2][field] = value
+    for compact in (False, True):
+        with pytest.raises(ValidationError) as e:
+            ingest.parse_json(SoftwareOriginDossier, json.dumps(d).encode(), compact=compact)
+        assert [err["loc"] for err in e.value.errors()] == [("sbom", "components", 2, field)]
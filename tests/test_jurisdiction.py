@@ -0,0 +1,57 @@
+from __future__ import annotations
+import itertools, random
+import pytest
+from origingate.jurisdiction import INDEX, JurisdictionIndex
+from origingate.models import ScoreWeights, SoftwareOriginDossier
+from origingate.scoring import CRIT_WEIGHT, score_origin
+from benchmarks.generate_portfolio import mk_dossier
+
+US_REGIONS = {"us-east-1", "us-east-2", "us-west-1", "us-west-2", "us-gov-east-1", "us-gov-west-1"}
+
+def _reference_us(d: SoftwareOriginDossier, w: ScoreWeights):
+    # the string-comparison signals the index replaced, target "US" only
+    O_b = 1.0 if (d.provenance.build_region or "").lower() in US_REGIONS else 0.0
+    O_s = 1.0 if (d.signing.key_jurisdiction or "").upper() == "US" else 0.0
+    O_h = 0.5 if not d.hosting or not d.hosting.jurisdiction else (1.0 if d.hosting.jurisdiction.upper() == "US" else 0.0)
+    foi = 0.0
+    for c in d.sbom.components:
+        r = c.foreign_control_risk
+        if (c.supplier_jurisdiction or "").upper() == "US":
+            r = min(r, 0.15)
+        foi += CRIT_WEIGHT.get(c.criticality, 0.03) * r
+    O_c = max(0.0, min(1.0, 1.0 / (1.0 + foi * 100.0 / 50.0)))
+    ocs = w.w_build * O_b + w.w_sbom * O_c + w.w_signing * O_s + w.w_hosting * O_h
+    return round(ocs, 4), round(foi * 100.0, 4), {"O_b": O_b, "O_c": O_c, "O_s": O_s, "O_h": O_h}
+
+def test_us_target_matches_string_matching_on_synthetic_portfolio():
+    random.seed(11)
+    w = ScoreWeights()
+    combos = itertools.product(["us-east-1", "us-west-2", "eu-central-1", "ap-south-1"], ["US", "EU", "CN"], ["US", "EU", None])
+    for i, (region, key, hosting) in enumerate(combos):
+        raw = mk_dossier(f"Prod{i}", "1.0.0", region, key, hosting or "US", foreign_bias=random.random())
+        if hosting is None:
+            raw["hosting"] = None
+        d = SoftwareOriginDossier.model_validate(raw)
+        assert score_origin(d, w, "US", "none")[:3] == _reference_us(d, w)
+
+@pytest.mark.parametrize("raw,code", [("us", "US"), (" usa ", "US"), ("UK", "GB"), ("de", "DE"), ("", ""), (None, ""), ("XX", "XX")])
+def test_code_normalizes_aliases_and_case(raw, code):
+    assert INDEX.code(raw) == code
+
+@pytest.mark.parametrize("target,region,expected", [
+    ("US", "us-east-1", 1.0), ("US", "US-WEST-2", 1.0), ("US", "eu-central-1", 0.0),
+    ("DE", "eu-central-1", 1.0), ("EU", "eu-central-1", 1.0), ("EU", "europe-west3", 1.0), ("FR", "eu-central-1", 0.0),
+    ("EU", "DE", 1.0), ("US", "", 0.0), ("US", "unknown-region-9", 0.0),
+])
+def test_build_region_resolves_through_blocs(target, region, expected):
+    assert INDEX.evaluator(target).build(region) == expected
+
+def test_member_satisfies_bloc_but_not_the_reverse():
+    assert INDEX.evaluator("EU").match(INDEX.code("de"))
+    assert not INDEX.evaluator("DE").match(INDEX.code("EU"))
+    assert INDEX.evaluator("GB").signing("UK") == 1.0
+    assert INDEX.evaluator("US").hosting(None) == 0.5
+
+def test_index_rejects_malformed_data():
+    with pytest.raises(ValueError):
+        JurisdictionIndex({"jurisdictions": ["US"]})
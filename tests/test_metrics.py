@@ -0,0 +1,30 @@
+from __future__ import annotations
+import asyncio
+from origingate.executor import ExecutionBackend
+from origingate.metrics import METRICS, Metrics, record_verdict
+
+def test_drain_resets_and_merge_adds():
+    worker, api = Metrics(), Metrics()
+    for m in (worker, api):
+        m.counter("c", "")
+        m.histogram("h", "", (1.0, 2.0))
+    worker.inc("c", (("k", "v"),), 2.0)
+    worker.observe("h", 1.5)
+    api.observe("h", 0.5)
+    api.merge(worker.drain())
+    assert worker.drain() == {}
+    snap = api.snapshot()
+    assert snap[("c", (("k", "v"),))] == 2.0
+    assert snap[("h", ())] == [1, 1, 0, 2.0]
+
+def test_process_pool_metrics_reach_the_api_process():
+    key = ("origingate_verdicts_total", (("policy", "pooled"), ("verdict", "DENY")))
+    before = METRICS.snapshot().get(key, 0.0)
+    backend = ExecutionBackend("process", workers=1, process_min_bytes=0)
+    backend.start()
+    try:
+        for _ in range(3):
+            asyncio.run(backend.run(record_verdict, "pooled", "DENY"))
+    finally:
+        backend.shutdown()
+    assert METRICS.snapshot()[key] == before + 3
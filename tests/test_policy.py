@@ -0,0 +1,36 @@
+from __future__ import annotations
+import os, shutil
+import pytest
+from origingate.metrics import METRICS
+from origingate.policy import POLICY_DIR, PolicyError, PolicyRegistry
+
+def _failures(name: str) -> float:
+    return METRICS.snapshot().get(("origingate_policy_compile_failures_total", (("policy", name),)), 0.0)
+
+def _write(path: str, text: str, mtime_ns: int) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+def test_bad_edit_keeps_serving_last_good_version(tmp_path):
+    shutil.copy(os.path.join(POLICY_DIR, "enterprise_moderate.yaml"), tmp_path / "enterprise_moderate.yaml")
+    path = str(tmp_path / "enterprise_moderate.yaml")
+    reg = PolicyRegistry(str(tmp_path))
+    good = reg.get("enterprise_moderate")
+    before = _failures("enterprise_moderate")
+
+    _write(path, "name: enterprise_moderate\nthresholds: [unclosed\n", 1_000_000_000)
+    assert reg.get("enterprise_moderate") is good
+    assert reg.get("enterprise_moderate") is good
+    assert _failures("enterprise_moderate") == before + 1  # the broken file is compiled once, not per request
+
+    _write(path, "name: enterprise_moderate\nthresholds:\n  tau_min_ocs: 0.7\n", 2_000_000_000)
+    fixed = reg.get("enterprise_moderate")
+    assert fixed.tau == 0.7 and fixed.version != good.version
+
+def test_malformed_without_good_version_raises(tmp_path):
+    _write(str(tmp_path / "broken.yaml"), "thresholds: {}\n", 1_000_000_000)
+    reg = PolicyRegistry(str(tmp_path))
+    for _ in range(2):
+        with pytest.raises(PolicyError):
+            reg.get("broken")
@@ -0,0 +1,39 @@
+from __future__ import annotations
+import copy, random
+import pytest
+from origingate.models import ScoreWeights, SoftwareOriginDossier
+from origingate.portfolio import ColumnarPortfolio, PortfolioWriter
+from origingate.scoring import score_columns, score_origin
+from benchmarks.generate_portfolio import mk_dossier
+from tests.conftest import TARGETS
+
+def test_unknown_criticality_is_rejected_on_add(tmp_path):
+    random.seed(3)
+    good = mk_dossier("Prod", "1.0.0", "us-east-1", "US", "US", foreign_bias=0.5)
+    bad = copy.deepcopy(good)
+    bad["sbom"]["components"][1]["criticality"] = "firmware"
+    path = str(tmp_path / "p.ogp")
+    with PortfolioWriter(path) as w:
+        w.add(good, "domestic")
+        with pytest.raises(ValueError, match="component 1 .*'firmware'"):
+            w.add(bad, "foreign")
+        w.add(good, "laundered")
+    p = ColumnarPortfolio(path)
+    assert len(p) == 2 and p.labels() == ["domestic", "laundered"]
+    assert p.dossier(1)["sbom"]["components"] == good["sbom"]["components"]
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 1000])
+def test_columnar_scores_match_per_dossier(dossier_dicts, tmp_path, chunk_size):
+    path = str(tmp_path / "p.ogp")
+    with PortfolioWriter(path) as writer:
+        for d in dossier_dicts:
+            writer.add(d)
+    p = ColumnarPortfolio(path)
+    assert [p.dossier(i)["sbom"]["components"] for i in range(len(p))] == [d["sbom"]["components"] for d in dossier_dicts]
+    w = ScoreWeights(w_build=0.1, w_sbom=0.6, w_signing=0.2, w_hosting=0.1)
+    for target in TARGETS:
+        got = []
+        for _, cols in p.iter_columns(target, chunk_size=chunk_size):
+            s = score_columns(cols, w)
+            got += [(s.ocs[i], s.foi[i], s.signals(i)) for i in range(len(s.ocs))]
+        assert got == [score_origin(SoftwareOriginDossier.model_validate(d), w, target, "none")[:3] for d in dossier_dicts]
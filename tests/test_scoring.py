@@ -0,0 +1,56 @@
+from __future__ import annotations
+import pytest
+from origingate.jurisdiction import INDEX
+from origingate.models import ScoreWeights
+from origingate.scoring import CRIT_WEIGHT, score_origin, score_origin_multi, score_portfolio
+from tests.conftest import TARGETS
+
+WEIGHTS = [ScoreWeights(), ScoreWeights(w_build=0.1, w_sbom=0.6, w_signing=0.2, w_hosting=0.1)]
+
+def _reference_foi(d, target: str, k: int):
+    # the original two-pass scorer: full list of contributions, stable sort, top k
+    ev = INDEX.evaluator(target)
+    foi, contribs = 0.0, []
+    for c in d.sbom.components:
+        supplier = INDEX.code(c.supplier_jurisdiction)
+        r = c.foreign_control_risk
+        if ev.match(supplier):
+            r = min(r, 0.15)
+        contrib = CRIT_WEIGHT.get(c.criticality, 0.03) * r
+        foi += contrib
+        contribs.append((contrib, c.name, c.criticality, supplier, r))
+    contribs.sort(reverse=True, key=lambda x: x[0])
+    foi_scaled = foi * 100.0
+    oc = 1.0 / (1.0 + (foi_scaled / 50.0))
+    lines = [f"SBOM signal from FOI={foi_scaled:.2f} -> O_c={oc:.2f}"]
+    lines += [f"FOI contrib {contrib:.3f}: {name} ({crit}) supplier={supplier} risk={r:.2f}" for contrib, name, crit, supplier, r in contribs[:k]]
+    return round(foi_scaled, 4), max(0.0, min(1.0, oc)), lines
+
+@pytest.mark.parametrize("detail,k", [("full", 8), ("top-k=3", 3), ("top-k=100", 100), ("summary", 0)])
+def test_single_pass_matches_reference_scorer(dossiers, detail, k):
+    w = ScoreWeights()
+    for d in dossiers:
+        for target in TARGETS:
+            ocs, foi, signals, expl = score_origin(d, w, target, detail)
+            ref_foi, ref_oc, ref_lines = _reference_foi(d, target, k)
+            assert foi == ref_foi
+            assert signals["O_c"] == ref_oc
+            assert expl[3:] == ref_lines  # after the build / signing / hosting lines
+            assert ocs == round(w.w_build * signals["O_b"] + w.w_sbom * ref_oc + w.w_signing * signals["O_s"] + w.w_hosting * signals["O_h"], 4)
+
+@pytest.mark.parametrize("detail", ["full", "top-k=5", "summary", "none"])
+def test_multi_target_matches_repeated_single_target(dossiers, detail):
+    w = WEIGHTS[1]
+    targets = TARGETS + ["US"]  # duplicates collapse
+    for d in dossiers:
+        multi = score_origin_multi(d, w, targets, detail)
+        assert list(multi) == list(dict.fromkeys(targets))
+        for target in targets:
+            assert multi[target] == score_origin(d, w, target, detail)
+
+@pytest.mark.parametrize("w", WEIGHTS)
+def test_portfolio_scorer_matches_per_dossier(dossiers, w):
+    for target in TARGETS:
+        scores = score_portfolio(dossiers, w, target)
+        assert [(scores.ocs[i], scores.foi[i], scores.signals(i)) for i in range(len(scores))] == \
+            [score_origin(d, w, target, "none")[:3] for d in dossiers]
@@ -0,0 +1,27 @@
+from __future__ import annotations
+import json, os
+from fastapi.testclient import TestClient
+from origingate.api.main import app
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def _dossier() -> dict:
+    with open(os.path.join(ROOT, "examples", "dossier_foreign.json"), encoding="utf-8") as f:
+        return json.load(f)
+
+def test_chunked_session_matches_assess_and_rejects_header_components():
+    d = _dossier()
+    comps = d["sbom"].pop("components")
+    c = TestClient(app)
+    req = {"dossier": d, "policy_name": "enterprise_moderate", "context": {"annual_usage_usd": 1_000_000}}
+
+    r = c.post("/v1/dossiers/sessions", json={**req, "dossier": {**d, "sbom": {**d["sbom"], "components": comps[:5]}}})
+    assert r.status_code == 422
+    assert "send components as chunks" in r.text
+
+    sid = c.post("/v1/dossiers/sessions", json=req).json()["session_id"]
+    for seq, i in enumerate(range(0, len(comps), 40)):
+        assert c.post(f"/v1/dossiers/sessions/{sid}/components?seq={seq}", json=comps[i:i + 40]).status_code == 200
+    got = c.post(f"/v1/dossiers/sessions/{sid}/finalize").json()
+    want = c.post("/v1/assess", json={**req, "dossier": {**d, "sbom": {**d["sbom"], "components": comps}}}).json()
+    assert got == want
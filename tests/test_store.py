@@ -0,0 +1,84 @@
+from __future__ import annotations
+import json, sqlite3, threading
+import pytest
+from fastapi.testclient import TestClient
+import origingate.api.main as api
+from origingate.store import Baseline, BaselineStore, MemoryBaselineStore, SQLiteBaselineStore
+
+def test_incomplete_store_fails_at_construction():
+    class NoFind(BaselineStore):
+        def put_many(self, baselines):
+            return 0
+        def get(self, baseline_id):
+            return None
+    with pytest.raises(TypeError, match="find"):
+        NoFind()
+
+@pytest.mark.parametrize("kind", ["memory", "sqlite"])
+def test_backends_round_trip(kind, tmp_path):
+    store = MemoryBaselineStore() if kind == "memory" else SQLiteBaselineStore(str(tmp_path / "b.db"))
+    try:
+        b = Baseline(baseline_id="b1", product_name="P", product_version="1", artifact_digest="sha256:x",
+                     ocs0=0.5, foi0=1.0)
+        store.put(b)
+        assert store.get("b1").ocs0 == 0.5
+        assert [x.baseline_id for x in store.find(product_name="P")] == ["b1"]
+    finally:
+        store.close()
+
+def test_memory_find_while_writing():
+    store = MemoryBaselineStore()
+    errors = []
+    def write():
+        for i in range(20_000):
+            store.put(Baseline(baseline_id=f"b{i}", ocs0=0.5, foi0=1.0, artifact_digest="sha256:x", product_name="P"))
+    def read():
+        try:
+            while writer.is_alive():
+                store.find(product_name="P", limit=1_000_000)
+        except RuntimeError as e:  # "dictionary changed size during iteration"
+            errors.append(e)
+    writer = threading.Thread(target=write)
+    readers = [threading.Thread(target=read) for _ in range(2)]
+    writer.start()
+    for t in readers:
+        t.start()
+    writer.join()
+    for t in readers:
+        t.join()
+    assert errors == [] and len(store.find(limit=1_000_000)) == 20_000
+
+def test_list_baselines_limit_is_bounded(monkeypatch, tmp_path):
+    store = SQLiteBaselineStore(str(tmp_path / "b.db"))
+    store.put_many(Baseline(baseline_id=f"b{i}", ocs0=0.5, foi0=1.0, artifact_digest="sha256:x") for i in range(3))
+    monkeypatch.setattr(api, "STORE", store)
+    client = TestClient(api.app)
+    for bad in (-1, 0, 1001):
+        assert client.get("/v1/baselines", params={"limit": bad}).status_code == 422
+    assert len(client.get("/v1/baselines", params={"limit": 2}).json()) == 2
+    store.close()
+
+def test_sqlite_find_lists_without_the_component_index(tmp_path):
+    store = SQLiteBaselineStore(str(tmp_path / "b.db"))
+    store.put(Baseline(baseline_id="b1", ocs0=0.25, foi0=30.5, artifact_digest="sha256:x", product_name="P", product_version="2",
+                       foi_sum=0.305, components={"lib0": [0.2, 0.3, "1.0", "US"]}))
+    assert store.find(artifact_digest="sha256:x") == [Baseline(baseline_id="b1", ocs0=0.25, foi0=30.5, artifact_digest="sha256:x",
+                                                                product_name="P", product_version="2")]
+    assert store.get("b1").components == {"lib0": [0.2, 0.3, "1.0", "US"]}
+    store.close()
+
+def test_sqlite_migrates_files_without_score_columns(tmp_path):
+    path = str(tmp_path / "old.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE baselines (baseline_id TEXT PRIMARY KEY, artifact_digest TEXT NOT NULL, product_name TEXT NOT NULL DEFAULT '', "
+                 "product_version TEXT NOT NULL DEFAULT '', payload TEXT NOT NULL, updated_at REAL NOT NULL)")
+    payload = {"baseline_id": "old", "ocs0": 0.75, "foi0": 12.0, "artifact_digest": "sha256:y", "product_name": "Q", "product_version": "1"}
+    conn.execute("INSERT INTO baselines VALUES (?,?,?,?,?,?)", ("old", "sha256:y", "Q", "1", json.dumps(payload), 0.0))
+    conn.commit()
+    conn.close()
+    store = SQLiteBaselineStore(path)
+    [b] = store.find(product_name="Q")
+    assert (b.ocs0, b.foi0) == (0.75, 12.0)
+    store.put(Baseline(baseline_id="new", ocs0=0.5, foi0=1.0, artifact_digest="sha256:y", product_name="Q"))
+    assert sorted(x.baseline_id for x in store.find(artifact_digest="sha256:y")) == ["new", "old"]
+    store.close()